@@ -6,6 +6,7 @@ const { query } = require('../config/database');
 const axios = require('axios');
 const certificateGenerator = require('../utils/pdfGenerator');
 const geminiService = require('../services/geminiService');
+const mlService = require('../services/mlService');
 
 class CompanyController {
     constructor() {
@@ -318,12 +319,15 @@ class CompanyController {
             const { score, score_category, data } = scoreResult.rows[0];
             const parsedData = typeof data === 'string' ? JSON.parse(data) : data;
 
+            // Score what-if changes so the recommendations rank them by impact
+            const whatIf = await mlService.whatIf(parsedData);
+
             // Get AI recommendations
             const recommendations = await geminiService.getRecommendations({
                 score: parseFloat(score),
                 score_category,
                 ...parsedData
-            });
+            }, whatIf);
 
             res.json({
                 success: true,
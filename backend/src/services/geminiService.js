@@ -25,12 +25,34 @@ async function generateContent(prompt) {
     return response.text();
 }
 
+/**
+ * Describe what-if results as prompt lines, largest score impact first
+ * @param {Object|null} whatIf - ML service /what-if response
+ * @returns {string} - One line per lever step, or '' without results
+ */
+function describeScoreImpacts(whatIf) {
+    if (!whatIf || !Array.isArray(whatIf.levers)) {
+        return '';
+    }
+    return whatIf.levers
+        .flatMap(lever => lever.steps.map(step => {
+            const change = lever.kind === 'percent'
+                ? `${step.step > 0 ? '+' : ''}${step.step}%`
+                : `${step.step > 0 ? '+' : ''}${step.step}`;
+            const delta = Number(step.delta.toFixed(1)) || 0;
+            return `- ${lever.feature} ${change}: score ${delta > 0 ? '+' : ''}${delta.toFixed(1)} points (${step.category})`;
+        }))
+        .join('\n');
+}
+
 /**
  * Get AI-powered recommendations for a company based on their environmental data
  * @param {Object} companyData - Company environmental data
+ * @param {Object|null} whatIf - ML service /what-if response for the company, to
+ *   ground the recommendations in the modelled score impact of each change
  * @returns {Promise<string[]>} - Array of recommendation strings
  */
-async function getRecommendations(companyData) {
+async function getRecommendations(companyData, whatIf = null) {
     const {
         score = 0,
         score_category = 'Unknown',
@@ -45,6 +67,11 @@ async function getRecommendations(companyData) {
     // Add unique timestamp to ensure fresh suggestions each time
     const requestId = Date.now();
 
+    const scoreImpacts = describeScoreImpacts(whatIf);
+    const impactSection = scoreImpacts
+        ? `\nModelled Score Impact of Changes (largest first):\n${scoreImpacts}\n`
+        : '';
+
     const prompt = `You are an environmental sustainability advisor. Based on the following company environmental data, provide exactly 5 NEW and UNIQUE actionable recommendations to improve their carbon footprint.
 
 Request ID: ${requestId} (use this to ensure unique suggestions)
@@ -57,7 +84,7 @@ Company Data:
 - CO2 Emissions: ${emissions_co2} tons
 - Water Usage: ${water_usage} liters
 - Employee Count: ${employee_count}
-
+${impactSection}
 Rules:
 1. Return ONLY a numbered list of 5 recommendations
 2. Each recommendation should be concise (under 15 words)
@@ -65,7 +92,8 @@ Rules:
 4. Be CREATIVE and VARIED - do NOT use generic recommendations
 5. Do NOT include any introductions, explanations, or conclusions
 6. Do NOT repeat the data back
-7. IMPORTANT: Provide DIFFERENT suggestions than you would normally - be innovative!
+7. IMPORTANT: Provide DIFFERENT suggestions than you would normally - be innovative!${impactSection ? `
+8. Prioritize the changes with the largest modelled score impact` : ''}
 
 Generate 5 unique recommendations now:`;
 
@@ -4,6 +4,85 @@
  */
 const axios = require('axios');
 
+// Columnar binary /batch-predict protocol (see ml-service/src/columnar.py)
+const COLUMNAR_MEDIA_TYPE = 'application/x-carbonscore-columnar';
+const COLUMNAR_FIELDS = [
+  'energy_consumption',
+  'renewable_energy_pct',
+  'waste_recycled_pct',
+  'emissions_co2',
+  'water_usage',
+  'employee_count',
+  'production_volume'
+];
+const FRAME_PREFIX = 12; // magic, version, reserved, header length
+
+// Metric changes scored by whatIf() unless others are given (see ml-service /what-if)
+const DEFAULT_LEVERS = [
+  { feature: 'renewable_energy_pct', kind: 'absolute', steps: [10, 20, 30] },
+  { feature: 'waste_recycled_pct', kind: 'absolute', steps: [10, 20, 30] },
+  { feature: 'emissions_co2', kind: 'percent', steps: [-10, -25, -50] },
+  { feature: 'energy_consumption', kind: 'percent', steps: [-10, -25] },
+  { feature: 'water_usage', kind: 'percent', steps: [-10, -25] }
+];
+const pad8 = (length) => Math.ceil(length / 8) * 8;
+
+/**
+ * Encode companies as float64 columns, NaN for missing values
+ */
+function encodeColumnar(companiesData) {
+  const rows = companiesData.length;
+  const header = Buffer.from(JSON.stringify({
+    rows,
+    columns: COLUMNAR_FIELDS.map(name => ({ name, dtype: '<f8' }))
+  }));
+  const dataStart = pad8(FRAME_PREFIX + header.length);
+  const buffer = Buffer.alloc(dataStart + COLUMNAR_FIELDS.length * rows * 8);
+  buffer.write('CSXC', 0, 'latin1');
+  buffer.writeUInt8(1, 4);
+  buffer.writeUInt32LE(header.length, 8);
+  header.copy(buffer, FRAME_PREFIX);
+
+  COLUMNAR_FIELDS.forEach((name, column) => {
+    const offset = dataStart + column * rows * 8;
+    companiesData.forEach((data, row) => {
+      const value = data[name];
+      buffer.writeDoubleLE(value == null ? NaN : Number(value), offset + row * 8);
+    });
+  });
+  return buffer;
+}
+
+/**
+ * Decode a columnar score response into the JSON batch response shape
+ */
+function decodeColumnar(buffer) {
+  if (buffer.toString('latin1', 0, 4) !== 'CSXC') {
+    throw new Error('ML service returned an invalid columnar response');
+  }
+  const headerLength = buffer.readUInt32LE(8);
+  const header = JSON.parse(buffer.toString('utf8', FRAME_PREFIX, FRAME_PREFIX + headerLength));
+  const readers = { '<f4': [4, 'readFloatLE'], '|u1': [1, 'readUInt8'] };
+
+  let offset = pad8(FRAME_PREFIX + headerLength);
+  const columns = {};
+  for (const { name, dtype } of header.columns) {
+    const [size, read] = readers[dtype];
+    const values = new Array(header.rows);
+    for (let row = 0; row < header.rows; row++) {
+      values[row] = buffer[read](offset + row * size);
+    }
+    columns[name] = values;
+    offset += pad8(size * header.rows);
+  }
+
+  const predictions = columns.score.map((score, row) => ({
+    score,
+    category: header.categories[columns.category[row]]
+  }));
+  return { predictions, count: header.rows, model_version: header.model_version };
+}
+
 class MLService {
   constructor() {
     this.mlServiceUrl = process.env.ML_SERVICE_URL || 'http://localhost:8000';
@@ -96,6 +175,70 @@ class MLService {
     }
   }
 
+  /**
+   * Batch prediction over the columnar binary protocol
+   * Scores and categories only; much smaller and faster than JSON for large batches
+   */
+  async batchPredictColumnar(companiesData) {
+    try {
+      const response = await axios.post(
+        `${this.mlServiceUrl}/batch-predict`,
+        encodeColumnar(companiesData),
+        {
+          timeout: this.timeout * 2,
+          responseType: 'arraybuffer',
+          headers: {
+            'Content-Type': COLUMNAR_MEDIA_TYPE
+          }
+        }
+      );
+
+      return {
+        success: true,
+        data: decodeColumnar(Buffer.from(response.data))
+      };
+
+    } catch (error) {
+      console.error('ML columnar batch prediction error:', error.message);
+
+      const predictions = companiesData.map(data => {
+        const { score, category } = this.fallbackScore(data);
+        return { score, category };
+      });
+      return {
+        success: false,
+        data: { predictions, count: predictions.length },
+        error: error.message
+      };
+    }
+  }
+
+  /**
+   * Score changes to a company's metrics in one ML service call
+   * Returns the baseline score and the levers ranked by how far they move it,
+   * or null when the ML service is unavailable
+   */
+  async whatIf(companyData, levers = DEFAULT_LEVERS, combine = false) {
+    try {
+      const response = await axios.post(
+        `${this.mlServiceUrl}/what-if`,
+        { company: companyData, levers, combine },
+        {
+          timeout: this.timeout,
+          headers: {
+            'Content-Type': 'application/json'
+          }
+        }
+      );
+
+      return response.data;
+
+    } catch (error) {
+      console.error('ML what-if error:', error.message);
+      return null;
+    }
+  }
+
   /**
    * Get model information
    */
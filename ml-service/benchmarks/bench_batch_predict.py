@@ -0,0 +1,37 @@
+"""
+Benchmark: per-row predict() loop vs vectorized predict_batch()
+Reports rows/sec at batch sizes of 1, 100 and 10k
+
+Usage:
+    python benchmarks/bench_batch_predict.py [--model-type xgboost|random_forest]
+"""
+import argparse
+import tempfile
+
+from common import build_model_dir, synthetic_companies, time_call
+from inference import CarbonScorePredictor
+
+BATCH_SIZES = [1, 100, 10000]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model-type', default='xgboost', choices=['xgboost', 'random_forest'])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        build_model_dir(model_dir, model_type=args.model_type)
+        predictor = CarbonScorePredictor(model_path=model_dir)
+
+        print(f"\n{'batch':>8} {'loop rows/s':>14} {'batch rows/s':>14} {'speedup':>9}")
+        for size in BATCH_SIZES:
+            companies = synthetic_companies(size, seed=size)
+            repeat = 5 if size < 10000 else 2
+            loop_time = time_call(lambda: [predictor.predict(c) for c in companies], repeat)
+            batch_time = time_call(lambda: predictor.predict_batch(companies), repeat)
+            print(f"{size:>8} {size / loop_time:>14,.0f} {size / batch_time:>14,.0f} "
+                  f"{loop_time / batch_time:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: columnar binary /batch-predict versus the JSON protocol
+Measures payload sizes, client-side encode/decode and the server round trip
+(in-process ASGI client) at 1k and 100k rows
+
+Usage:
+    python benchmarks/bench_columnar.py [--rows 1000 100000]
+"""
+import argparse
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from common import COMPANY_FIELDS, build_model_dir, synthetic_companies, time_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 100000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        build_model_dir(model_dir)
+        os.environ['ML_MODEL_PATH'] = model_dir
+        os.environ['ML_CACHE_SIZE'] = '0'
+        import api
+        from columnar import MEDIA_TYPE, decode_frame, encode_frame
+        from fastapi.testclient import TestClient
+
+        def encode_json(companies):
+            return json.dumps(companies).encode()
+
+        def encode_columnar(companies):
+            return encode_frame([
+                (name, np.array([company.get(name, np.nan) for company in companies], dtype='<f8'))
+                for name in COMPANY_FIELDS
+            ])
+
+        def decode_json(body):
+            return [row['score'] for row in json.loads(body)['predictions']]
+
+        def decode_columnar(body):
+            return decode_frame(body)[1]['score']
+
+        protocols = [
+            ('json full', encode_json, 'application/json', '', decode_json),
+            ('json score', encode_json, 'application/json', '?fields=score', decode_json),
+            ('columnar', encode_columnar, MEDIA_TYPE, '', decode_columnar),
+        ]
+
+        with TestClient(api.app) as client:
+            print(f"\n{'rows':>8} {'protocol':>11} {'req MiB':>8} {'resp MiB':>9} {'encode ms':>10} "
+                  f"{'server ms':>10} {'decode ms':>10} {'rows/s':>11}")
+            for rows in args.rows:
+                companies = synthetic_companies(rows, seed=rows)
+                repeat = 3 if rows <= 10000 else 1
+                for label, encode, media_type, query, decode in protocols:
+                    body = encode(companies)
+
+                    def post():
+                        response = client.post('/batch-predict' + query, content=body,
+                                               headers={'content-type': media_type})
+                        response.raise_for_status()
+                        return response.content
+
+                    content = post()
+                    encode_s = time_call(lambda: encode(companies), repeat)
+                    server_s = time_call(post, repeat)
+                    decode_s = time_call(lambda: decode(content), repeat)
+                    total = encode_s + server_s + decode_s
+                    print(f"{rows:>8,} {label:>11} {len(body) / 2**20:>8.2f} {len(content) / 2**20:>9.2f} "
+                          f"{encode_s * 1000:>10.1f} {server_s * 1000:>10.1f} {decode_s * 1000:>10.1f} "
+                          f"{rows / total:>11,.0f}")
+        api.inference_executor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
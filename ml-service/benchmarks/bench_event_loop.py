@@ -0,0 +1,103 @@
+"""
+Load test: /health latency while large /batch-predict requests run concurrently
+Compares inference inline on the event loop against the InferenceExecutor
+thread pool and its process pool for large batches
+
+Usage:
+    python benchmarks/bench_event_loop.py [--batches 4] [--rows 20000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import numpy as np
+
+from common import build_model_dir, synthetic_companies
+
+
+class InlineExecutor:
+    """Previous behavior: call the model directly inside the async handler"""
+
+    async def run(self, fn, *args):
+        return fn(*args)
+
+    async def run_batch(self, fn, companies):
+        return fn(companies)
+
+
+async def probe_health(client, stop, latencies):
+    """Poll /health every 10 ms; a blocked loop shows up as a long wait for the next probe"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get('/health')
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200
+        sleep_start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        # Time beyond the requested sleep is time the loop could not serve probes
+        latencies[-1] += max(0.0, time.perf_counter() - sleep_start - 0.01)
+
+
+async def run_load(app, batches, rows):
+    import httpx
+    # Pre-encode bodies so the in-process client does not itself block the loop
+    payloads = [json.dumps(synthetic_companies(rows, seed=i)).encode() for i in range(batches)]
+    headers = {'content-type': 'application/json'}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=600) as client:
+        idle = []
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_health(client, stop, idle))
+        await asyncio.sleep(0.5)
+        stop.set()
+        await probe
+
+        loaded = []
+        stop = asyncio.Event()
+        probe = asyncio.create_task(probe_health(client, stop, loaded))
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[client.post('/batch-predict', content=p, headers=headers) for p in payloads])
+        elapsed = time.perf_counter() - start
+        stop.set()
+        await probe
+
+    statuses = sorted({r.status_code for r in responses})
+    return idle, loaded, elapsed, statuses
+
+
+def summarize(label, idle, loaded, elapsed, statuses, total_rows):
+    ms = lambda values, q: np.percentile(values, q) * 1000
+    print(f"{label:>10}  idle p50 {ms(idle, 50):6.1f} ms  |  under load ({len(loaded)} probes) "
+          f"p50 {ms(loaded, 50):7.1f} ms p99 {ms(loaded, 99):7.1f} ms max {max(loaded) * 1000:7.1f} ms  |  "
+          f"{total_rows / elapsed:,.0f} rows/s  statuses {statuses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--batches', type=int, default=4)
+    parser.add_argument('--rows', type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        build_model_dir(model_dir)
+        os.environ['ML_MODEL_PATH'] = model_dir
+        os.environ['ML_CACHE_SIZE'] = '0'
+        import api
+
+        from executor import InferenceExecutor
+        threads = api.inference_executor
+        processes = InferenceExecutor(process_workers=args.batches, process_batch_min=1000,
+                                      model_path=model_dir)
+        modes = (('inline', InlineExecutor()), ('threads', threads), ('processes', processes))
+        for label, impl in modes:
+            api.inference_executor = impl
+            idle, loaded, elapsed, statuses = asyncio.run(run_load(api.app, args.batches, args.rows))
+            summarize(label, idle, loaded, elapsed, statuses, args.batches * args.rows)
+        threads.shutdown()
+        processes.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: cost of each explanation mode for single and batch predictions
+Compares the old per-call argsort explanation with the precomputed ranking,
+per-company contributions and explain='none'
+
+Usage:
+    python benchmarks/bench_explain.py [--model-type xgboost|random_forest] [--estimators 200]
+"""
+import argparse
+import tempfile
+import numpy as np
+
+from common import build_model_dir, synthetic_companies, time_call
+from inference import CarbonScorePredictor
+
+BATCH_SIZES = [100, 10000]
+
+
+def argsort_explanation(predictor, features, score):
+    """Explanation as built before the ranking was precomputed: argsort on every call"""
+    importances = predictor._get_importances(len(features))
+    top_indices = np.argsort(importances)[::-1][:5]
+    top_features = {
+        predictor.feature_names[idx]: {'importance': float(importances[idx]), 'value': float(features[idx])}
+        for idx in top_indices
+    }
+    return {
+        'top_features': top_features,
+        'recommendations': predictor._generate_recommendations(score, top_features),
+        'score_breakdown': {
+            'environmental_impact': min(score * 0.4, 40),
+            'sustainability_practices': min(score * 0.35, 35),
+            'regulatory_compliance': min(score * 0.25, 25)
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model-type', default='xgboost', choices=['xgboost', 'random_forest'])
+    parser.add_argument('--estimators', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        build_model_dir(model_dir, model_type=args.model_type, n_estimators=args.estimators)
+        predictor = CarbonScorePredictor(model_path=model_dir)
+        company = synthetic_companies(1, seed=1)[0]
+        features = predictor._extract_features(company)
+
+        print("\nExplanation only, one company:")
+        for label, fn in (
+            ('argsort per call', lambda: argsort_explanation(predictor, features, 60.0)),
+            ('precomputed', lambda: predictor._generate_explanation(features, 60.0)),
+        ):
+            seconds = time_call(lambda: [fn() for _ in range(1000)]) / 1000
+            print(f"   {label:>18} {seconds * 1e6:>8.1f} µs")
+
+        print(f"\n{'mode':>14} {'predict µs':>11} " + ' '.join(f"{f'batch {n:,} rows/s':>20}" for n in BATCH_SIZES))
+        for explain in ('global', 'contributions', 'none'):
+            single = time_call(lambda: [predictor.predict(company, explain=explain) for _ in range(200)]) / 200
+            rates = []
+            for size in BATCH_SIZES:
+                companies = synthetic_companies(size, seed=size)
+                rates.append(size / time_call(lambda: predictor.predict_batch(companies, explain=explain), 3))
+            print(f"{explain:>14} {single * 1e6:>11.1f} " + ' '.join(f"{rate:>20,.0f}" for rate in rates))
+
+
+if __name__ == '__main__':
+    main()
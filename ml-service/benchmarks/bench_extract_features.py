@@ -0,0 +1,76 @@
+"""
+Benchmark: per-call alias scanning vs the precompiled extraction plan
+Compares the original _extract_features implementation against
+_extract_features / _extract_matrix built from compile_extraction_plan
+
+Usage:
+    python benchmarks/bench_extract_features.py
+"""
+import tempfile
+import numpy as np
+
+from common import build_model_dir, synthetic_companies, time_call
+from inference import CarbonScorePredictor
+
+
+def legacy_extract_features(feature_names, data):
+    """The original implementation, kept here as the comparison baseline"""
+    feature_mapping = {
+        'energy_consumption': ['energy_consumption', 'energy_usage', 'power_consumption'],
+        'renewable_energy_pct': ['renewable_energy_pct', 'renewable_pct', 'clean_energy_pct'],
+        'waste_recycled_pct': ['waste_recycled_pct', 'recycling_pct', 'waste_recycling'],
+        'emissions_co2': ['emissions_co2', 'co2_emissions', 'carbon_emissions'],
+        'water_usage': ['water_usage', 'water_consumption'],
+        'employee_count': ['employee_count', 'employees', 'workforce'],
+        'production_volume': ['production_volume', 'output', 'production']
+    }
+
+    features = []
+    for feat_name in feature_names:
+        value = data.get(feat_name, None)
+        if value is None:
+            for alt_names in feature_mapping.values():
+                if feat_name in alt_names:
+                    for alt in alt_names:
+                        if alt in data:
+                            value = data[alt]
+                            break
+                    break
+        features.append(float(value) if value is not None else 0.0)
+
+    return np.array(features)
+
+
+def aliased(companies):
+    """Rename every other field to an alternative spelling to exercise alias lookup"""
+    renames = {'renewable_energy_pct': 'renewable_pct', 'emissions_co2': 'co2_emissions',
+               'employee_count': 'workforce'}
+    return [{renames.get(k, k): v for k, v in company.items()} for company in companies]
+
+
+def main():
+    with tempfile.TemporaryDirectory() as model_dir:
+        build_model_dir(model_dir)
+        predictor = CarbonScorePredictor(model_path=model_dir)
+        names = predictor.feature_names
+
+        print(f"\n{'input':>10} {'rows':>7} {'legacy rows/s':>15} {'plan row rows/s':>17} "
+              f"{'plan matrix rows/s':>19}")
+        for label, make in (('canonical', lambda c: c), ('aliased', aliased)):
+            for size in (1, 1000, 100000):
+                companies = make(synthetic_companies(size, seed=size))
+                legacy = np.vstack([legacy_extract_features(names, c) for c in companies])
+                assert np.array_equal(legacy, predictor._extract_matrix(companies))
+
+                repeat = 20 if size == 1 else 3
+                legacy_time = time_call(
+                    lambda: [legacy_extract_features(names, c) for c in companies], repeat)
+                row_time = time_call(
+                    lambda: [predictor._extract_features(c) for c in companies], repeat)
+                matrix_time = time_call(lambda: predictor._extract_matrix(companies), repeat)
+                print(f"{label:>10} {size:>7} {size / legacy_time:>15,.0f} "
+                      f"{size / row_time:>17,.0f} {size / matrix_time:>19,.0f}")
+
+
+if __name__ == '__main__':
+    main()
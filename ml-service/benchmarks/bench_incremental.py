@@ -0,0 +1,99 @@
+"""
+Benchmark: incremental model update versus full retrain on appended rows
+Trains a model on the existing rows, then either updates it with only the
+appended rows (update_model) or retrains train_model on all rows, and
+scores both, and the model before the update, on unseen companies
+
+Usage:
+    python benchmarks/bench_incremental.py [--rows 200000] [--new-rows 5000] [--estimators 200] [--drift]
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+from sklearn.metrics import mean_absolute_error
+
+from bench_preprocess import write_csv
+
+
+def companies(n_rows, seed, emissions_max=5000):
+    """
+    Synthetic companies with missing values, text columns and a fixed-rule carbon_score
+
+    A lower emissions_max penalizes emissions more, as a drifted scoring of new data would
+    """
+    from target_rule import CarbonScoreRule
+
+    with tempfile.TemporaryDirectory() as root:
+        csv = os.path.join(root, 'companies.csv')
+        write_csv(csv, n_rows, seed=seed)
+        df = pd.read_csv(csv)
+    rule = CarbonScoreRule(['renewable_energy_pct', 'waste_recycled_pct', 'emissions_co2', 'energy_consumption'],
+                           [20, 15, -25, -15], [100, 100, emissions_max, 10000])
+    # Scored after median imputation, as load_and_preprocess_data scores a synthetic target
+    df['carbon_score'] = rule.score(df.fillna(df.median(numeric_only=True)))
+    return df
+
+
+def test_mae(model_path, test):
+    """MAE of a saved model on raw test rows"""
+    from preprocess import preprocess_new_rows
+    from train_model import load_model_artifacts
+
+    model, scaler, feature_names, metadata = load_model_artifacts(model_path)
+    X, y, _ = preprocess_new_rows(test, feature_names, metadata['categories'])
+    return mean_absolute_error(y, model.predict(scaler.transform(X)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--new-rows', type=int, default=5000)
+    parser.add_argument('--estimators', type=int, default=200)
+    parser.add_argument('--update-estimators', type=int, default=50)
+    parser.add_argument('--model-type', default='xgboost', choices=['xgboost', 'random_forest'])
+    parser.add_argument('--drift', action='store_true',
+                        help='Score the appended and unseen companies with a harsher emissions term')
+    args = parser.parse_args()
+    emissions_max = 3000 if args.drift else 5000
+
+    from train_model import train_model, update_model
+
+    existing = companies(args.rows, seed=0)
+    appended = companies(args.new_rows, seed=10 ** 7, emissions_max=emissions_max)
+    test = companies(20000, seed=2 * 10 ** 7, emissions_max=emissions_max)
+
+    with tempfile.TemporaryDirectory() as root:
+        current, updated, retrained = (os.path.join(root, name) for name in ('current', 'updated', 'retrained'))
+        with contextlib.redirect_stdout(io.StringIO()):
+            train_model(args.model_type, save_path=current, data=existing, n_estimators=args.estimators)
+        shutil.copytree(current, updated)
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, metrics = update_model(data=appended, model_path=updated, n_estimators=args.update_estimators)
+        update_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            train_model(args.model_type, save_path=retrained, data=pd.concat([existing, appended], ignore_index=True),
+                        n_estimators=args.estimators)
+        retrain_seconds = time.perf_counter() - start
+
+        print(f"\n{args.rows:,} existing + {args.new_rows:,} appended rows, {args.model_type}, "
+              f"{args.estimators} trees (+{args.update_estimators} on update)"
+              f"{', appended rows drifted' if args.drift else ''}\n")
+        print(f"{'model':>28} {'seconds':>9} {'unseen MAE':>11}")
+        print(f"{'before update':>28} {'':>9} {test_mae(current, test):>11.4f}")
+        label = 'incremental update' + ('' if metrics['published'] else ' (rejected)')
+        print(f"{label:>28} {update_seconds:>9.2f} {test_mae(updated if metrics['published'] else current, test):>11.4f}")
+        print(f"{'full retrain':>28} {retrain_seconds:>9.2f} {test_mae(retrained, test):>11.4f}")
+
+
+if __name__ == '__main__':
+    main()
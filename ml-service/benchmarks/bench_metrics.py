@@ -0,0 +1,96 @@
+"""
+Benchmark: overhead of the metrics instrumentation
+Times one stage-timer lap, then predictor calls and in-process /predict
+requests with the stage timers and request middleware active, and again with
+them replaced by no-ops
+
+Usage:
+    python benchmarks/bench_metrics.py [--requests 2000]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from common import build_model_dir, synthetic_companies, time_call
+
+
+class _NoOpSeries:
+    def observe(self, value):
+        pass
+
+    def lap(self, start):
+        return time.perf_counter()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        build_model_dir(model_dir)
+        os.environ['ML_MODEL_PATH'] = model_dir
+        os.environ['ML_CACHE_SIZE'] = '0'
+        import api
+        import executor
+        import inference
+        import metrics
+        from fastapi.testclient import TestClient
+
+        company = synthetic_companies(1, seed=1)[0]
+        batch = synthetic_companies(1000, seed=2)
+        client = TestClient(api.app)
+        stage_series = {
+            (module, name): getattr(module, name)
+            for module, names in (
+                (inference, ('_EXTRACT', '_CACHE', '_SCALE', '_MODEL', '_EXPLAIN')),
+                (api, ('_VALIDATE', '_SERIALIZE')),
+                (executor, ('_QUEUE',)),
+            )
+            for name in names
+        }
+
+        def set_instrumented(enabled):
+            for (module, name), series in stage_series.items():
+                setattr(module, name, series if enabled else _NoOpSeries())
+            metrics.REQUEST_SECONDS.labels = (
+                type(metrics.REQUEST_SECONDS).labels.__get__(metrics.REQUEST_SECONDS)
+                if enabled else lambda *values: _NoOpSeries()
+            )
+
+        cases = [
+            ('predict()', lambda: [api.predictor.predict(company) for _ in range(args.requests)],
+             args.requests),
+            ('predict_batch(1000)', lambda: api.predictor.predict_batch(batch), 1),
+            ('POST /predict', lambda: [client.post('/predict', json=company) for _ in range(args.requests // 4)],
+             args.requests // 4),
+        ]
+
+        series = metrics.STAGE_SECONDS.labels('benchmark')
+        laps = 100000
+
+        def lap_loop():
+            start = time.perf_counter()
+            for _ in range(laps):
+                start = series.lap(start)
+
+        print(f"\nStage timer: {time_call(lap_loop) / laps * 1e9:.0f} ns per lap "
+              f"(predict() records 4-5 laps)")
+
+        print(f"\n{'call':>20} {'plain µs':>10} {'metrics µs':>11} {'overhead':>9}")
+        for label, run, calls in cases:
+            # Alternate the two setups so drift in machine load affects both alike
+            timings = {False: float('inf'), True: float('inf')}
+            for _ in range(10):
+                for enabled in (False, True):
+                    set_instrumented(enabled)
+                    timings[enabled] = min(timings[enabled], time_call(run, 1) / calls)
+            plain, measured = timings[False], timings[True]
+            print(f"{label:>20} {plain * 1e6:>10.1f} {measured * 1e6:>11.1f} "
+                  f"{100 * (measured - plain) / plain:>8.1f}%")
+        api.inference_executor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
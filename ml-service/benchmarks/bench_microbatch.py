@@ -0,0 +1,76 @@
+"""
+Benchmark: /predict throughput and latency with micro-batching on and off
+Drives concurrent single-company requests through the app in-process
+
+Usage:
+    python benchmarks/bench_microbatch.py [--requests 2000] [--wait-ms 2] [--max-batch 64]
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+import numpy as np
+
+from common import build_model_dir, synthetic_companies
+
+CONCURRENCY_LEVELS = [1, 8, 32, 128]
+
+
+async def drive(app, bodies, concurrency):
+    import httpx
+    queue = list(reversed(bodies))
+    latencies = []
+    headers = {'content-type': 'application/json'}
+
+    async def user(client):
+        while queue:
+            body = queue.pop()
+            start = time.perf_counter()
+            response = await client.post('/predict', content=body, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        start = time.perf_counter()
+        await asyncio.gather(*[user(client) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+    return len(bodies) / elapsed, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--wait-ms', type=float, default=2.0)
+    parser.add_argument('--max-batch', type=int, default=64)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        build_model_dir(model_dir, n_estimators=200)
+        os.environ['ML_MODEL_PATH'] = model_dir
+        os.environ['ML_CACHE_SIZE'] = '0'
+        os.environ['ML_MAX_PENDING'] = '1024'
+        import api
+        from batcher import MicroBatcher
+
+        bodies = [json.dumps(c).encode() for c in synthetic_companies(args.requests, seed=3)]
+        print(f"\n{'concurrency':>11} {'batching':>9} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'mean batch':>11}")
+        for concurrency in CONCURRENCY_LEVELS:
+            for batching in (False, True):
+                batcher = None
+                if batching:
+                    batcher = MicroBatcher(api._score_coalesced, api.inference_executor,
+                                           max_wait_ms=args.wait_ms, max_batch=args.max_batch)
+                api.prediction_batchers = {'global': batcher} if batcher else None
+                throughput, latencies = asyncio.run(drive(api.app, bodies, concurrency))
+                mean_batch = batcher.stats()['mean_batch_size'] if batcher else 1.0
+                print(f"{concurrency:>11} {'on' if batching else 'off':>9} {throughput:>9,.0f} "
+                      f"{np.percentile(latencies, 50) * 1000:>8.2f} "
+                      f"{np.percentile(latencies, 99) * 1000:>8.2f} {mean_batch:>11.1f}")
+        api.inference_executor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
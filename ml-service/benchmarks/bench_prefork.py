@@ -0,0 +1,128 @@
+"""
+Benchmark: per-worker memory and aggregate throughput of serve.py as workers scale
+Starts the pre-fork server with 1..CPU-count workers, loads it with /batch-predict
+traffic from client processes, and reads each worker's RSS, PSS and the share of
+the model bundle mapping that is shared between processes
+
+Usage:
+    python benchmarks/bench_prefork.py [--estimators 1000] [--duration 5] [--max-workers N]
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from common import SRC_DIR, build_model_dir, synthetic_companies
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def worker_pids(master_pid):
+    with open(f'/proc/{master_pid}/task/{master_pid}/children') as f:
+        return [int(pid) for pid in f.read().split()]
+
+
+def memory_kib(pid):
+    """RSS and PSS of a process, plus RSS and shared part of its .bundle mapping (KiB)"""
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        rollup = {line.split(':')[0]: int(line.split()[1]) for line in f if line.endswith('kB\n')}
+    bundle_rss = bundle_shared = 0
+    in_bundle = False
+    with open(f'/proc/{pid}/smaps') as f:
+        for line in f:
+            fields = line.split()
+            if '-' in fields[0] and ':' not in fields[0]:
+                in_bundle = fields[-1].endswith('.bundle')
+            elif in_bundle and fields[0] == 'Rss:':
+                bundle_rss += int(fields[1])
+            elif in_bundle and fields[0] in ('Shared_Clean:', 'Shared_Dirty:'):
+                bundle_shared += int(fields[1])
+    return rollup['Rss'], rollup['Pss'], bundle_rss, bundle_shared
+
+
+def client(base_url, body, duration):
+    import httpx
+    done = 0
+    deadline = time.perf_counter() + duration
+    with httpx.Client(base_url=base_url, timeout=None) as session:
+        while time.perf_counter() < deadline:
+            response = session.post('/batch-predict', content=body,
+                                    headers={'content-type': 'application/json'})
+            response.raise_for_status()
+            done += 1
+    return done
+
+
+def start_server(model_dir, workers):
+    import httpx
+    port = free_port()
+    env = dict(os.environ, ML_MODEL_PATH=model_dir, ML_CACHE_SIZE='0', ML_MAX_PENDING='1024')
+    server = subprocess.Popen(
+        [sys.executable, 'serve.py', '--port', str(port), '--workers', str(workers),
+         '--host', '127.0.0.1', '--log-level', 'warning'],
+        cwd=SRC_DIR, env=env, stdout=subprocess.DEVNULL
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    for _ in range(300):
+        try:
+            httpx.get(f'{base_url}/health')
+            if len(worker_pids(server.pid)) == workers:
+                return server, base_url
+        except httpx.TransportError:
+            pass
+        time.sleep(0.1)
+    server.kill()
+    raise RuntimeError('Server did not start')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--estimators', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--rows', type=int, default=100, help='Companies per request')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({n for n in (1, 2, 4, 8, 16, 32) if n < args.max_workers} | {args.max_workers})
+    body = json.dumps(synthetic_companies(args.rows, seed=11)).encode()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        build_model_dir(model_dir, n_estimators=args.estimators)
+        bundle = os.path.join(model_dir, 'carbon_score_model_xgboost.bundle')
+        print(f"\nBundle {os.path.getsize(bundle) / 2**20:.1f} MiB, {cores} cores, "
+              f"{args.rows} companies per request\n")
+        print(f"{'workers':>7} {'req/s':>8} {'rows/s':>9} {'RSS/worker':>11} {'PSS/worker':>11} "
+              f"{'PSS total':>10} {'bundle RSS':>11} {'shared':>7}")
+
+        for workers in worker_counts:
+            server, base_url = start_server(model_dir, workers)
+            try:
+                clients = max(4, 2 * workers)
+                with ProcessPoolExecutor(clients) as pool:
+                    counts = pool.map(client, [base_url] * clients, [body] * clients,
+                                      [args.duration] * clients)
+                    throughput = sum(counts) / args.duration
+                memory = [memory_kib(pid) for pid in worker_pids(server.pid)]
+            finally:
+                server.terminate()
+                server.wait()
+
+            rss, pss, bundle_rss, bundle_shared = (sum(column) / len(memory) for column in zip(*memory))
+            shared_pct = 100 * bundle_shared / bundle_rss if bundle_rss else 0.0
+            print(f"{workers:>7} {throughput:>8,.0f} {throughput * args.rows:>9,.0f} "
+                  f"{rss / 1024:>8.1f} MiB {pss / 1024:>8.1f} MiB {pss * workers / 1024:>6.1f} MiB "
+                  f"{bundle_rss / 1024:>7.1f} MiB {shared_pct:>6.0f}%")
+
+
+if __name__ == '__main__':
+    main()
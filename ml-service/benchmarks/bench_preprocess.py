@@ -0,0 +1,94 @@
+"""
+Benchmark: peak memory of in-memory versus chunked training-data preprocessing
+Writes a synthetic CSV with missing values and text columns, preprocesses it
+with load_and_preprocess_data and with stream_preprocess_data, each in a
+fresh interpreter, and reports wall time and peak resident memory
+
+Usage:
+    python benchmarks/bench_preprocess.py [--rows 2000000] [--chunksize 100000]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from common import COMPANY_FIELDS, SRC_DIR, synthetic_matrix
+
+# Runs in the child: peak RSS (KiB on Linux) after imports and after preprocessing
+CHILD = """
+import contextlib, io, json, resource, sys, time
+sys.path.insert(0, {src!r})
+import numpy as np
+from preprocess import load_and_preprocess_data, stream_preprocess_data
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    if {mode!r} == 'stream':
+        X, y, features, scaler, *_ = stream_preprocess_data({csv!r}, {out!r}, chunksize={chunksize})
+    else:
+        X, y, features, scaler, *_ = load_and_preprocess_data({csv!r})
+seconds = time.perf_counter() - start
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if {mode!r} == 'full':
+    np.save({out!r} + '/features.npy', X.astype(np.float32))
+    np.save({out!r} + '/target.npy', y)
+print(json.dumps({{'seconds': seconds, 'baseline_kib': before, 'peak_kib': after, 'features': features}}))
+"""
+
+
+def write_csv(path, n_rows, seed=0, chunk_rows=500000):
+    """Synthetic companies with 5% missing numbers and two text columns, written in chunks"""
+    rng = np.random.default_rng(seed)
+    for start in range(0, n_rows, chunk_rows):
+        rows = min(chunk_rows, n_rows - start)
+        df = pd.DataFrame(synthetic_matrix(rows, seed=seed + start), columns=COMPANY_FIELDS)
+        df = df.mask(rng.random(df.shape) < 0.05)
+        df['sector'] = rng.choice(['energy', 'manufacturing', 'retail', 'tech', 'transport'], rows)
+        df['region'] = rng.choice(['APAC', 'EU', 'LATAM', 'NA'], rows)
+        df.loc[rng.random(rows) < 0.05, 'region'] = None
+        df.to_csv(path, mode='a' if start else 'w', header=not start, index=False)
+
+
+def run(mode, csv, out, chunksize):
+    code = CHILD.format(src=SRC_DIR, mode=mode, csv=csv, out=out, chunksize=chunksize)
+    output = subprocess.run([sys.executable, '-c', code], cwd=SRC_DIR,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2000000)
+    parser.add_argument('--chunksize', type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        csv = os.path.join(root, 'companies.csv')
+        write_csv(csv, args.rows)
+        print(f"\n{args.rows:,} rows, CSV {os.path.getsize(csv) / 2 ** 20:,.0f} MiB, "
+              f"chunksize {args.chunksize:,}\n")
+        print(f"{'path':>8} {'seconds':>8} {'peak MiB':>9} {'above imports MiB':>18}")
+        results = {}
+        for mode in ('full', 'stream'):
+            out = os.path.join(root, mode)
+            os.makedirs(out)
+            result = results[mode] = run(mode, csv, out, args.chunksize)
+            print(f"{mode:>8} {result['seconds']:>8.2f} {result['peak_kib'] / 1024:>9,.0f} "
+                  f"{(result['peak_kib'] - result['baseline_kib']) / 1024:>18,.0f}")
+
+        assert results['full']['features'] == results['stream']['features'], "feature names differ"
+        full_X = np.load(os.path.join(root, 'full', 'features.npy'), mmap_mode='r')
+        stream_X = np.load(os.path.join(root, 'stream', 'features.npy'), mmap_mode='r')
+        full_y = np.load(os.path.join(root, 'full', 'target.npy'), mmap_mode='r')
+        stream_y = np.load(os.path.join(root, 'stream', 'target.npy'), mmap_mode='r')
+        print(f"\nmax |X difference| {np.abs(full_X - stream_X).max():.2e} (approximate medians), "
+              f"max |y difference| {np.abs(full_y - stream_y).max():.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark: preprocessing a training CSV versus loading it from PreprocessCache
+Times load_training_data cold (preprocess and store), warm (memory-mapped
+cache hit) and after the CSV is touched (rehash, still a hit), for the
+in-memory and chunked preprocessing paths
+
+Usage:
+    python benchmarks/bench_preprocess_cache.py [--rows 500000] [--chunksize 100000]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from bench_preprocess import write_csv
+
+
+def timed_load(csv, work_dir, cache_dir, chunksize):
+    from train_model import load_training_data
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = load_training_data(csv, chunksize=chunksize, work_dir=work_dir, cache_dir=cache_dir)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--chunksize', type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        csv = os.path.join(root, 'companies.csv')
+        write_csv(csv, args.rows)
+        print(f"\n{args.rows:,} rows, CSV {os.path.getsize(csv) / 2 ** 20:,.0f} MiB\n")
+        print(f"{'path':>8} {'cold':>8} {'warm':>8} {'touched':>8}  identical")
+        for mode, chunksize in (('full', None), ('stream', args.chunksize)):
+            cache_dir = os.path.join(root, 'cache-' + mode)
+            work_dir = os.path.join(root, 'work-' + mode)
+            os.makedirs(work_dir)
+            cold, (X, y, features, *_) = timed_load(csv, work_dir, cache_dir, chunksize)
+            warm, (X_hit, y_hit, features_hit, *_) = timed_load(csv, work_dir, cache_dir, chunksize)
+            os.utime(csv)
+            touched, _ = timed_load(csv, work_dir, cache_dir, chunksize)
+            identical = features == features_hit and np.array_equal(X, X_hit) and np.array_equal(y, y_hit)
+            print(f"{mode:>8} {cold:>8.2f} {warm:>8.3f} {touched:>8.3f}  {identical}")
+
+
+if __name__ == '__main__':
+    main()
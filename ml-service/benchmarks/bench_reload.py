@@ -0,0 +1,125 @@
+"""
+Benchmark: request latency and errors while hot-swapping models from the registry
+Drives /predict and /batch-predict continuously while alternating between two
+registry versions, and fails if any request errors or is served a stale model
+
+Usage:
+    python benchmarks/bench_reload.py [--swaps 10] [--concurrency 16] [--process-workers 0]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+from common import build_model_dir, synthetic_companies
+
+BATCH_ROWS = 200
+
+
+async def drive(app, args, versions):
+    import httpx
+    companies = synthetic_companies(1000, seed=5)
+    single_bodies = [json.dumps(c).encode() for c in companies]
+    batch_body = json.dumps(companies[:BATCH_ROWS]).encode()
+    headers = {'content-type': 'application/json'}
+    records = []       # (start, latency, endpoint, status, model_version)
+    swaps = []         # (start, end, version)
+    stop = asyncio.Event()
+
+    async def client_loop(client, worker):
+        i = worker
+        while not stop.is_set():
+            batch = i % 4 == 0
+            start = time.perf_counter()
+            if batch:
+                response = await client.post('/batch-predict', content=batch_body, headers=headers)
+            else:
+                response = await client.post('/predict', content=single_bodies[i % len(single_bodies)],
+                                             headers=headers)
+            latency = time.perf_counter() - start
+            version = None
+            if response.status_code == 200:
+                body = response.json()
+                version = body['predictions'][0]['model_version'] if batch else body['model_version']
+            records.append((start, latency, 'batch' if batch else 'single', response.status_code, version))
+            i += args.concurrency
+
+    async def swapper(client):
+        await asyncio.sleep(args.settle)
+        for n in range(args.swaps):
+            version = versions[(n + 1) % len(versions)]
+            start = time.perf_counter()
+            response = await client.post('/admin/reload', json={'version': version})
+            assert response.status_code == 200, response.text
+            swaps.append((start, time.perf_counter(), version))
+            await asyncio.sleep(args.settle)
+        stop.set()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=None) as client:
+        await asyncio.gather(swapper(client), *[client_loop(client, w) for w in range(args.concurrency)])
+    return records, swaps
+
+
+def stale_responses(records, swaps):
+    """Responses to requests sent after a swap finished that still carry an older version"""
+    stale = 0
+    for i, (_, end, version) in enumerate(swaps):
+        next_start = swaps[i + 1][0] if i + 1 < len(swaps) else float('inf')
+        stale += sum(1 for start, _, _, status, seen in records
+                     if end < start < next_start and status == 200 and seen != version)
+    return stale
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--swaps', type=int, default=10)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--settle', type=float, default=0.5, help='Seconds between swaps')
+    parser.add_argument('--process-workers', type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        from registry import ModelRegistry
+        registry = ModelRegistry(os.path.join(root, 'registry'))
+        versions = []
+        for name, n_estimators in (('v1', 50), ('v2', 200)):
+            model_dir = build_model_dir(os.path.join(root, name), n_estimators=n_estimators)
+            versions.append(registry.publish(model_dir, version=name))
+        registry.activate(versions[0])
+
+        os.environ.update({
+            'ML_REGISTRY_PATH': registry.root,
+            'ML_MAX_PENDING': '1024',
+            'ML_PROCESS_WORKERS': str(args.process_workers),
+            'ML_PROCESS_BATCH_MIN': str(BATCH_ROWS)
+        })
+        import api
+        records, swaps = asyncio.run(drive(api.app, args, versions))
+        api.inference_executor.shutdown()
+
+    latencies = np.array([latency for _, latency, *_ in records]) * 1000
+    during = np.array([latency for start, latency, *_ in records
+                       if any(s <= start <= e for s, e, _ in swaps)]) * 1000
+    failures = sum(1 for *_, status, _ in records if status != 200)
+    stale = stale_responses(records, swaps)
+    swap_ms = [(end - start) * 1000 for start, end, _ in swaps]
+
+    print(f"\n{len(records):,} requests, {len(swaps)} swaps "
+          f"(reload {np.median(swap_ms):.0f} ms median, {max(swap_ms):.0f} ms max)")
+    print(f"{'':>14} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for label, values in (('all requests', latencies), ('during swaps', during)):
+        if len(values):
+            print(f"{label:>14} {np.percentile(values, 50):>8.2f} {np.percentile(values, 99):>8.2f} "
+                  f"{values.max():>8.2f}")
+    print(f"failed requests: {failures}, stale-version responses: {stale}")
+    if failures or stale:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
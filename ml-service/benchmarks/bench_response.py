@@ -0,0 +1,60 @@
+"""
+Benchmark: /batch-predict response size and serialization time by verbosity
+Compares the response-model path (Pydantic validation + jsonable_encoder +
+json.dumps) with the direct stdlib json and orjson paths, at 1k and 100k rows
+
+Usage:
+    python benchmarks/bench_response.py [--rows 1000 100000]
+"""
+import argparse
+import json
+import os
+import tempfile
+
+from common import build_model_dir, synthetic_companies, time_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 100000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        build_model_dir(model_dir)
+        os.environ['ML_MODEL_PATH'] = model_dir
+        import api
+        from fastapi.encoders import jsonable_encoder
+
+        def response_model_path(results):
+            rows = [api.PredictionResponse(**result).model_dump() for result in results]
+            return json.dumps(jsonable_encoder({'predictions': rows, 'count': len(rows)})).encode()
+
+        def render_with(serializer, results, fields):
+            saved = api.orjson
+            api.orjson = serializer
+            try:
+                return api._render_predictions(results, fields)
+            finally:
+                api.orjson = saved
+
+        print(f"\n{'rows':>8} {'fields':>9} {'path':>15} {'bytes/row':>10} {'total MiB':>10} {'ms':>9}")
+        for rows in args.rows:
+            companies = synthetic_companies(rows, seed=rows)
+            repeat = 3 if rows <= 10000 else 1
+            for fields in ('full', 'category', 'score'):
+                results = api._score_batch(companies, api._effective_explain('global', fields))
+                paths = [('stdlib json', lambda: render_with(None, results, fields))]
+                if api.orjson is not None:
+                    paths.append(('orjson', lambda: render_with(api.orjson, results, fields)))
+                if fields == 'full':
+                    paths.insert(0, ('response model', lambda: response_model_path(results)))
+                for label, render in paths:
+                    size = len(render())
+                    seconds = time_call(render, repeat)
+                    print(f"{rows:>8,} {fields:>9} {label:>15} {size / rows:>10.0f} "
+                          f"{size / 2**20:>10.2f} {seconds * 1000:>9.1f}")
+        api.inference_executor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: successive-halving search versus fitting every setting with all its trees
+Both score the same sampled settings on the same validation fold; the full
+search fits each one serially with max_estimators trees and no early stopping
+
+Usage:
+    python benchmarks/bench_search.py [--rows 20000] [--trials 27] [--max-estimators 600]
+"""
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+
+import pandas as pd
+from sklearn.metrics import mean_absolute_error
+
+from common import COMPANY_FIELDS, synthetic_matrix
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--trials', type=int, default=27)
+    parser.add_argument('--min-estimators', type=int, default=50)
+    parser.add_argument('--max-estimators', type=int, default=600)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    from preprocess import load_and_preprocess_data
+    from train_model import SEARCH_SPACE, build_model, fold_indices, sample_settings, search_hyperparameters
+
+    data = pd.DataFrame(synthetic_matrix(args.rows, seed=42), columns=COMPANY_FIELDS)
+    with contextlib.redirect_stdout(io.StringIO()):
+        X, y, *_ = load_and_preprocess_data(data=data)
+    train_index, _ = fold_indices(len(y))[0]
+    fit_rows, valid_rows = fold_indices(len(train_index))[0]
+    fit_index, valid_index = train_index[fit_rows], train_index[valid_rows]
+    settings = sample_settings(SEARCH_SPACE['xgboost'], args.trials)
+
+    start = time.perf_counter()
+    full_scores = []
+    for params in settings:
+        model = build_model('xgboost', args.max_estimators, **params)
+        model.fit(X[fit_index], y[fit_index])
+        full_scores.append(mean_absolute_error(y[valid_index], model.predict(X[valid_index])))
+    full_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as save_path:
+        with contextlib.redirect_stdout(io.StringIO()):
+            _, metrics, table = search_hyperparameters(
+                save_path=save_path, data=data, n_trials=args.trials, min_estimators=args.min_estimators,
+                max_estimators=args.max_estimators, workers=args.workers
+            )
+
+    print(f"\n{args.rows:,} rows, {len(settings)} xgboost settings, up to {args.max_estimators} trees\n")
+    print(f"{'search':>28} {'fits':>5} {'tree budget':>13} {'seconds':>8} {'best validation MAE':>20}")
+    print(f"{'every setting, all trees':>28} {len(settings):>5} {len(settings) * args.max_estimators:>13,} "
+          f"{full_seconds:>8.2f} {min(full_scores):>20.4f}")
+    print(f"{'successive halving':>28} {len(table):>5} {int(table['n_estimators'].sum()):>13,} "
+          f"{metrics['stage_seconds']['search']:>8.2f} {metrics['validation_mae']:>20.4f}")
+    rank = sorted(full_scores).index(full_scores[int(table.loc[table['validation_mae'].idxmin(), 'trial'])]) + 1
+    print(f"\nHalving's pick ranks {rank} of {len(settings)} by the full search's validation MAE")
+
+
+if __name__ == '__main__':
+    main()
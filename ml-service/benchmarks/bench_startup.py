@@ -0,0 +1,81 @@
+"""
+Benchmark: cold-start time of the ML service with joblib artifacts vs the model bundle
+Each measurement is a fresh interpreter, timed from process launch to the first prediction
+
+Usage:
+    python benchmarks/bench_startup.py [--runs 7] [--estimators 300]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+from common import SRC_DIR, build_model_dir
+
+# Runs in the child: reports import and load times and the heavy modules pulled in
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {src!r})
+if {target!r} == 'api':
+    import api
+    predictor = api.predictor
+    imported = loaded = time.perf_counter()
+else:
+    from inference import CarbonScorePredictor
+    imported = time.perf_counter()
+    predictor = CarbonScorePredictor(model_path={model_dir!r})
+    loaded = time.perf_counter()
+predictor.predict({{'energy_consumption': 5000, 'renewable_energy_pct': 40}})
+done = time.perf_counter()
+heavy = sorted(name for name in ('joblib', 'sklearn', 'xgboost', 'pandas', 'uvicorn') if name in sys.modules)
+print(json.dumps({{'import': imported - start, 'load': loaded - imported,
+                   'first_predict': done - loaded, 'heavy': heavy}}))
+"""
+
+
+def cold_start(target, model_dir):
+    env = dict(os.environ, ML_MODEL_PATH=model_dir)
+    code = CHILD.format(src=SRC_DIR, target=target, model_dir=model_dir)
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', code], cwd=SRC_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    wall = time.perf_counter() - start
+    return wall, json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--estimators', type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        layouts = {
+            'joblib': build_model_dir(os.path.join(root, 'joblib'), n_estimators=args.estimators,
+                                      compiled=False),
+            'bundle': build_model_dir(os.path.join(root, 'bundle'), n_estimators=args.estimators),
+        }
+        bundle_file = os.path.join(layouts['bundle'], 'carbon_score_model_xgboost.bundle')
+        print(f"\nBundle size: {os.path.getsize(bundle_file) / 1024:.0f} KiB, "
+              f"median of {args.runs} cold starts\n")
+        print(f"{'target':>9} {'artifacts':>9} {'wall ms':>8} {'import ms':>10} {'load ms':>8} "
+              f"{'1st pred ms':>12}  heavy modules imported")
+        for target in ('inference', 'api'):
+            for layout, model_dir in layouts.items():
+                cold_start(target, model_dir)    # warm the OS page cache
+                runs = [cold_start(target, model_dir) for _ in range(args.runs)]
+                wall = np.median([wall for wall, _ in runs]) * 1000
+                stage = {key: np.median([child[key] for _, child in runs]) * 1000
+                         for key in ('import', 'load', 'first_predict')}
+                print(f"{target:>9} {layout:>9} {wall:>8.0f} {stage['import']:>10.0f} "
+                      f"{stage['load']:>8.1f} {stage['first_predict']:>12.2f}  "
+                      f"{', '.join(runs[0][1]['heavy']) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
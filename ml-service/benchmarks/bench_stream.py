@@ -0,0 +1,110 @@
+"""
+Benchmark: server memory and throughput of /predict/stream vs /batch-predict
+Runs the service under uvicorn in a subprocess, uploads generated NDJSON with a
+chunked streaming client, and reports the server's peak RSS (VmHWM) per run
+
+Usage:
+    python benchmarks/bench_stream.py [--rows 200000]
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import SRC_DIR, build_model_dir, synthetic_companies
+
+GENERATE_BATCH = 1000
+
+
+def ndjson_body(rows):
+    for start in range(0, rows, GENERATE_BATCH):
+        batch = synthetic_companies(min(GENERATE_BATCH, rows - start), seed=start)
+        yield ''.join(json.dumps(company) + '\n' for company in batch).encode()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def peak_rss_mib(pid):
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) / 1024
+    return float('nan')
+
+
+def start_server(model_dir):
+    port = free_port()
+    env = dict(os.environ, ML_MODEL_PATH=model_dir, ML_CACHE_SIZE='0')
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'api:app', '--port', str(port), '--log-level', 'warning'],
+        cwd=SRC_DIR, env=env, stdout=subprocess.DEVNULL
+    )
+    import httpx
+    for _ in range(200):
+        try:
+            httpx.get(f'http://127.0.0.1:{port}/health')
+            return server, f'http://127.0.0.1:{port}'
+        except httpx.TransportError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError('Server did not start')
+
+
+def run_stream(base_url, rows):
+    import httpx
+    count = 0
+    with httpx.stream('POST', f'{base_url}/predict/stream', content=ndjson_body(rows),
+                      headers={'content-type': 'application/x-ndjson'}, timeout=None) as response:
+        for _ in response.iter_lines():
+            count += 1
+    return count
+
+
+def run_batch(base_url, rows):
+    import httpx
+    body = b'[' + b','.join(b''.join(ndjson_body(rows)).splitlines()) + b']'
+    response = httpx.post(f'{base_url}/batch-predict', content=body,
+                          headers={'content-type': 'application/json'}, timeout=None)
+    return response.json()['count']
+
+
+def measure(label, run, model_dir, rows):
+    # A fresh server per run so VmHWM reflects this run alone
+    server, base_url = start_server(model_dir)
+    try:
+        baseline = peak_rss_mib(server.pid)
+        start = time.perf_counter()
+        count = run(base_url, rows)
+        elapsed = time.perf_counter() - start
+        peak = peak_rss_mib(server.pid)
+    finally:
+        server.terminate()
+        server.wait()
+    print(f"{label:>16} {rows:>9,} rows  {count:>9,} results  {rows / elapsed:>9,.0f} rows/s  "
+          f"server peak RSS {peak:>7.1f} MiB (+{peak - baseline:.1f} MiB over idle)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        build_model_dir(model_dir)
+        print()
+        for rows in (args.rows // 10, args.rows):
+            measure('/predict/stream', run_stream, model_dir, rows)
+        for rows in (args.rows // 10, args.rows):
+            measure('/batch-predict', run_batch, model_dir, rows)
+
+
+if __name__ == '__main__':
+    main()
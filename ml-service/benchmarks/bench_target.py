@@ -0,0 +1,74 @@
+"""
+Benchmark: synthetic carbon score target, per-column loop versus CarbonScoreRule
+Scores a wide float32 frame (a few dozen environmental columns among hundreds
+of others) with the former create_carbon_score loop and with the fitted rule
+
+Usage:
+    python benchmarks/bench_target.py [--rows 1000000] [--columns 520]
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from common import time_call
+
+# Environmental column names matching the score terms, repeated with a suffix
+ENVIRONMENTAL_COLUMNS = ['renewable_energy_pct', 'clean_energy_mwh', 'waste_recycled_pct',
+                         'waste_reduction_tons', 'emissions_co2', 'scope2_co2', 'energy_consumption',
+                         'power_usage_kwh']
+
+
+def per_column_score(df):
+    """create_carbon_score as it was: every term over every column name"""
+    score = 50
+    for col in df.columns:
+        col_lower = col.lower()
+        if 'renewable' in col_lower or 'clean_energy' in col_lower:
+            score += (df[col] / df[col].max() * 20).fillna(0)
+        if 'recycl' in col_lower or 'waste' in col_lower and 'reduction' in col_lower:
+            score += (df[col] / df[col].max() * 15).fillna(0)
+        if 'emission' in col_lower or 'co2' in col_lower:
+            score -= (df[col] / df[col].max() * 25).fillna(0)
+        if 'energy_consumption' in col_lower or 'power_usage' in col_lower:
+            score -= (df[col] / df[col].max() * 15).fillna(0)
+    return np.clip(score, 0, 100)
+
+
+def wide_frame(n_rows, n_columns, n_environmental=40, seed=0):
+    """float32 frame with n_environmental scored columns and 1% missing values in them"""
+    rng = np.random.default_rng(seed)
+    names = [f'{ENVIRONMENTAL_COLUMNS[i % len(ENVIRONMENTAL_COLUMNS)]}_{i}' for i in range(n_environmental)]
+    names += [f'metric_{i}' for i in range(n_columns - n_environmental)]
+    values = rng.random((n_rows, n_columns), dtype=np.float32)
+    values[:, :n_environmental][rng.random((n_rows, n_environmental)) < 0.01] = np.nan
+    return pd.DataFrame(values, columns=names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--columns', type=int, default=520)
+    args = parser.parse_args()
+
+    from target_rule import CarbonScoreRule
+
+    df = wide_frame(args.rows, args.columns)
+    rule = CarbonScoreRule.fit(df)
+    difference = np.abs(np.asarray(per_column_score(df)) - rule.score(df)).max()
+
+    cases = [
+        ('per-column loop', lambda: per_column_score(df)),
+        ('CarbonScoreRule.fit + score', lambda: CarbonScoreRule.fit(df).score(df)),
+        ('CarbonScoreRule.score (fitted)', lambda: rule.score(df)),
+    ]
+    print(f"\n{args.rows:,} rows x {args.columns} columns, {len(rule.columns)} scored, "
+          f"max score difference {difference:.1e}\n")
+    print(f"{'path':>32} {'seconds':>9} {'rows/s':>14}")
+    for label, run in cases:
+        seconds = time_call(run, 3)
+        print(f"{label:>32} {seconds:>9.3f} {args.rows / seconds:>14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: training and evaluation time, former serial script versus fold-parallel train_model
+The former script fitted the train split, re-predicted it, then ran
+cross_val_score with five more fits; train_model now fits the folds once,
+in parallel, and keeps the first fold's model
+
+Usage:
+    python benchmarks/bench_training.py [--rows 50000] [--estimators 200] [--workers 1 4]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from common import COMPANY_FIELDS, synthetic_matrix
+
+
+def former_training(X, y, model_type, n_estimators):
+    """Fit, evaluate and cross-validate as train_model did before fold reuse"""
+    from sklearn.metrics import mean_absolute_error
+    from sklearn.model_selection import cross_val_score, train_test_split
+    from train_model import build_model
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    model = build_model(model_type, n_estimators)
+    model.fit(X_train, y_train)
+    mean_absolute_error(y_train, model.predict(X_train))
+    test_mae = mean_absolute_error(y_test, model.predict(X_test))
+    cross_val_score(model, X, y, cv=5, scoring='neg_mean_absolute_error')
+    return test_mae
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--estimators', type=int, default=200)
+    parser.add_argument('--model-type', default='xgboost', choices=['xgboost', 'random_forest'])
+    parser.add_argument('--workers', type=int, nargs='*', default=None,
+                        help='Fold worker counts to try (default: 1 and the CPU count)')
+    args = parser.parse_args()
+    worker_counts = args.workers or sorted({1, min(os.cpu_count() or 1, 5)})
+
+    from train_model import cross_validate, fold_indices, train_model
+
+    data = pd.DataFrame(synthetic_matrix(args.rows, seed=42), columns=COMPANY_FIELDS)
+    X = data.to_numpy()
+    y = data['renewable_energy_pct'].to_numpy() * 0.5 - data['emissions_co2'].to_numpy() / 500 + 50
+
+    print(f"\n{args.rows:,} rows, {args.model_type}, {args.estimators} trees, {os.cpu_count()} CPUs\n")
+    print(f"{'training + evaluation':>32} {'seconds':>9} {'test MAE':>9}")
+    start = time.perf_counter()
+    test_mae = former_training(X, y, args.model_type, args.estimators)
+    print(f"{'former script (6 fits, serial)':>32} {time.perf_counter() - start:>9.2f} {test_mae:>9.4f}")
+    for workers in worker_counts:
+        start = time.perf_counter()
+        results, _ = cross_validate(X, y, fold_indices(len(y)), args.model_type, args.estimators, workers)
+        label = f'fold reuse (5 fits, {workers} worker{"s" if workers > 1 else ""})'
+        print(f"{label:>32} {time.perf_counter() - start:>9.2f} {results[0]['mae']:>9.4f}")
+
+    print(f"\n{'train_model end to end':>32} {'seconds':>9}  stages")
+    for workers in worker_counts:
+        with tempfile.TemporaryDirectory() as save_path:
+            with contextlib.redirect_stdout(io.StringIO()):
+                _, metrics = train_model(model_type=args.model_type, save_path=save_path, data=data,
+                                         n_estimators=args.estimators, cv_workers=workers)
+        stages = metrics['stage_seconds']
+        label = f'{workers} worker{"s" if workers > 1 else ""}'
+        print(f"{label:>32} {sum(stages.values()):>9.2f}  "
+              + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in stages.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Benchmark: numpy TreeEnsemble engine vs the unpickled xgboost/sklearn model
+Checks prediction parity, then reports single-row latency and batch rows/sec
+
+Usage:
+    python benchmarks/bench_tree_engine.py [--model-type xgboost|random_forest]
+"""
+import argparse
+import tempfile
+import numpy as np
+
+from common import build_model_dir, synthetic_companies, time_call
+from inference import CarbonScorePredictor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model-type', default='xgboost', choices=['xgboost', 'random_forest'])
+    parser.add_argument('--n-estimators', type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        build_model_dir(model_dir, model_type=args.model_type, n_estimators=args.n_estimators)
+        native = CarbonScorePredictor(model_path=model_dir, use_compiled=False)
+        compiled = CarbonScorePredictor(model_path=model_dir, use_compiled=True)
+
+        companies = synthetic_companies(10000, seed=7)
+        native_scores = np.array([p['score'] for p in native.predict_batch(companies)])
+        compiled_scores = np.array([p['score'] for p in compiled.predict_batch(companies)])
+        print(f"\nParity on {len(companies)} rows: max |diff| = "
+              f"{np.max(np.abs(native_scores - compiled_scores)):.2e}")
+
+        company = companies[0]
+        native_single = time_call(lambda: native.predict(company), 50)
+        compiled_single = time_call(lambda: compiled.predict(company), 50)
+        print(f"\nSingle-row predict(): native {native_single * 1e6:,.0f} us, "
+              f"compiled {compiled_single * 1e6:,.0f} us")
+
+        print(f"\n{'batch':>8} {'native rows/s':>15} {'compiled rows/s':>17}")
+        for size in (1, 100, 10000):
+            batch = companies[:size]
+            native_time = time_call(lambda: native.predict_batch(batch), 5)
+            compiled_time = time_call(lambda: compiled.predict_batch(batch), 5)
+            print(f"{size:>8} {size / native_time:>15,.0f} {size / compiled_time:>17,.0f}")
+
+
+if __name__ == '__main__':
+    main()
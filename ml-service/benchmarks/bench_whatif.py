@@ -0,0 +1,68 @@
+"""
+Benchmark: /what-if latency by variant count, against /predict and per-variant scoring
+The /what-if grid is scored in one vectorized call; the per-variant baseline
+calls predictor.predict once per variant, uncached, as a client looping over
+/predict would (without the HTTP overhead)
+
+Usage:
+    python benchmarks/bench_whatif.py [--variants 10 100 500 2000]
+"""
+import argparse
+import os
+import tempfile
+
+from common import build_model_dir, synthetic_companies, time_call
+
+LEVER_FEATURES = ['renewable_energy_pct', 'waste_recycled_pct', 'emissions_co2', 'energy_consumption']
+
+
+def levers_for(n_variants):
+    """Percent levers over four metrics with n_variants steps in total"""
+    per_lever = [n_variants // len(LEVER_FEATURES) + (i < n_variants % len(LEVER_FEATURES))
+                 for i in range(len(LEVER_FEATURES))]
+    return [
+        {'feature': feature, 'kind': 'percent', 'steps': [-50 + 100 * j / max(n - 1, 1) for j in range(n)]}
+        for feature, n in zip(LEVER_FEATURES, per_lever) if n
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--variants', type=int, nargs='+', default=[10, 100, 500, 2000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        build_model_dir(model_dir, n_estimators=200)
+        os.environ['ML_MODEL_PATH'] = model_dir
+        import api
+        from fastapi.testclient import TestClient
+        from whatif import lever_values
+
+        client = TestClient(api.app)
+        company = synthetic_companies(1, seed=7)[0]
+        predictor = api.predictor
+        predict_ms = time_call(lambda: client.post('/predict', json=company), 20) * 1000
+
+        print(f"\n/predict: {predict_ms:.2f} ms\n")
+        print(f"{'variants':>9} {'/what-if ms':>12} {'vs /predict':>12} {'per-variant predict ms':>23}")
+        for n_variants in args.variants:
+            body = {'company': company, 'levers': levers_for(n_variants)}
+            response = client.post('/what-if', json=body)
+            assert response.status_code == 200, response.text
+            what_if_ms = time_call(lambda: client.post('/what-if', json=body), 10) * 1000
+
+            variants = []
+            for lever in body['levers']:
+                values = lever_values(company.get(lever['feature']), lever['kind'], lever['steps'],
+                                      api._COLUMN_BOUNDS.get(lever['feature'], (None, None)))
+                variants += [dict(company, **{lever['feature']: value}) for value in values.tolist()]
+            cache, predictor.cache = predictor.cache, None
+            loop_ms = time_call(lambda: [predictor.predict(v, explain='none') for v in variants], 3) * 1000
+            predictor.cache = cache
+            print(f"{response.json()['variants']:>9} {what_if_ms:>12.2f} {what_if_ms / predict_ms:>11.1f}x "
+                  f"{loop_ms:>23.1f}")
+        api.inference_executor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
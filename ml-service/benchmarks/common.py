@@ -0,0 +1,96 @@
+"""
+Shared helpers for CarbonScoreX ML service benchmarks
+Generates synthetic companies and a small trained model to benchmark against
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+import numpy as np
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+COMPANY_FIELDS = [
+    'energy_consumption',
+    'renewable_energy_pct',
+    'waste_recycled_pct',
+    'emissions_co2',
+    'water_usage',
+    'employee_count',
+    'production_volume'
+]
+
+
+def synthetic_matrix(n_rows, seed=0):
+    """
+    Generate a synthetic company feature matrix
+
+    Args:
+        n_rows: Number of companies
+        seed: Random seed
+
+    Returns:
+        float64 array of shape (n_rows, len(COMPANY_FIELDS))
+    """
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.uniform(500, 20000, n_rows),      # energy_consumption
+        rng.uniform(0, 100, n_rows),          # renewable_energy_pct
+        rng.uniform(0, 100, n_rows),          # waste_recycled_pct
+        rng.uniform(0, 12000, n_rows),        # emissions_co2
+        rng.uniform(100, 10000, n_rows),      # water_usage
+        rng.integers(5, 5000, n_rows),        # employee_count
+        rng.uniform(100, 50000, n_rows)       # production_volume
+    ]).astype(np.float64)
+
+
+def synthetic_companies(n_rows, seed=0):
+    """Generate synthetic companies shaped like CompanyDataInput"""
+    matrix = synthetic_matrix(n_rows, seed)
+    companies = []
+    for row in matrix.tolist():
+        company = dict(zip(COMPANY_FIELDS, row))
+        company['employee_count'] = int(company['employee_count'])
+        companies.append(company)
+    return companies
+
+
+def build_model_dir(path, model_type='xgboost', n_rows=2000, n_estimators=50, compiled=True, quiet=True):
+    """
+    Train a small model on synthetic data with train_model.train_model and save
+    it in the layout CarbonScorePredictor.load_model expects
+
+    Args:
+        path: Directory to write model artifacts to
+        model_type: 'xgboost' or 'random_forest'
+        n_rows: Number of synthetic training rows
+        n_estimators: Number of trees
+        compiled: Keep the single-file bundle for the numpy inference engine
+            (otherwise only the joblib artifacts remain)
+        quiet: Hide the training report
+
+    Returns:
+        The model directory path
+    """
+    import pandas as pd
+    from train_model import train_model
+
+    data = pd.DataFrame(synthetic_matrix(n_rows, seed=42), columns=COMPANY_FIELDS)
+    with contextlib.redirect_stdout(io.StringIO()) if quiet else contextlib.nullcontext():
+        train_model(model_type=model_type, save_path=path, data=data, n_estimators=n_estimators)
+    if not compiled:
+        os.remove(os.path.join(path, f'carbon_score_model_{model_type}.bundle'))
+    return path
+
+
+def time_call(fn, repeat=5):
+    """Return the best wall time in seconds of fn() over several runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
@@ -0,0 +1,196 @@
+"""
+Benchmark suite: ML service hot paths, written to a JSON file for comparison
+Trains a small model with train_model.train_model on synthetic companies, then
+measures feature extraction, predict, fallback_score, predict_batch and the
+/predict and /batch-predict endpoints (in-process test client) across batch
+sizes. Each case reports ops/s, rows/s, p50/p99 latency and peak traced memory.
+
+Usage:
+    python benchmarks/run_suite.py [--output results.json] [--compare baseline.json]
+                                   [--max-regression 0.1] [--quick]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+
+from common import build_model_dir, synthetic_companies
+
+BATCH_SIZES = [1, 100, 1000, 10000]
+HTTP_BATCH_SIZES = [10, 100, 1000, 10000]
+
+
+def measure(fn, rows=1, min_time=1.0, min_samples=20, max_samples=20000):
+    """
+    Time repeated fn() calls, then trace one more call's peak allocation
+
+    Returns:
+        Result dict with ops/s, rows/s, latency percentiles (ms) and peak KiB
+    """
+    fn()  # warm-up
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < max_samples and (len(samples) < min_samples or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    latencies = np.array(samples)
+    ops_per_sec = len(latencies) / latencies.sum()
+    return {
+        'rows': rows,
+        'samples': len(latencies),
+        'ops_per_sec': ops_per_sec,
+        'rows_per_sec': ops_per_sec * rows,
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p99_ms': float(np.percentile(latencies, 99) * 1000),
+        'peak_memory_kib': peak / 1024
+    }
+
+
+def environment():
+    """Commit and platform details stored with the results"""
+    def git(*args):
+        try:
+            return subprocess.run(['git', *args], capture_output=True, text=True, check=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    import sklearn
+    import xgboost
+    return {
+        'commit': git('rev-parse', 'HEAD'),
+        'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'sklearn': sklearn.__version__,
+        'xgboost': xgboost.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def run_cases(args):
+    """Yield (case name, result) for every benchmark case"""
+    import api
+    from fastapi.testclient import TestClient
+
+    predictor = api.predictor
+    company = synthetic_companies(1, seed=1)[0]
+    client = TestClient(api.app)
+
+    yield '_extract_features', measure(lambda: predictor._extract_features(company), min_time=args.min_time)
+    for explain in ('global', 'none'):
+        yield f'predict[explain={explain}]', measure(
+            lambda: predictor.predict(company, explain=explain), min_time=args.min_time
+        )
+    yield 'fallback_score', measure(lambda: predictor.fallback_score(company), min_time=args.min_time)
+
+    for size in args.batch_sizes:
+        companies = synthetic_companies(size, seed=size)
+        yield f'predict_batch[{size}]', measure(
+            lambda: predictor.predict_batch(companies), rows=size, min_time=args.min_time
+        )
+
+    def post(path, body):
+        response = client.post(path, json=body)
+        response.raise_for_status()
+
+    yield 'POST /predict', measure(lambda: post('/predict', company), min_time=args.min_time)
+    for size in args.http_batch_sizes:
+        companies = synthetic_companies(size, seed=size)
+        yield f'POST /batch-predict[{size}]', measure(
+            lambda: post('/batch-predict', companies), rows=size, min_time=args.min_time
+        )
+
+
+def compare(results, baseline_file, max_regression):
+    """
+    Print changes against a baseline results file
+
+    Regressions are judged on p50 latency, which is far less sensitive to
+    scheduler noise than mean throughput or p99.
+
+    Returns:
+        Names of cases whose p50 grew by more than max_regression
+    """
+    with open(baseline_file) as f:
+        baseline = json.load(f)
+    print(f"\nAgainst {baseline_file} (commit {(baseline['environment'].get('commit') or '?')[:12]}):")
+    print(f"{'case':>28} {'ops/s':>9} {'p50':>9} {'p99':>9}")
+    regressed = []
+    for name, result in results.items():
+        old = baseline['results'].get(name)
+        if old is None:
+            continue
+        ops_change = result['ops_per_sec'] / old['ops_per_sec'] - 1
+        p50_change = result['p50_ms'] / old['p50_ms'] - 1
+        p99_change = result['p99_ms'] / old['p99_ms'] - 1
+        flag = ''
+        if p50_change > max_regression:
+            regressed.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:>28} {ops_change:>+8.1%} {p50_change:>+8.1%} {p99_change:>+8.1%}{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output', default='benchmark_results.json', help='JSON results file to write')
+    parser.add_argument('--compare', help='Earlier results file to compare against')
+    parser.add_argument('--max-regression', type=float, default=0.10,
+                        help='p50 latency increase (fraction) that fails --compare')
+    parser.add_argument('--min-time', type=float, default=1.0, help='Seconds to sample each case')
+    parser.add_argument('--estimators', type=int, default=200)
+    parser.add_argument('--quick', action='store_true', help='Short sampling, batch sizes up to 1000')
+    args = parser.parse_args()
+
+    args.batch_sizes, args.http_batch_sizes = BATCH_SIZES, HTTP_BATCH_SIZES
+    if args.quick:
+        args.min_time = min(args.min_time, 0.2)
+        args.batch_sizes = [size for size in BATCH_SIZES if size <= 1000]
+        args.http_batch_sizes = [size for size in HTTP_BATCH_SIZES if size <= 1000]
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        build_model_dir(model_dir, n_estimators=args.estimators)
+        # Measure computation, not cache hits on the repeated inputs
+        os.environ.update(ML_MODEL_PATH=model_dir, ML_CACHE_SIZE='0')
+        import api
+
+        results = {}
+        print(f"\n{'case':>28} {'ops/s':>11} {'rows/s':>12} {'p50 ms':>9} {'p99 ms':>9} {'peak KiB':>10}")
+        for name, result in run_cases(args):
+            results[name] = result
+            print(f"{name:>28} {result['ops_per_sec']:>11,.0f} {result['rows_per_sec']:>12,.0f} "
+                  f"{result['p50_ms']:>9.3f} {result['p99_ms']:>9.3f} {result['peak_memory_kib']:>10,.0f}")
+
+        api.inference_executor.shutdown()
+
+    settings = {'estimators': args.estimators, 'min_time': args.min_time, 'quick': args.quick}
+    with open(args.output, 'w') as f:
+        json.dump({'environment': environment(), 'settings': settings, 'results': results}, f, indent=2)
+    print(f"\n✓ Results written to {args.output}")
+
+    if args.compare and compare(results, args.compare, args.max_regression):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,11 +2,41 @@
 FastAPI ML Microservice for CarbonScoreX
 Exposes /predict endpoint for carbon score inference
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional
-import uvicorn
+from starlette.requests import ClientDisconnect
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, field_validator
+from typing import Dict, Any, List, Literal, Optional, Union
+import asyncio
+import functools
+import json
+import os
+import time
+import numpy as np
+
+from cache import PredictionCache
+from executor import InferenceExecutor, ExecutorBusyError
+from batcher import MicroBatcher
+from registry import ModelRegistry
+from fallback import FallbackScorer
+from metrics import (
+    BATCH_ROWS, CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY as METRICS,
+    STAGE_SECONDS, MetricsMiddleware
+)
+from columnar import (
+    CATEGORY_CODES, MEDIA_TYPE as COLUMNAR_MEDIA_TYPE, ColumnarFormatError, decode_matrix, encode_frame
+)
+from streaming import (
+    CSV, DuplexStreamingResponse, OutputSpool,
+    decode_line, iter_line_chunks, parse_csv_header, stream_format
+)
+from whatif import WhatIfError, what_if
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 try:
     from inference import CarbonScorePredictor
@@ -31,71 +61,180 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency by route, exported on /metrics
+app.add_middleware(MetricsMiddleware)
+
+MODEL_PATH = os.environ.get('ML_MODEL_PATH', '../models')
+
+# Versioned model registry; when set, its CURRENT version is served instead of MODEL_PATH
+REGISTRY_PATH = os.environ.get('ML_REGISTRY_PATH')
+model_registry = ModelRegistry(REGISTRY_PATH) if REGISTRY_PATH else None
+# Seconds between checks of the registry's CURRENT pointer (0 disables watching)
+REGISTRY_POLL_S = float(os.environ.get('ML_REGISTRY_POLL_S', '0'))
+
+# Prediction cache (ML_CACHE_SIZE=0 disables it; ML_CACHE_TTL=0 never expires)
+CACHE_SIZE = int(os.environ.get('ML_CACHE_SIZE', '10000'))
+CACHE_TTL = float(os.environ.get('ML_CACHE_TTL', '300'))
+prediction_cache = PredictionCache(max_size=CACHE_SIZE, ttl=CACHE_TTL or None) if CACHE_SIZE > 0 else None
+
+def _model_source(version: Optional[str] = None) -> tuple:
+    """
+    Model directory and version label to load
+    
+    A named registry version, else the registry's CURRENT version, else MODEL_PATH.
+    
+    Raises:
+        KeyError: If the version is unknown or no registry is configured
+    """
+    if model_registry is None:
+        if version is not None:
+            raise KeyError("No model registry configured (set ML_REGISTRY_PATH)")
+        return MODEL_PATH, None
+    version = version or model_registry.current()
+    if version is None:
+        return MODEL_PATH, None
+    return model_registry.version_path(version), version
+
+def _load_predictor(model_path: str, version: Optional[str]):
+    """Load and warm a predictor so it is ready for traffic before going live"""
+    loaded = CarbonScorePredictor(model_path=model_path, cache=prediction_cache, version=version)
+    loaded.warm_up()
+    return loaded
+
 # Initialize predictor
+active_version = None
 try:
     if INFERENCE_AVAILABLE:
-        predictor = CarbonScorePredictor(model_path='../models')
+        model_source = _model_source()
+        predictor = _load_predictor(*model_source)
+        active_version = model_source[1]
         MODEL_LOADED = True
     else:
         raise Exception("Inference module not available")
 except Exception as e:
     print(f"Warning: Could not load ML model: {e}")
     print("Using fallback rule-based scoring")
-    # Create a minimal instance for fallback with required methods
-    class FallbackPredictor:
-        def __init__(self):
-            self.metadata = {}
+    predictor = FallbackScorer()
+    MODEL_LOADED = False
+
+# Inference runs off the event loop; excess requests get 429 instead of queueing
+inference_executor = InferenceExecutor(
+    max_threads=int(os.environ.get('ML_INFERENCE_THREADS', '4')),
+    max_pending=int(os.environ.get('ML_MAX_PENDING', '64')),
+    process_workers=int(os.environ.get('ML_PROCESS_WORKERS', '0')),
+    process_batch_min=int(os.environ.get('ML_PROCESS_BATCH_MIN', '5000')),
+    model_path=predictor.model_path if MODEL_LOADED else None,
+    model_version=active_version
+)
+
+# Without a model, predictor is a FallbackScorer with the same scoring methods, so
+# the scoring helpers need no fallback branches. Each call reads predictor once
+# and results carry the version of the model (or fallback) that produced them.
+
+# Explanation detail accepted by the scoring endpoints (see inference.EXPLAIN_MODES)
+ExplainMode = Literal['global', 'contributions', 'none']
+
+# Response verbosity: score only, score and category, or the full prediction
+ResponseFields = Literal['score', 'category', 'full']
+_SLIM_KEYS = {'score': ('score',), 'category': ('score', 'category')}
+
+def _effective_explain(explain: str, fields: str) -> str:
+    """Skip building explanations that a slim response would drop"""
+    return explain if fields == 'full' else 'none'
+
+def _project(result: Dict[str, Any], fields: str, with_version: bool = True) -> Dict[str, Any]:
+    """Trim a prediction to the requested fields; error entries pass through"""
+    if fields == 'full' or 'score' not in result:
+        return result
+    slim = {key: result[key] for key in _SLIM_KEYS[fields]}
+    if with_version:
+        slim['model_version'] = result['model_version']
+    return slim
+
+def _score_one(company_data: Dict[str, Any], explain: str = 'global') -> Dict[str, Any]:
+    """Score one company with the live model, or the rule-based fallback"""
+    return predictor.predict(company_data, explain=explain)
+
+def _score_batch(companies: list, explain: str = 'global') -> list:
+    """Score a list of companies with the live model, or the rule-based fallback"""
+    # Score the whole batch in one vectorized call
+    return predictor.predict_batch(companies, explain=explain)
+
+def _score_coalesced(companies: list, explain: str = 'global') -> list:
+    """Score a micro-batch of /predict requests, keeping their cache hits"""
+    BATCH_ROWS.labels('/predict').observe(len(companies))
+    return predictor.predict_batch(companies, use_cache=True, explain=explain)
+
+# Opt-in coalescing of concurrent /predict calls into one vectorized model call,
+# with one batcher per explanation mode so every batch is scored the same way
+prediction_batchers = None
+if os.environ.get('ML_MICROBATCH', '0') == '1':
+    prediction_batchers = {
+        explain: MicroBatcher(
+            functools.partial(_score_coalesced, explain=explain),
+            inference_executor,
+            max_wait_ms=float(os.environ.get('ML_MICROBATCH_WAIT_MS', '2')),
+            max_batch=int(os.environ.get('ML_MICROBATCH_MAX', '64'))
+        )
+        for explain in ('global', 'contributions', 'none')
+    }
+
+def _model_version() -> str:
+    """Version label of the live model"""
+    return predictor.model_version
+
+_reload_lock = asyncio.Lock()
+_registry_watcher = None
+
+async def reload_model(version: Optional[str] = None) -> str:
+    """
+    Load a model version in the background, warm it, then make it live
+    
+    The current model keeps serving while the new one loads. The switch is a
+    plain reference assignment, so requests already running finish on the model
+    they started with and later ones use the new model; nothing is dropped.
+    
+    Args:
+        version: Registry version (default: the registry's CURRENT version, or
+            MODEL_PATH without a registry); it becomes CURRENT once live
         
-        def _get_category(self, score: float) -> str:
-            """Categorize score"""
-            if score >= 80:
-                return 'Excellent'
-            elif score >= 65:
-                return 'Good'
-            elif score >= 50:
-                return 'Fair'
-            else:
-                return 'Poor'
+    Returns:
+        The new model_version
+    """
+    global predictor, MODEL_LOADED, active_version
+    async with _reload_lock:
+        model_path, label = _model_source(version)
+        loop = asyncio.get_running_loop()
+        loaded = await loop.run_in_executor(None, _load_predictor, model_path, label)
+        await inference_executor.reload_workers(model_path, label)
+        if label is not None and label != model_registry.current():
+            model_registry.activate(label)
         
-        def fallback_score(self, company_data: Dict[str, Any]) -> Dict[str, Any]:
-            """Deterministic fallback scoring when ML model is unavailable"""
-            import numpy as np
-            score = 50  # Base score
-            
-            # Renewable energy contribution (0-25 points)
-            renewable_pct = company_data.get('renewable_energy_pct', 0)
-            score += (renewable_pct / 100) * 25
-            
-            # Waste recycling contribution (0-20 points)
-            recycling_pct = company_data.get('waste_recycled_pct', 0)
-            score += (recycling_pct / 100) * 20
-            
-            # Emissions penalty (0 to -30 points)
-            emissions = company_data.get('emissions_co2', 0)
-            if emissions > 0:
-                # Normalize emissions (assuming typical range 0-10000)
-                normalized_emissions = min(emissions / 10000, 1.0)
-                score -= normalized_emissions * 30
-            
-            # Energy efficiency bonus (0-15 points)
-            energy = company_data.get('energy_consumption', 0)
-            if energy > 0 and renewable_pct > 50:
-                score += 15
-            
-            score = np.clip(score, 0, 100)
-            
-            return {
-                'score': float(score),
-                'category': self._get_category(score),
-                'explanation': {
-                    'method': 'rule_based_fallback',
-                    'recommendations': ['ML service unavailable - using deterministic scoring']
-                },
-                'confidence': 0.7
-            }
-    
-    predictor = FallbackPredictor()
-    MODEL_LOADED = False
+        predictor = loaded
+        MODEL_LOADED = True
+        active_version = label
+        return loaded.model_version
+
+async def _watch_registry():
+    """Reload whenever the registry's CURRENT pointer moves, e.g. from another process"""
+    failed_version = None
+    while True:
+        await asyncio.sleep(REGISTRY_POLL_S)
+        version = model_registry.current()
+        if version is None or version in (active_version, failed_version):
+            continue
+        try:
+            print(f"Registry version changed to {version}, reloading")
+            await reload_model(version)
+            failed_version = None
+        except Exception as e:
+            # Keep serving the current model; retry only once CURRENT moves again
+            failed_version = version
+            print(f"Warning: could not load model version {version}: {e}")
+
+def _busy(error: ExecutorBusyError) -> HTTPException:
+    """429 response telling the client to back off and retry"""
+    return HTTPException(status_code=429, detail=str(error), headers={"Retry-After": "1"})
 
 # Request/Response models
 class CompanyDataInput(BaseModel):
@@ -121,20 +260,269 @@ class CompanyDataInput(BaseModel):
             }
         }
 
+class WhatIfLever(BaseModel):
+    """A company metric to change and the changes to try"""
+    feature: str = Field(..., description="CompanyDataInput field to change")
+    kind: Literal['absolute', 'percent'] = Field(
+        'absolute', description="'absolute' adds each step to the value, 'percent' changes it by step percent"
+    )
+    steps: List[float] = Field(..., min_length=1, description="Changes to try")
+    
+    @field_validator('feature')
+    @classmethod
+    def known_feature(cls, value: str) -> str:
+        if value not in CompanyDataInput.model_fields:
+            raise ValueError(f"Unknown feature: {value}")
+        return value
+
+class WhatIfRequest(BaseModel):
+    """Input schema for what-if analysis"""
+    company: CompanyDataInput
+    levers: List[WhatIfLever] = Field(..., min_length=1, description="Metrics to change, one lever per metric")
+    combine: bool = Field(False, description="Also score every combination of one step per lever")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "company": CompanyDataInput.model_config['json_schema_extra']['example'],
+                "levers": [
+                    {"feature": "renewable_energy_pct", "kind": "absolute", "steps": [10, 20, 30]},
+                    {"feature": "emissions_co2", "kind": "percent", "steps": [-10, -25]}
+                ]
+            }
+        }
+
 class PredictionResponse(BaseModel):
     """Response schema for predictions"""
     score: float = Field(..., description="Carbon score (0-100)")
     category: str = Field(..., description="Score category")
-    explanation: Dict[str, Any] = Field(..., description="Detailed explanation")
+    explanation: Optional[Dict[str, Any]] = Field(..., description="Detailed explanation (null with explain=none)")
     confidence: float = Field(..., description="Prediction confidence (0-1)")
     model_version: str = Field(..., description="Model version used")
 
+class ScoreCategoryResponse(BaseModel):
+    """Prediction response with fields=category"""
+    score: float = Field(..., description="Carbon score (0-100)")
+    category: str = Field(..., description="Score category")
+    model_version: str = Field(..., description="Model version used")
+
+class ScoreResponse(BaseModel):
+    """Prediction response with fields=score"""
+    score: float = Field(..., description="Carbon score (0-100)")
+    model_version: str = Field(..., description="Model version used")
+
+class ReloadRequest(BaseModel):
+    """Admin reload request"""
+    version: Optional[str] = Field(None, description="Registry version to serve (default: the registry's CURRENT version)")
+
 class HealthResponse(BaseModel):
     """Health check response"""
     status: str
     model_loaded: bool
     model_type: Optional[str]
 
+_company_list_adapter = TypeAdapter(List[CompanyDataInput])
+
+# Request-level pipeline stages; the predictor times extraction through explanation,
+# except for columnar bodies, which are extracted here
+_VALIDATE = STAGE_SECONDS.labels('validate')
+_EXTRACT = STAGE_SECONDS.labels('extract')
+_SERIALIZE = STAGE_SECONDS.labels('serialize')
+
+# Rows per validation/serialization call; C-level JSON and pydantic-core hold the
+# GIL for a whole call, so chunking lets the event loop thread run in between
+BATCH_CODEC_CHUNK = 1000
+
+def _json_default(obj):
+    """JSON value of numpy scalars and arrays that reach a response"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def _dumps(obj) -> bytes:
+    """Serialize trusted internal output to JSON bytes, with orjson when installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY, default=_json_default)
+    return json.dumps(obj, default=_json_default).encode()
+
+def _loads(body: bytes):
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+def _parse_companies(body: bytes) -> list:
+    """Validate a JSON array of CompanyDataInput into plain dicts"""
+    stage_start = time.perf_counter()
+    try:
+        items = _loads(body)
+        if not isinstance(items, list):
+            raise RequestValidationError([{
+                'type': 'list_type', 'loc': ('body',), 'msg': 'Input should be a valid list', 'input': items
+            }])
+        companies = []
+        for start in range(0, len(items), BATCH_CODEC_CHUNK):
+            try:
+                data_list = _company_list_adapter.validate_python(items[start:start + BATCH_CODEC_CHUNK])
+            except ValidationError as e:
+                # Report locations against the whole body, as FastAPI's own validation does
+                raise RequestValidationError([
+                    {**error, 'loc': ('body', start + error['loc'][0], *error['loc'][1:])}
+                    for error in e.errors()
+                ])
+            companies.extend(data.model_dump(exclude_none=True) for data in data_list)
+    except json.JSONDecodeError as e:
+        # orjson.JSONDecodeError subclasses it
+        raise RequestValidationError([{
+            'type': 'json_invalid', 'loc': ('body', e.pos), 'msg': 'JSON decode error', 'input': {}
+        }])
+    _VALIDATE.lap(stage_start)
+    return companies
+
+def _render_predictions(results: list, fields: str = 'full') -> bytes:
+    """
+    Serialize batch results to the /batch-predict JSON body
+    
+    Slim responses state model_version once for the batch instead of per row,
+    the live model's when the batch is empty.
+    """
+    stage_start = time.perf_counter()
+    suffix = b''
+    if fields != 'full':
+        version = results[0]['model_version'] if results else _model_version()
+        suffix = b', "model_version": ' + _dumps(version)
+        results = [_project(result, fields, with_version=False) for result in results]
+    chunks = [
+        _dumps(results[start:start + BATCH_CODEC_CHUNK])[1:-1]
+        for start in range(0, len(results), BATCH_CODEC_CHUNK)
+    ]
+    content = b'{"predictions": [' + b', '.join(chunks) + b'], "count": ' + str(len(results)).encode() + suffix + b'}'
+    _SERIALIZE.lap(stage_start)
+    return content
+
+def _column_bounds() -> Dict[str, tuple]:
+    """(min, max) of each CompanyDataInput field constrained with ge/le"""
+    bounds = {}
+    for name, field in CompanyDataInput.model_fields.items():
+        low = next((m.ge for m in field.metadata if hasattr(m, 'ge')), None)
+        high = next((m.le for m in field.metadata if hasattr(m, 'le')), None)
+        if low is not None or high is not None:
+            bounds[name] = (low, high)
+    return bounds
+
+_COLUMN_BOUNDS = _column_bounds()
+
+def _validate_columns(names: list, block) -> None:
+    """Apply CompanyDataInput's range constraints to columnar input, a column at a time"""
+    errors = []
+    for name, column in zip(names, block):
+        low, high = _COLUMN_BOUNDS.get(name, (None, None))
+        checks = []
+        if low is not None:
+            checks.append((column < low, 'greater_than_equal', f'greater than or equal to {low}'))
+        if high is not None:
+            checks.append((column > high, 'less_than_equal', f'less than or equal to {high}'))
+        for failed, kind, words in checks:
+            rows = failed.nonzero()[0]
+            if len(rows):
+                # Report the first offending row of each column, NaN (missing) never fails
+                errors.append({
+                    'type': kind, 'loc': ('body', name, int(rows[0])),
+                    'msg': f'Input should be {words}', 'input': float(column[rows[0]])
+                })
+    if errors:
+        raise RequestValidationError(errors)
+
+def _score_what_if(company: Dict[str, Any], levers: list, combine: bool = False) -> Dict[str, Any]:
+    """Score a what-if grid with the live model, or the rule-based fallback"""
+    current = predictor
+    result = what_if(current, company, levers, _COLUMN_BOUNDS, combine)
+    BATCH_ROWS.labels('/what-if').observe(result['variants'])
+    return result
+
+def _score_columnar(body: bytes) -> bytes:
+    """
+    Decode, validate, score and encode a columnar /batch-predict request
+    
+    The float64 columns are scored straight from the request buffer; columns
+    that are not CompanyDataInput fields are ignored, as in JSON bodies.
+    """
+    start = time.perf_counter()
+    try:
+        names, block = decode_matrix(body)
+    except ColumnarFormatError as e:
+        raise RequestValidationError([{'type': 'columnar_invalid', 'loc': ('body',), 'msg': str(e), 'input': {}}])
+    known = [i for i, name in enumerate(names) if name in CompanyDataInput.model_fields]
+    if len(known) < len(names):
+        names, block = [names[i] for i in known], block[known]
+    _validate_columns(names, block)
+    BATCH_ROWS.labels('/batch-predict').observe(block.shape[1])
+    start = _VALIDATE.lap(start)
+    
+    current = predictor
+    features = current.extract_column_block(names, block)
+    _EXTRACT.lap(start)
+    scores = current.predict_scores(features)
+    codes = current.category_codes(scores)
+    
+    start = time.perf_counter()
+    content = encode_frame(
+        [('score', scores.astype('<f4')), ('category', codes)],
+        model_version=current.model_version, categories=list(CATEGORY_CODES)
+    )
+    _SERIALIZE.lap(start)
+    return content
+
+# Lines scored per chunk by /predict/stream
+STREAM_CHUNK = int(os.environ.get('ML_STREAM_CHUNK', '1000'))
+
+def _score_stream_chunk(lines: list, fmt: str, header: Optional[list], explain: str = 'global',
+                        fields: str = 'full') -> bytes:
+    """
+    Decode, validate, score and serialize one chunk of /predict/stream input
+    
+    Lines that fail are reported individually; the rest of the chunk is still scored.
+    """
+    start = time.perf_counter()
+    outputs = {}
+    companies, company_lines = [], []
+    for line_no, line in lines:
+        try:
+            data = CompanyDataInput.model_validate(decode_line(line, fmt, header))
+        except ValidationError as e:
+            errors = [{'loc': list(error['loc']), 'msg': error['msg']} for error in e.errors()]
+            outputs[line_no] = {'line': line_no, 'error': 'validation_error', 'detail': errors}
+            continue
+        except (ValueError, UnicodeDecodeError) as e:
+            outputs[line_no] = {'line': line_no, 'error': 'parse_error', 'detail': str(e)}
+            continue
+        companies.append(data.model_dump(exclude_none=True))
+        company_lines.append(line_no)
+    _VALIDATE.lap(start)
+    
+    if companies:
+        BATCH_ROWS.labels('/predict/stream').observe(len(companies))
+        try:
+            results = _score_batch(companies, _effective_explain(explain, fields))
+        except Exception as e:
+            results = [{'error': 'prediction_error', 'detail': str(e)}] * len(companies)
+        for line_no, result in zip(company_lines, results):
+            outputs[line_no] = {'line': line_no, **_project(result, fields)}
+    
+    start = time.perf_counter()
+    content = b''.join(_dumps(outputs[line_no]) + b'\n' for line_no, _ in lines)
+    _SERIALIZE.lap(start)
+    return content
+
+async def _run_streaming(fn, *args):
+    """Run on the inference executor, waiting for capacity instead of failing mid-stream"""
+    while True:
+        try:
+            return await inference_executor.run(fn, *args)
+        except ExecutorBusyError:
+            await asyncio.sleep(0.05)
+
 # API Endpoints
 @app.get("/", response_model=Dict[str, str])
 async def root():
@@ -154,79 +542,213 @@ async def health_check():
         "model_type": predictor.metadata.get('model_type') if MODEL_LOADED else "fallback"
     }
 
-@app.post("/predict", response_model=PredictionResponse)
-async def predict_carbon_score(data: CompanyDataInput):
+@app.post("/predict", response_model=Union[PredictionResponse, ScoreCategoryResponse, ScoreResponse])
+async def predict_carbon_score(data: CompanyDataInput, explain: ExplainMode = 'global',
+                               fields: ResponseFields = 'full'):
     """
     Predict carbon score for company data
     
     Args:
         data: Company environmental metrics
+        explain: 'global' (model-wide top features), 'contributions' (this
+            company's per-feature contributions to its score) or 'none'
+        fields: 'full' prediction, or just 'score' / 'score' and 'category'
+            (plus model_version)
         
     Returns:
         Carbon score with explanation
     """
+    explain = _effective_explain(explain, fields)
     try:
         # Convert to dictionary
         company_data = data.model_dump(exclude_none=True)
         
         # Make prediction
-        if MODEL_LOADED:
-            result = predictor.predict(company_data)
-            model_version = predictor.metadata.get('model_type', 'unknown')
+        if prediction_batchers is not None:
+            result = await prediction_batchers[explain].submit(company_data)
         else:
-            result = predictor.fallback_score(company_data)
-            model_version = "rule_based_fallback"
+            result = await inference_executor.run(_score_one, company_data, explain)
         
-        # Add model version
-        result['model_version'] = model_version
-        
-        return result
+        # Internal output is already well-formed: serialize it directly instead of
+        # re-validating it against PredictionResponse
+        start = time.perf_counter()
+        content = _dumps(_project(result, fields))
+        _SERIALIZE.lap(start)
+        return Response(content=content, media_type="application/json")
         
+    except ExecutorBusyError as e:
+        raise _busy(e)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Prediction error: {str(e)}"
         )
 
-@app.post("/batch-predict")
-async def batch_predict(data_list: list[CompanyDataInput]):
+@app.post("/batch-predict", openapi_extra={
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": {
+                "type": "array", "items": {"$ref": "#/components/schemas/CompanyDataInput"}
+            }},
+            COLUMNAR_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}
+        }
+    }
+})
+async def batch_predict(request: Request, explain: ExplainMode = 'global',
+                        fields: ResponseFields = 'full'):
     """
     Batch prediction endpoint for multiple companies
     
+    The body is validated, scored and serialized on the inference executor, so
+    large batches never hold the event loop.
+    
+    A body sent as application/x-carbonscore-columnar (see columnar.py) is
+    scored without per-row decoding and answered in the same format, with
+    float32 scores and uint8 category codes; explain and fields do not apply.
+    
     Args:
-        data_list: List of company data
+        request: JSON array of company data, or a columnar frame
+        explain: Explanation detail, as for /predict
+        fields: Response verbosity, as for /predict; slim responses report
+            model_version once for the whole batch
         
     Returns:
         List of predictions
     """
     try:
-        results = []
-        for data in data_list:
-            company_data = data.model_dump(exclude_none=True)
-            
-            if MODEL_LOADED:
-                result = predictor.predict(company_data)
-                result['model_version'] = predictor.metadata.get('model_type', 'unknown')
-            else:
-                result = predictor.fallback_score(company_data)
-                result['model_version'] = "rule_based_fallback"
-            
-            results.append(result)
+        body = await request.body()
+        if request.headers.get('content-type', '').split(';')[0].strip() == COLUMNAR_MEDIA_TYPE:
+            content = await inference_executor.run(_score_columnar, body)
+            return Response(content=content, media_type=COLUMNAR_MEDIA_TYPE)
+        
+        companies = await inference_executor.run(_parse_companies, body)
+        BATCH_ROWS.labels('/batch-predict').observe(len(companies))
         
-        return {"predictions": results, "count": len(results)}
+        results = await inference_executor.run_batch(
+            _score_batch, companies, explain=_effective_explain(explain, fields)
+        )
+        
+        content = await inference_executor.run(_render_predictions, results, fields)
+        return Response(content=content, media_type="application/json")
         
+    except RequestValidationError:
+        raise
+    except ExecutorBusyError as e:
+        raise _busy(e)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Batch prediction error: {str(e)}"
         )
 
+@app.post("/what-if")
+async def what_if_analysis(data: WhatIfRequest):
+    """
+    What-if analysis: how changes to a company's metrics move its score
+    
+    Scores the company with each lever step applied on its own (and, with
+    combine, every combination of one step per lever) in a single vectorized
+    model call, so hundreds of variants take about as long as /predict.
+    
+    Args:
+        data: Company metrics and levers, e.g. renewable_energy_pct
+            +10/+20/+30 (absolute) and emissions_co2 -10/-25 (percent)
+        
+    Returns:
+        Baseline score, levers ranked by impact with the score and delta of
+        each step, and the best combinations when requested
+    """
+    try:
+        company_data = data.company.model_dump(exclude_none=True)
+        levers = [lever.model_dump() for lever in data.levers]
+        result = await inference_executor.run(_score_what_if, company_data, levers, data.combine)
+        
+        start = time.perf_counter()
+        content = _dumps(result)
+        _SERIALIZE.lap(start)
+        return Response(content=content, media_type="application/json")
+        
+    except ExecutorBusyError as e:
+        raise _busy(e)
+    except WhatIfError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"What-if error: {str(e)}"
+        )
+
+@app.post("/predict/stream", openapi_extra={
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/x-ndjson": {"schema": {"$ref": "#/components/schemas/CompanyDataInput"}},
+            "text/csv": {"schema": {"type": "string"}}
+        }
+    }
+})
+async def predict_stream(request: Request, explain: ExplainMode = 'global',
+                         fields: ResponseFields = 'full'):
+    """
+    Streaming bulk scoring endpoint
+    
+    Accepts newline-delimited JSON (one CompanyDataInput object per line) or CSV
+    (Content-Type: text/csv, header row first, one record per line). Input is
+    scored in fixed-size chunks and NDJSON results are streamed back as each
+    chunk completes, so memory stays bounded for any input size.
+    
+    Each output line carries the 1-based input line number and either the
+    prediction or an error for that line. The explain and fields query
+    parameters work as for /predict.
+    """
+    fmt = stream_format(request.headers.get('content-type'))
+    spool = OutputSpool()
+    
+    async def score_input():
+        header = None
+        try:
+            async for lines in iter_line_chunks(request.stream(), STREAM_CHUNK):
+                if fmt == CSV and header is None:
+                    header = parse_csv_header(lines[0][1])
+                    lines = lines[1:]
+                    if not lines:
+                        continue
+                spool.put(await _run_streaming(_score_stream_chunk, lines, fmt, header, explain, fields))
+        except ClientDisconnect:
+            pass
+        except Exception as e:
+            # e.g. LineTooLongError; results already streamed stay valid
+            spool.put(_dumps({'error': 'stream_error', 'detail': str(e)}) + b'\n')
+        finally:
+            spool.close()
+    
+    async def generate():
+        # Input is consumed independently of the client reading the response
+        scorer = asyncio.create_task(score_input())
+        try:
+            while (data := await spool.get()) is not None:
+                yield data
+        finally:
+            scorer.cancel()
+            spool.discard()
+    
+    return DuplexStreamingResponse(generate(), media_type="application/x-ndjson")
+
+@app.get("/cache-stats")
+async def cache_stats():
+    """Prediction cache size, configuration and hit/miss/eviction counters"""
+    if prediction_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **prediction_cache.stats()}
+
 @app.get("/model-info")
 async def model_info():
     """Get information about the loaded model"""
     if MODEL_LOADED and predictor.metadata:
         return {
             "model_type": predictor.metadata.get('model_type'),
+            "model_version": predictor.model_version,
             "n_features": predictor.metadata.get('n_features'),
             "test_mae": predictor.metadata.get('test_mae'),
             "test_r2": predictor.metadata.get('test_r2'),
@@ -238,8 +760,87 @@ async def model_info():
             "message": "Using rule-based fallback scoring"
         }
 
+# Values the service already tracks, read when /metrics is scraped
+def _cache_lookups():
+    if prediction_cache is None:
+        return None
+    stats = prediction_cache.stats()
+    return {('hit',): stats['hits'], ('miss',): stats['misses']}
+
+METRICS.callback('carbonscore_cache_lookups_total', 'Prediction cache lookups by result', 'counter',
+                 _cache_lookups, ('result',))
+METRICS.callback('carbonscore_cache_entries', 'Entries in the prediction cache', 'gauge',
+                 lambda: prediction_cache.stats()['size'] if prediction_cache is not None else None)
+METRICS.callback('carbonscore_inference_pending', 'Inference calls running or waiting', 'gauge',
+                 lambda: inference_executor.stats()['pending'])
+METRICS.callback('carbonscore_inference_rejected_total', 'Inference calls rejected with 429', 'counter',
+                 lambda: inference_executor.stats()['rejected'])
+METRICS.callback('carbonscore_model_info', 'Version of the model being served', 'gauge',
+                 lambda: {(_model_version(),): 1}, ('model_version',))
+
+@app.get("/metrics")
+async def metrics():
+    """Latency, batch size, stage timing, cache and fallback metrics in Prometheus text format"""
+    return Response(content=METRICS.render(), media_type=METRICS_CONTENT_TYPE)
+
+def _check_admin(request: Request):
+    """Require the X-Admin-Token header when ML_ADMIN_TOKEN is set"""
+    token = os.environ.get('ML_ADMIN_TOKEN')
+    if token and request.headers.get('x-admin-token') != token:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.get("/admin/models")
+async def list_models(request: Request):
+    """Registry versions, the registry's CURRENT version and the version being served"""
+    _check_admin(request)
+    return {
+        "registry": REGISTRY_PATH,
+        "versions": model_registry.versions() if model_registry else [],
+        "current": model_registry.current() if model_registry else None,
+        "serving": _model_version()
+    }
+
+@app.post("/admin/reload")
+async def admin_reload(request: Request, body: Optional[ReloadRequest] = None):
+    """
+    Hot-swap the served model without dropping requests
+    
+    Loads the requested registry version (or re-reads the current one) in the
+    background, warms it and switches to it. On failure the previous model
+    keeps serving.
+    """
+    _check_admin(request)
+    previous = _model_version()
+    try:
+        model_version = await reload_model(body.version if body else None)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Reload failed, still serving {previous}: {str(e)}"
+        )
+    return {"status": "reloaded", "model_version": model_version, "previous_version": previous}
+
+@app.on_event("startup")
+async def start_registry_watcher():
+    """Follow the registry's CURRENT pointer when ML_REGISTRY_POLL_S is set"""
+    global _registry_watcher
+    if model_registry is not None and REGISTRY_POLL_S > 0 and INFERENCE_AVAILABLE:
+        _registry_watcher = asyncio.create_task(_watch_registry())
+
+@app.on_event("shutdown")
+def shutdown_executor():
+    """Release inference pools on server shutdown"""
+    if _registry_watcher is not None:
+        _registry_watcher.cancel()
+    inference_executor.shutdown()
+
 # Run server
 if __name__ == "__main__":
+    import uvicorn
     uvicorn.run(
         "api:app",
         host="0.0.0.0",
@@ -0,0 +1,87 @@
+"""
+Micro-batching for CarbonScoreX /predict
+Coalesces concurrent single-company requests into one vectorized model call
+"""
+import asyncio
+from typing import Any, Callable, Dict, List
+
+
+class MicroBatcher:
+    """
+    Collects concurrent submissions for up to max_wait_ms (or max_batch rows),
+    scores them with one score_batch call on the executor, and resolves each
+    caller's future with its own row
+    """
+
+    def __init__(self, score_batch: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]],
+                 executor, max_wait_ms: float = 2.0, max_batch: int = 64):
+        """
+        Initialize batcher
+
+        Args:
+            score_batch: Scores a list of companies, returning results in input order
+            executor: executor.InferenceExecutor the batch call runs on
+            max_wait_ms: Longest time the first request in a batch waits for company
+            max_batch: Batch size that triggers an immediate flush
+        """
+        self.score_batch = score_batch
+        self.executor = executor
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch = max_batch
+        self._pending = []
+        self._timer = None
+        self._tasks = set()
+        self.batches = 0
+        self.rows = 0
+
+    async def submit(self, company_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue one company for the next batch and wait for its result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((company_data, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._run(batch))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        self.batches += 1
+        self.rows += len(batch)
+        try:
+            results = await self.executor.run(self.score_batch, [company for company, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            # The caller may have disconnected and cancelled its future
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch counters and configuration"""
+        return {
+            'max_wait_ms': self.max_wait * 1000.0,
+            'max_batch': self.max_batch,
+            'batches': self.batches,
+            'rows': self.rows,
+            'mean_batch_size': self.rows / self.batches if self.batches else 0.0
+        }
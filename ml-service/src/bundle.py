@@ -0,0 +1,116 @@
+"""
+Single-file model bundle for CarbonScoreX
+Stores the compiled tree arrays, scaler statistics, feature names and metadata
+in one memory-mappable file so the service starts without joblib/xgboost/sklearn
+
+Layout:
+    8 bytes   magic (b'CSXBNDL' + format version byte)
+    8 bytes   little-endian header length
+    n bytes   UTF-8 JSON header (metadata, feature names, array table, digest)
+    ...       raw array data, each array aligned to ALIGNMENT bytes
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+MAGIC = b'CSXBNDL'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+_PREFIX = struct.Struct('<7sBQ')
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _json_default(value):
+    # Training metrics are numpy scalars
+    if isinstance(value, (np.generic, np.ndarray)):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def write_bundle(filename: str, arrays: Dict[str, np.ndarray], header: Dict[str, Any]) -> str:
+    """
+    Write arrays and a JSON-serializable header to a bundle file
+
+    The file is written next to its destination and renamed into place, so a
+    reader never sees a partial bundle.
+
+    Args:
+        filename: Output path
+        arrays: Named numeric arrays (0-d arrays for scalars)
+        header: Extra header fields, e.g. metadata and feature_names
+
+    Returns:
+        Hex SHA-1 digest of the array data, also stored in the header
+    """
+    arrays = {name: np.asarray(value, order='C') for name, value in arrays.items()}
+    table, offset, digest = {}, 0, hashlib.sha1()
+    for name, value in arrays.items():
+        table[name] = {'dtype': value.dtype.str, 'shape': list(value.shape), 'offset': offset}
+        digest.update(name.encode())
+        digest.update(value.tobytes())
+        offset = _aligned(offset + value.nbytes)
+
+    header = dict(header, arrays=table, digest=digest.hexdigest())
+    header_bytes = json.dumps(header, default=_json_default).encode('utf-8')
+    data_start = _aligned(_PREFIX.size + len(header_bytes))
+
+    tmp_filename = f"{filename}.tmp{os.getpid()}"
+    with open(tmp_filename, 'wb') as f:
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, value in arrays.items():
+            f.seek(data_start + table[name]['offset'])
+            f.write(value.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_filename, filename)
+    return header['digest']
+
+
+def read_bundle(filename: str) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """
+    Open a bundle in one pass, memory-mapping its arrays
+
+    Arrays are read-only views of a shared file mapping: pages are loaded on
+    first access and shared between processes that map the same file.
+
+    Args:
+        filename: Bundle path
+
+    Returns:
+        (arrays, header) where header holds everything but the array table
+
+    Raises:
+        ValueError: If the file is not a bundle or uses an unknown format version
+    """
+    with open(filename, 'rb') as f:
+        prefix = f.read(_PREFIX.size)
+        if len(prefix) < _PREFIX.size:
+            raise ValueError(f"{filename} is not a model bundle")
+        magic, version, header_length = _PREFIX.unpack(prefix)
+        if magic != MAGIC:
+            raise ValueError(f"{filename} is not a model bundle")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported model bundle version {version} in {filename}")
+        header = json.loads(f.read(header_length))
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    data_start = _aligned(_PREFIX.size + header_length)
+    arrays = {}
+    for name, spec in header.pop('arrays').items():
+        dtype, shape = np.dtype(spec['dtype']), tuple(spec['shape'])
+        count = int(np.prod(shape, dtype=np.int64))
+        if count == 0:
+            arrays[name] = np.empty(shape, dtype=dtype)
+        else:
+            arrays[name] = np.frombuffer(mapping, dtype=dtype, count=count,
+                                         offset=data_start + spec['offset']).reshape(shape)
+    return arrays, header
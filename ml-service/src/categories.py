@@ -0,0 +1,20 @@
+"""
+Carbon score categories for CarbonScoreX
+The score bands every scoring path (model, rule-based fallback, columnar and
+what-if responses) categorizes scores with
+"""
+import numpy as np
+
+# Lower bound of each band above 'Poor'; a score on a bound belongs to the higher band
+CATEGORY_THRESHOLDS = np.array([50, 65, 80])
+CATEGORY_LABELS = np.array(['Poor', 'Fair', 'Good', 'Excellent'], dtype=object)
+
+
+def category_codes(scores: np.ndarray) -> np.ndarray:
+    """uint8 index into CATEGORY_LABELS of each score's category"""
+    return np.searchsorted(CATEGORY_THRESHOLDS, scores, side='right').astype(np.uint8)
+
+
+def category_label(score: float) -> str:
+    """Category of one score"""
+    return CATEGORY_LABELS[int(np.searchsorted(CATEGORY_THRESHOLDS, score, side='right'))]
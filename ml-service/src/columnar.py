@@ -0,0 +1,136 @@
+"""
+Columnar binary batch protocol for CarbonScoreX
+Fixed-dtype column buffers with a small JSON header, decoded without copying
+
+Frame layout (all integers little-endian):
+    4 bytes   magic b'CSXC'
+    1 byte    format version
+    3 bytes   reserved (zero)
+    4 bytes   header length
+    n bytes   UTF-8 JSON header: {"rows": n, "columns": [{"name", "dtype"}, ...], ...}
+    ...       zero padding to a multiple of 8 bytes
+    ...       one buffer per column in header order, each padded to 8 bytes
+
+Requests carry float64 ('<f8') columns named after CompanyDataInput fields, with
+NaN for missing values. Responses carry 'score' (float32) and 'category'
+(uint8 codes indexing CATEGORY_CODES) plus model_version in the header.
+"""
+import json
+import struct
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from categories import CATEGORY_LABELS
+
+MEDIA_TYPE = 'application/x-carbonscore-columnar'
+MAGIC = b'CSXC'
+FORMAT_VERSION = 1
+
+# Category names by uint8 code in responses (ascending score bands)
+CATEGORY_CODES = tuple(CATEGORY_LABELS)
+
+_PREFIX = struct.Struct('<4sB3xI')
+
+
+class ColumnarFormatError(ValueError):
+    """Raised when a payload is not a well-formed columnar frame"""
+
+
+def _padded(length):
+    return -(-length // 8) * 8
+
+
+def encode_frame(columns: Sequence[Tuple[str, np.ndarray]], **header: Any) -> bytes:
+    """
+    Encode named 1-D arrays of equal length as a columnar frame
+
+    Args:
+        columns: (name, array) pairs; each array keeps its own dtype
+        **header: Extra JSON-serializable header fields
+
+    Returns:
+        Frame bytes
+    """
+    arrays = [(name, np.asarray(values)) for name, values in columns]
+    rows = len(arrays[0][1]) if arrays else 0
+    if any(values.ndim != 1 or len(values) != rows for _, values in arrays):
+        raise ValueError("Columns must be 1-D arrays of equal length")
+
+    header = dict(header, rows=rows, columns=[
+        {'name': name, 'dtype': values.dtype.newbyteorder('<').str} for name, values in arrays
+    ])
+    header_bytes = json.dumps(header).encode('utf-8')
+    parts = [_PREFIX.pack(MAGIC, FORMAT_VERSION, len(header_bytes)), header_bytes]
+    parts.append(b'\0' * (_padded(_PREFIX.size + len(header_bytes)) - _PREFIX.size - len(header_bytes)))
+    for _, values in arrays:
+        data = values.astype(values.dtype.newbyteorder('<'), copy=False).tobytes()
+        parts.append(data)
+        parts.append(b'\0' * (_padded(len(data)) - len(data)))
+    return b''.join(parts)
+
+
+def _read_header(body: bytes) -> Tuple[Dict[str, Any], int]:
+    if len(body) < _PREFIX.size:
+        raise ColumnarFormatError("Payload too short for a columnar frame")
+    magic, version, header_length = _PREFIX.unpack_from(body)
+    if magic != MAGIC:
+        raise ColumnarFormatError("Payload is not a columnar frame")
+    if version != FORMAT_VERSION:
+        raise ColumnarFormatError(f"Unsupported columnar format version {version}")
+    try:
+        header = json.loads(body[_PREFIX.size:_PREFIX.size + header_length])
+        rows = int(header['rows'])
+        columns = [(str(column['name']), np.dtype(column['dtype'])) for column in header['columns']]
+    except (ValueError, KeyError, TypeError) as e:
+        raise ColumnarFormatError(f"Invalid columnar header: {e}")
+    if rows < 0:
+        raise ColumnarFormatError("Invalid columnar header: negative row count")
+    header['rows'], header['columns'] = rows, columns
+    return header, _padded(_PREFIX.size + header_length)
+
+
+def decode_frame(body: bytes) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """
+    Decode a columnar frame into read-only array views of body
+
+    Returns:
+        (header, {name: array}) where header['columns'] lists (name, dtype)
+
+    Raises:
+        ColumnarFormatError: If the frame is malformed or truncated
+    """
+    header, offset = _read_header(body)
+    arrays = {}
+    for name, dtype in header['columns']:
+        size = dtype.itemsize * header['rows']
+        if offset + size > len(body):
+            raise ColumnarFormatError(f"Payload truncated in column {name!r}")
+        arrays[name] = np.frombuffer(body, dtype=dtype, count=header['rows'], offset=offset)
+        offset += _padded(size)
+    return header, arrays
+
+
+def decode_matrix(body: bytes) -> Tuple[List[str], np.ndarray]:
+    """
+    Decode a request frame of float64 columns as one (n_columns, n_rows) view
+
+    float64 buffers need no padding, so the columns are contiguous and the
+    whole block maps onto a single array without copying.
+
+    Raises:
+        ColumnarFormatError: If the frame is malformed, truncated, has duplicate
+            column names or non-float64 columns
+    """
+    header, offset = _read_header(body)
+    names = [name for name, _ in header['columns']]
+    if len(set(names)) != len(names):
+        raise ColumnarFormatError("Duplicate column names")
+    if any(dtype != np.dtype('<f8') for _, dtype in header['columns']):
+        raise ColumnarFormatError("Request columns must be little-endian float64 ('<f8')")
+
+    count = len(names) * header['rows']
+    if offset + 8 * count != len(body):
+        raise ColumnarFormatError(f"Expected {offset + 8 * count} bytes, got {len(body)}")
+    data = np.frombuffer(body, dtype='<f8', count=count, offset=offset)
+    return names, data.reshape(len(names), header['rows'])
@@ -0,0 +1,169 @@
+"""
+Inference executor for CarbonScoreX
+Runs CPU-bound scoring off the asyncio event loop with bounded concurrency
+"""
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from metrics import STAGE_SECONDS
+
+# Predictor owned by each process-pool worker, loaded once by _init_worker
+_worker_predictor = None
+
+
+# Time calls wait for a free inference thread
+_QUEUE = STAGE_SECONDS.labels('queue')
+
+
+class ExecutorBusyError(Exception):
+    """Raised when the inference queue is full and the request should be retried"""
+
+
+def _init_worker(model_path: str, version: Optional[str] = None):
+    global _worker_predictor
+    from inference import CarbonScorePredictor
+    _worker_predictor = CarbonScorePredictor(model_path=model_path, version=version)
+    _worker_predictor.warm_up()
+
+
+def _worker_model_version() -> str:
+    return _worker_predictor.model_version
+
+
+def _after_queue(fn: Callable, submitted: float, *args) -> Any:
+    _QUEUE.lap(submitted)
+    return fn(*args)
+
+
+def _worker_predict_batch(companies: List[Dict[str, Any]], **options) -> List[Dict[str, Any]]:
+    return _worker_predictor.predict_batch(companies, **options)
+
+
+class InferenceExecutor:
+    """
+    Thread pool for model calls plus an optional process pool for large batches
+
+    At most max_pending calls may be running or waiting at once; further calls
+    fail fast with ExecutorBusyError instead of queueing without bound.
+    """
+
+    def __init__(self, max_threads: int = 4, max_pending: int = 64,
+                 process_workers: int = 0, process_batch_min: int = 5000,
+                 model_path: Optional[str] = None, model_version: Optional[str] = None):
+        """
+        Initialize executor pools
+
+        Args:
+            max_threads: Concurrent model calls on the thread pool
+            max_pending: Maximum running plus waiting calls before rejecting
+            process_workers: Size of the process pool for large batches (0 disables)
+            process_batch_min: Smallest batch sent to the process pool
+            model_path: Model directory each process-pool worker loads
+            model_version: Version label passed to the workers' predictors
+        """
+        self.max_threads = max_threads
+        self.max_pending = max_pending
+        self.process_workers = process_workers
+        self.process_batch_min = process_batch_min
+        self._threads = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix='inference')
+        self._processes = None
+        if process_workers > 0 and model_path is not None:
+            self._processes = self._start_processes(model_path, model_version)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def _start_processes(self, model_path, model_version):
+        return ProcessPoolExecutor(
+            max_workers=self.process_workers,
+            initializer=_init_worker,
+            initargs=(model_path, model_version)
+        )
+
+    async def reload_workers(self, model_path: str, model_version: Optional[str] = None):
+        """
+        Replace the process pool with workers serving another model
+
+        The new workers load and warm the model before they take any batch;
+        batches already running finish on the old workers.
+        """
+        if self.process_workers <= 0:
+            return
+        pool = self._start_processes(model_path, model_version)
+        loop = asyncio.get_running_loop()
+        try:
+            # A worker whose initializer fails breaks the pool and raises here
+            await asyncio.gather(*[
+                loop.run_in_executor(pool, _worker_model_version) for _ in range(self.process_workers)
+            ])
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+        # Swapped on the event loop thread, so run_batch never sees a shut-down pool
+        old, self._processes = self._processes, pool
+        if old is not None:
+            old.shutdown(wait=False)
+
+    def _acquire(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise ExecutorBusyError(
+                    f"Inference queue full ({self.max_pending} requests pending)"
+                )
+            self._pending += 1
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run fn(*args) on the thread pool without blocking the event loop"""
+        self._acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._threads, _after_queue, fn, time.perf_counter(), *args)
+        finally:
+            self._release()
+
+    async def run_batch(self, fn: Callable, companies: List[Dict[str, Any]], **options) -> Any:
+        """
+        Score a batch off the event loop
+
+        Batches of at least process_batch_min rows go to the process pool (when
+        enabled) as predict_batch(companies, **options) calls; everything else
+        runs fn(companies, **options) on a thread.
+        """
+        if self._processes is None or len(companies) < self.process_batch_min:
+            return await self.run(functools.partial(fn, **options), companies)
+
+        self._acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._processes, functools.partial(_worker_predict_batch, **options), companies
+            )
+        finally:
+            self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Current queue depth and configuration"""
+        with self._lock:
+            return {
+                'pending': self._pending,
+                'max_pending': self.max_pending,
+                'max_threads': self.max_threads,
+                'process_pool': self._processes is not None,
+                'rejected': self.rejected
+            }
+
+    def shutdown(self):
+        """Stop accepting work and release pool resources"""
+        self._threads.shutdown(wait=False)
+        if self._processes is not None:
+            self._processes.shutdown(wait=False)
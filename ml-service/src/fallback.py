@@ -0,0 +1,133 @@
+"""
+Rule-based fallback scoring for CarbonScoreX
+Deterministic carbon scores from a few environmental metrics, vectorized over
+whole batches, for when no ML model is loaded
+"""
+import numpy as np
+from typing import Any, Dict, List
+
+from categories import CATEGORY_LABELS, category_codes
+from metrics import FALLBACK_PREDICTIONS
+
+FALLBACK_VERSION = 'rule_based_fallback'
+
+# Inputs of the rule-based formula, in matrix column order
+FALLBACK_FEATURES = ['renewable_energy_pct', 'waste_recycled_pct', 'emissions_co2', 'energy_consumption']
+
+FALLBACK_CONFIDENCE = 0.7
+FALLBACK_RECOMMENDATIONS = ('ML service unavailable - using deterministic scoring',)
+
+
+def fallback_scores(matrix: np.ndarray) -> np.ndarray:
+    """
+    Rule-based carbon scores for a batch of companies
+
+    Terms are applied in the same order as the original per-company formula,
+    so each score matches it exactly.
+
+    Args:
+        matrix: (n_companies, len(FALLBACK_FEATURES)) array; NaN counts as 0
+
+    Returns:
+        float64 array of scores clipped to 0-100
+    """
+    renewable, recycling, emissions, energy = np.nan_to_num(matrix, nan=0.0).T
+
+    # Renewable energy contribution (0-25 points)
+    scores = 50 + (renewable / 100) * 25
+
+    # Waste recycling contribution (0-20 points)
+    scores += (recycling / 100) * 20
+
+    # Emissions penalty (0 to -30 points), normalized over a typical 0-10000 range
+    scores -= np.minimum(np.maximum(emissions, 0) / 10000, 1.0) * 30
+
+    # Energy efficiency bonus (15 points)
+    scores += np.where((energy > 0) & (renewable > 50), 15, 0)
+
+    return np.clip(scores, 0, 100)
+
+
+class FallbackScorer:
+    """
+    Rule-based stand-in for CarbonScorePredictor
+
+    Provides the scoring methods the API calls on a predictor, so single,
+    batch, streaming and columnar requests score the fallback through the
+    same paths as a model.
+    """
+    model_version = FALLBACK_VERSION
+    supports_contributions = False
+
+    def __init__(self):
+        self.metadata = {}
+        self.feature_names = list(FALLBACK_FEATURES)
+
+    def predict(self, company_data: Dict[str, Any], explain: str = 'global') -> Dict[str, Any]:
+        """Score one company, shaped like CarbonScorePredictor.predict"""
+        return self.predict_batch([company_data], explain=explain)[0]
+
+    def predict_batch(self, companies: List[Dict[str, Any]], use_cache: bool = False,
+                      explain: str = 'global') -> List[Dict[str, Any]]:
+        """
+        Score many companies in one vectorized pass
+
+        Args:
+            companies: List of dictionaries with company metrics
+            use_cache: Accepted for interface compatibility; fallback scores are not cached
+            explain: 'none' omits the explanation; any other mode gets the
+                rule-based note
+
+        Returns:
+            List of prediction dictionaries, in input order
+        """
+        if not companies:
+            return []
+        scores = self.predict_scores(self.extract_matrix(companies))
+        categories = CATEGORY_LABELS[self.category_codes(scores)].tolist()
+        with_explanation = explain != 'none'
+        return [
+            {
+                'score': score,
+                'category': category,
+                'explanation': {
+                    'method': FALLBACK_VERSION,
+                    'recommendations': list(FALLBACK_RECOMMENDATIONS)
+                } if with_explanation else None,
+                'confidence': FALLBACK_CONFIDENCE,
+                'model_version': FALLBACK_VERSION
+            }
+            for score, category in zip(scores.tolist(), categories)
+        ]
+
+    def fallback_score(self, company_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Deterministic fallback scoring for one company"""
+        return self.predict(company_data)
+
+    def predict_scores(self, features: np.ndarray) -> np.ndarray:
+        """Scores only, for a (n_companies, len(FALLBACK_FEATURES)) matrix"""
+        FALLBACK_PREDICTIONS.inc(len(features))
+        return fallback_scores(features)
+
+    def category_codes(self, scores: np.ndarray) -> np.ndarray:
+        """uint8 index into CATEGORY_LABELS of each score's category"""
+        return category_codes(scores)
+
+    def extract_matrix(self, companies: List[Dict[str, Any]]) -> np.ndarray:
+        """Formula inputs of each company; missing or null values become NaN"""
+        matrix = np.empty((len(companies), len(FALLBACK_FEATURES)))
+        for i, name in enumerate(FALLBACK_FEATURES):
+            matrix[:, i] = [company.get(name) for company in companies]
+        return matrix
+
+    def extract_columns(self, columns, n_rows: int) -> np.ndarray:
+        """Formula inputs from column-oriented input; absent columns are NaN"""
+        matrix = np.full((n_rows, len(FALLBACK_FEATURES)), np.nan)
+        for i, name in enumerate(FALLBACK_FEATURES):
+            if name in columns:
+                matrix[:, i] = columns[name]
+        return matrix
+
+    def extract_column_block(self, names: List[str], block: np.ndarray) -> np.ndarray:
+        """Formula inputs from a (n_columns, n_rows) block of column-major input"""
+        return self.extract_columns(dict(zip(names, block)), block.shape[1])
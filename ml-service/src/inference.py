@@ -3,39 +3,298 @@ Inference module for CarbonScoreX
 Loads trained model and generates predictions with explanations
 """
 import os
-import joblib
+import hashlib
+import time
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, List
+
+from bundle import read_bundle
+from categories import CATEGORY_LABELS, category_codes, category_label
+from fallback import FallbackScorer
+from metrics import STAGE_SECONDS
+from target_rule import CarbonScoreRule
+
+# Recommendation sets by score band (< 50, < 70, >= 70)
+RECOMMENDATION_THRESHOLDS = np.array([50, 70])
+RECOMMENDATIONS = (
+    (
+        "Critical: Immediate action required to reduce carbon footprint",
+        "Consider switching to renewable energy sources",
+        "Implement comprehensive waste recycling program"
+    ),
+    (
+        "Increase renewable energy usage to above 50%",
+        "Improve waste management and recycling rates"
+    ),
+    (
+        "Maintain current excellent environmental practices",
+        "Consider carbon offset programs to achieve net-zero"
+    )
+)
+
+# Explanation detail: global importance ranking, per-company contributions, or none
+EXPLAIN_MODES = ('global', 'contributions', 'none')
+
+# Features listed in an explanation
+TOP_FEATURES = 5
+
+_fallback_scorer = FallbackScorer()
+
+# Per-stage timing series; each stage's lap() records it and starts the next
+_EXTRACT = STAGE_SECONDS.labels('extract')
+_CACHE = STAGE_SECONDS.labels('cache')
+_SCALE = STAGE_SECONDS.labels('scale')
+_MODEL = STAGE_SECONDS.labels('model')
+_EXPLAIN = STAGE_SECONDS.labels('explain')
+
+# Accepted input spellings for each known feature, in lookup order
+FEATURE_ALIASES = {
+    'energy_consumption': ('energy_consumption', 'energy_usage', 'power_consumption'),
+    'renewable_energy_pct': ('renewable_energy_pct', 'renewable_pct', 'clean_energy_pct'),
+    'waste_recycled_pct': ('waste_recycled_pct', 'recycling_pct', 'waste_recycling'),
+    'emissions_co2': ('emissions_co2', 'co2_emissions', 'carbon_emissions'),
+    'water_usage': ('water_usage', 'water_consumption'),
+    'employee_count': ('employee_count', 'employees', 'workforce'),
+    'production_volume': ('production_volume', 'output', 'production')
+}
+
+def compile_extraction_plan(feature_names: List[str]) -> tuple:
+    """
+    Resolve input aliases for each training feature once
+    
+    Args:
+        feature_names: Feature names in model input order
+        
+    Returns:
+        Tuple where entry i is the ordered tuple of input keys accepted for feature i
+    """
+    plan = []
+    for feat_name in feature_names:
+        keys = (feat_name,)
+        for alt_names in FEATURE_ALIASES.values():
+            if feat_name in alt_names:
+                keys += tuple(alt for alt in alt_names if alt != feat_name)
+                break
+        plan.append(keys)
+    return tuple(plan)
+
+def _resolve_feature(data: Dict[str, Any], keys: tuple) -> float:
+    """
+    Value of the first of keys present in data; 0 if none is, or if it is null
+    
+    Presence decides, as in the original per-prediction lookup: a key given
+    as null is not skipped in favour of a later alias.
+    """
+    for key in keys:
+        if key in data:
+            value = data[key]
+            return float(value) if value is not None else 0.0
+    return 0.0
+
+class TreeEnsemble:
+    """
+    Pure-numpy evaluator for a tree ensemble flattened by train_model.flatten_tree_ensemble
+    
+    All trees share flat per-node arrays (split feature, threshold, left/right child,
+    leaf value) where right = left + 1 and leaves point to themselves. A batch is
+    traversed by stepping every (row, tree) cursor max_depth times with vectorized gathers.
+    
+    When the export includes per-node expected values, the same traversal also
+    yields path attributions (Saabas): each split on the path credits its feature
+    with the change in expected output, so contributions plus the bias sum
+    exactly to the prediction.
+    """
+    
+    # Rows traversed per step, bounding the (rows x trees) cursor arrays
+    CHUNK_ROWS = 2048
+    
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.feature = np.asarray(arrays['feature'], dtype=np.intp)
+        self.threshold = np.asarray(arrays['threshold'], dtype=np.float64)
+        self.left = np.asarray(arrays['left'], dtype=np.intp)
+        self.right = np.asarray(arrays['right'], dtype=np.intp)
+        self.value = np.asarray(arrays['value'], dtype=np.float64)
+        # Bundles exported before path attributions were added have no node values
+        self.node_value = None
+        if 'node_value' in arrays:
+            self.node_value = np.asarray(arrays['node_value'], dtype=np.float64)
+        self.default_left = np.asarray(arrays['default_left'], dtype=bool)
+        self.roots = np.asarray(arrays['roots'], dtype=np.intp)
+        self.base_score = float(arrays['base_score'])
+        self.average = bool(arrays['average'])
+        self.max_depth = int(arrays['max_depth'])
+        self.n_features = int(arrays['n_features'])
+        self.feature_importances_ = np.asarray(arrays['feature_importances'], dtype=np.float64)
+    
+    @property
+    def supports_contributions(self) -> bool:
+        return self.node_value is not None
+    
+    @property
+    def bias(self) -> float:
+        """Expected prediction before any split: the contributions' baseline"""
+        roots = self.node_value[self.roots]
+        return float(roots.mean() if self.average else roots.sum()) + self.base_score
+    
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict scores for a 2-D (already scaled) feature matrix
+        
+        Args:
+            X: Array of shape (n_rows, n_features)
+            
+        Returns:
+            float64 array of shape (n_rows,)
+        """
+        return self._traverse(X, None)
+    
+    def predict_contributions(self, X: np.ndarray) -> tuple:
+        """
+        Predict scores and per-feature path attributions in one traversal
+        
+        Args:
+            X: Array of shape (n_rows, n_features)
+            
+        Returns:
+            (predictions, contributions) where contributions has shape
+            (n_rows, n_features) and each row sums to prediction - bias
+        """
+        if not self.supports_contributions:
+            raise ValueError("Model export has no node values; re-export it to get contributions")
+        contributions = np.zeros((np.shape(X)[0], self.n_features))
+        return self._traverse(X, contributions), contributions
+    
+    def _traverse(self, X, contributions):
+        # Trees were fitted on float32 inputs; compare in the same precision
+        X = np.ascontiguousarray(X, dtype=np.float32).reshape(-1, self.n_features)
+        out = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], self.CHUNK_ROWS):
+            stop = start + self.CHUNK_ROWS
+            out[start:stop] = self._predict_chunk(
+                X[start:stop], None if contributions is None else contributions[start:stop]
+            )
+        return out
+    
+    def _predict_chunk(self, X: np.ndarray, contributions=None) -> np.ndarray:
+        n_rows, n_trees = X.shape[0], len(self.roots)
+        flat_X = X.ravel()
+        has_missing = bool(np.isnan(flat_X).any())
+        nodes = np.tile(self.roots, n_rows)
+        row_offsets = np.repeat(np.arange(n_rows) * self.n_features, n_trees)
+        
+        for _ in range(self.max_depth):
+            feature_offsets = row_offsets + self.feature[nodes]
+            x = flat_X[feature_offsets]
+            go_right = x > self.threshold[nodes]
+            if has_missing:
+                go_right |= np.isnan(x) & ~self.default_left[nodes]
+            children = self.left[nodes] + go_right
+            if contributions is not None:
+                # Leaves step to themselves, adding zero
+                contributions += np.bincount(
+                    feature_offsets, weights=self.node_value[children] - self.node_value[nodes],
+                    minlength=contributions.size
+                ).reshape(contributions.shape)
+            nodes = children
+        
+        if contributions is not None and self.average:
+            contributions /= n_trees
+        
+        leaf_values = self.value[nodes].reshape(n_rows, n_trees)
+        totals = leaf_values.mean(axis=1) if self.average else leaf_values.sum(axis=1)
+        return totals + self.base_score
+
+def _file_digest(path: str, length: int = 12) -> str:
+    """Short content hash identifying a model artifact"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:length]
+
+def _plain_values(value):
+    """Copy of a metadata value with numpy scalars and arrays as Python values"""
+    if isinstance(value, dict):
+        return {key: _plain_values(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_plain_values(item) for item in value)
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return value
+
+def _scaler_arrays(scaler, n_features: int) -> tuple:
+    """
+    Precompute a fitted StandardScaler as plain (mean, scale) arrays
+    
+    Returns (None, None) for other scaler types, which keep using transform()
+    """
+    if not (hasattr(scaler, 'with_mean') and hasattr(scaler, 'scale_')):
+        return None, None
+    
+    mean = np.zeros(n_features)
+    if scaler.with_mean and scaler.mean_ is not None:
+        mean = np.asarray(scaler.mean_, dtype=np.float64)
+    
+    # scale_ is None when fitted with with_std=False
+    scale = np.ones(n_features)
+    if scaler.scale_ is not None:
+        scale = np.asarray(scaler.scale_, dtype=np.float64)
+    
+    return mean, scale
 
 class CarbonScorePredictor:
     """Carbon score prediction with SHAP explanations"""
     
-    def __init__(self, model_path='../models'):
+    def __init__(self, model_path='../models', use_compiled=True, cache=None, version=None):
         """
         Initialize predictor with trained model
         
         Args:
             model_path: Directory containing model artifacts
+            use_compiled: Load the exported .bundle with the numpy engine when
+                available instead of unpickling the xgboost/sklearn model
+            cache: Optional cache.PredictionCache consulted by predict()
+            version: Label reported as model_version, e.g. the registry version
+                (default: model type and artifact content digest)
         """
         self.model_path = model_path
+        self.use_compiled = use_compiled
+        self.cache = cache
+        self.version_label = version
+        self.model_version = None
         self.model = None
         self.scaler = None
         self.feature_names = None
         self.metadata = None
+        self._extraction_plan = ()
+        self._scale_mean = None
+        self._scale_std = None
+        self._top_indices = np.array([], dtype=np.intp)
+        self._top_features = ()
         self.load_model()
     
     def load_model(self):
         """Load model and preprocessing artifacts"""
         try:
             # Try XGBoost model first
-            model_file = os.path.join(self.model_path, 'carbon_score_model_xgboost.joblib')
-            if not os.path.exists(model_file):
-                model_file = os.path.join(self.model_path, 'carbon_score_model_random_forest.joblib')
+            model_base = os.path.join(self.model_path, 'carbon_score_model_xgboost')
+            if not (os.path.exists(model_base + '.joblib') or os.path.exists(model_base + '.bundle')):
+                model_base = os.path.join(self.model_path, 'carbon_score_model_random_forest')
             
-            self.model = joblib.load(model_file)
-            self.scaler = joblib.load(os.path.join(self.model_path, 'scaler.joblib'))
-            self.feature_names = joblib.load(os.path.join(self.model_path, 'feature_names.joblib'))
-            self.metadata = joblib.load(os.path.join(self.model_path, 'model_metadata.joblib'))
+            bundle_file = model_base + '.bundle'
+            if self.use_compiled and os.path.exists(bundle_file):
+                self._load_bundle(bundle_file)
+            else:
+                self._load_joblib(model_base + '.joblib')
+            
+            self._extraction_plan = compile_extraction_plan(self.feature_names)
+            self._rank_importances()
+            if self.version_label is not None:
+                self.model_version = self.version_label
+            if self.cache is not None:
+                self.cache.bind_model(self.model_version)
             
             print(f"✓ Model loaded: {self.metadata['model_type']}")
             print(f"✓ Features: {len(self.feature_names)}")
@@ -43,106 +302,316 @@ class CarbonScorePredictor:
             print(f"Error loading model: {e}")
             raise
     
-    def predict(self, company_data: Dict[str, Any]) -> Dict[str, Any]:
+    def _load_bundle(self, bundle_file: str):
+        """Load the single-file bundle: numpy engine, no joblib/xgboost/sklearn import"""
+        arrays, header = read_bundle(bundle_file)
+        self.model = TreeEnsemble(arrays)
+        self.scaler = None
+        self._scale_mean = arrays['scaler_mean']
+        self._scale_std = arrays['scaler_scale']
+        self.feature_names = header['feature_names']
+        self.metadata = header['metadata']
+        self.model_version = f"{self.metadata['model_type']}-{header['digest'][:12]}"
+    
+    def _load_joblib(self, model_file: str):
+        """Load the pickled model, scaler, feature names and metadata"""
+        import joblib
+        self.model = joblib.load(model_file)
+        self.scaler = joblib.load(os.path.join(self.model_path, 'scaler.joblib'))
+        self.feature_names = joblib.load(os.path.join(self.model_path, 'feature_names.joblib'))
+        # Metrics pickled by older scikit-learn are numpy scalars; responses need plain floats
+        self.metadata = _plain_values(joblib.load(os.path.join(self.model_path, 'model_metadata.joblib')))
+        self._scale_mean, self._scale_std = _scaler_arrays(self.scaler, len(self.feature_names))
+        self.model_version = f"{self.metadata['model_type']}-{_file_digest(model_file)}"
+    
+    @property
+    def target_rule(self):
+        """
+        CarbonScoreRule that produced the training target, to give new rows
+        the same synthetic score; None if the model was trained on
+        carbon_score labels
+        """
+        rule = (self.metadata or {}).get('target_rule')
+        return CarbonScoreRule.from_dict(rule) if rule else None
+    
+    def _rank_importances(self):
+        """Rank global feature importances once; they are fixed for a loaded model"""
+        importances = self._get_importances(len(self.feature_names))
+        self._top_indices = np.argsort(importances)[::-1][:TOP_FEATURES]
+        self._top_features = tuple(
+            (self.feature_names[idx], float(importances[idx])) for idx in self._top_indices
+        )
+    
+    @property
+    def supports_contributions(self) -> bool:
+        """Whether explain='contributions' yields per-company attributions"""
+        return getattr(self.model, 'supports_contributions', False)
+    
+    def predict(self, company_data: Dict[str, Any], explain: str = 'global') -> Dict[str, Any]:
         """
         Predict carbon score for company
         
         Args:
             company_data: Dictionary with company metrics
+            explain: One of EXPLAIN_MODES: 'global' lists the model's most important
+                features, 'contributions' this company's largest per-feature
+                contributions, 'none' skips the explanation
             
         Returns:
-            Dictionary with score, category, and explanation
+            Dictionary with score, category, explanation and the model version used
         """
         # Extract features in correct order
+        start = time.perf_counter()
         features = self._extract_features(company_data)
+        start = _EXTRACT.lap(start)
+        
+        # Equivalent inputs (e.g. alias spellings) share one canonical feature vector
+        if self.cache is not None:
+            cache_key = (self.model_version, explain, features.tobytes())
+            cached = self.cache.get(cache_key)
+            start = _CACHE.lap(start)
+            if cached is not None:
+                return dict(cached)
+        
+        if explain == 'contributions':
+            result = self._predict_matrix(features.reshape(1, -1), explain)[0]
+            if self.cache is not None:
+                self.cache.put(cache_key, result)
+                return dict(result)
+            return result
         
         # Scale features
-        features_scaled = self.scaler.transform(features.reshape(1, -1))
+        features_scaled = self._scale_features(features.reshape(1, -1))
+        start = _SCALE.lap(start)
         
         # Predict
         score = self.model.predict(features_scaled)[0]
         
-        # Ensure score is in valid range
-        score = np.clip(score, 0, 100)
+        # Ensure score is in valid range (as a plain float so it serializes)
+        score = float(np.clip(score, 0, 100))
+        start = _MODEL.lap(start)
         
         # Determine category
         category = self._get_category(score)
         
         # Generate explanation
-        explanation = self._generate_explanation(features, score)
+        explanation = None
+        if explain != 'none':
+            explanation = self._generate_explanation(features, score)
+            _EXPLAIN.lap(start)
         
-        return {
+        result = {
             'score': float(score),
             'category': category,
             'explanation': explanation,
-            'confidence': self._calculate_confidence(score)
+            'confidence': self._calculate_confidence(score),
+            'model_version': self.model_version
         }
+        
+        if self.cache is not None:
+            self.cache.put(cache_key, result)
+            # Callers annotate the result, so hand out a copy of the cached dict
+            return dict(result)
+        return result
+    
+    def predict_batch(self, companies: List[Dict[str, Any]], use_cache: bool = False,
+                      explain: str = 'global') -> List[Dict[str, Any]]:
+        """
+        Predict carbon scores for many companies in one vectorized pass
+        
+        Args:
+            companies: List of dictionaries with company metrics
+            use_cache: Serve rows from the prediction cache and store new results in it
+            explain: Explanation detail, as for predict()
+            
+        Returns:
+            List of prediction dictionaries, in input order, shaped like predict()
+        """
+        if not companies:
+            return []
+        
+        start = time.perf_counter()
+        features = self._extract_matrix(companies)
+        start = _EXTRACT.lap(start)
+        if not use_cache or self.cache is None:
+            return self._predict_matrix(features, explain)
+        
+        results = [None] * len(companies)
+        keys = [(self.model_version, explain, row.tobytes()) for row in features]
+        for i, key in enumerate(keys):
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[i] = dict(cached)
+        _CACHE.lap(start)
+        
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            for i, result in zip(missing, self._predict_matrix(features[missing], explain)):
+                self.cache.put(keys[i], result)
+                results[i] = dict(result)
+        return results
+    
+    def predict_scores(self, features: np.ndarray) -> np.ndarray:
+        """
+        Scores only, for an extracted (n_companies, n_features) feature matrix
+        
+        Args:
+            features: Raw (unscaled) features in model input order
+            
+        Returns:
+            float64 array of scores clipped to 0-100
+        """
+        start = time.perf_counter()
+        features_scaled = self._scale_features(features)
+        start = _SCALE.lap(start)
+        scores = np.clip(self.model.predict(features_scaled), 0, 100).astype(np.float64)
+        _MODEL.lap(start)
+        return scores
+    
+    def warm_up(self, n_rows: int = 256):
+        """
+        Score placeholder rows once so the first real requests do not pay
+        one-time costs (faulting in mapped model pages, allocator growth)
+        """
+        features = np.zeros((n_rows, len(self.feature_names)))
+        for explain in EXPLAIN_MODES:
+            self._predict_matrix(features, explain)
+        self._predict_matrix(features[:1])
+    
+    def _predict_matrix(self, features: np.ndarray, explain: str = 'global') -> List[Dict[str, Any]]:
+        """Score an extracted feature matrix, scaling and predicting it in single calls"""
+        if explain == 'contributions' and self.supports_contributions:
+            start = time.perf_counter()
+            features_scaled = self._scale_features(features)
+            start = _SCALE.lap(start)
+            predictions, contributions = self.model.predict_contributions(features_scaled)
+            scores = np.clip(predictions, 0, 100)
+            start = _MODEL.lap(start)
+            explanations = self._generate_contribution_explanations(features, scores, contributions)
+            _EXPLAIN.lap(start)
+        else:
+            scores = self.predict_scores(features)
+            if explain == 'none':
+                explanations = [None] * len(scores)
+            else:
+                start = time.perf_counter()
+                explanations = self._generate_explanations(features, scores)
+                if explain == 'contributions':
+                    # Models exported without node values only have global importances
+                    for explanation in explanations:
+                        explanation['method'] = 'global_importance'
+                _EXPLAIN.lap(start)
+        
+        categories = self._get_categories(scores)
+        # Confidence depends only on training metrics, so every row shares it
+        confidence = self._calculate_confidence(None)
+        model_version = self.model_version
+        
+        return [
+            {
+                'score': score,
+                'category': category,
+                'explanation': explanation,
+                'confidence': confidence,
+                'model_version': model_version
+            }
+            for score, category, explanation in zip(scores.tolist(), categories, explanations)
+        ]
+    
+    def _scale_features(self, features: np.ndarray) -> np.ndarray:
+        """Standardize a feature matrix without sklearn's per-call validation"""
+        if self._scale_mean is None:
+            return self.scaler.transform(features)
+        scaled = features - self._scale_mean
+        scaled /= self._scale_std
+        return scaled
     
     def _extract_features(self, data: Dict[str, Any]) -> np.ndarray:
         """Extract features from input data matching training features"""
-        # Map common input fields to expected features
-        feature_mapping = {
-            'energy_consumption': ['energy_consumption', 'energy_usage', 'power_consumption'],
-            'renewable_energy_pct': ['renewable_energy_pct', 'renewable_pct', 'clean_energy_pct'],
-            'waste_recycled_pct': ['waste_recycled_pct', 'recycling_pct', 'waste_recycling'],
-            'emissions_co2': ['emissions_co2', 'co2_emissions', 'carbon_emissions'],
-            'water_usage': ['water_usage', 'water_consumption'],
-            'employee_count': ['employee_count', 'employees', 'workforce'],
-            'production_volume': ['production_volume', 'output', 'production']
-        }
+        return np.array([
+            float(value) if (value := data.get(keys[0])) is not None else _resolve_feature(data, keys)
+            for keys in self._extraction_plan
+        ], dtype=np.float64)
+    
+    def _extract_matrix(self, companies: List[Dict[str, Any]]) -> np.ndarray:
+        """Extract a contiguous (n_companies, n_features) float64 feature matrix"""
+        matrix = np.empty((len(companies), len(self._extraction_plan)), dtype=np.float64)
+        for i, keys in enumerate(self._extraction_plan):
+            # Fill column-wise, with a fast path for the canonical spelling
+            key = keys[0]
+            matrix[:, i] = [
+                float(value) if (value := data.get(key)) is not None else _resolve_feature(data, keys)
+                for data in companies
+            ]
+        return matrix
+    
+    def extract_columns(self, columns, n_rows: int) -> np.ndarray:
+        """
+        Extract a feature matrix from column-oriented input (e.g. a DataFrame chunk)
         
-        features = []
-        for feat_name in self.feature_names:
-            # Try direct match first
-            value = data.get(feat_name, None)
-            
-            # Try alternative names
-            if value is None:
-                for alt_names in feature_mapping.values():
-                    if feat_name in alt_names:
-                        for alt in alt_names:
-                            if alt in data:
-                                value = data[alt]
-                                break
-                        break
+        Uses the same alias resolution as _extract_features: the first of a
+        feature's accepted keys present as a column, with missing values as 0.
+        
+        Args:
+            columns: Mapping of input column name to array-like of values
+            n_rows: Number of rows
             
-            # Default to 0 if not found
-            features.append(float(value) if value is not None else 0.0)
+        Returns:
+            float64 array of shape (n_rows, n_features)
+        """
+        matrix = np.zeros((n_rows, len(self._extraction_plan)))
+        for i, keys in enumerate(self._extraction_plan):
+            for key in keys:
+                if key in columns:
+                    matrix[:, i] = columns[key]
+                    break
+        matrix[np.isnan(matrix)] = 0.0
+        return matrix
+    
+    def extract_column_block(self, names: List[str], block: np.ndarray) -> np.ndarray:
+        """
+        Feature matrix from a (n_columns, n_rows) block of column-major input
+        
+        When the columns are exactly the model features in order and nothing is
+        missing, the result is the transposed block itself, without a copy.
         
-        return np.array(features)
+        Args:
+            names: Column name of each block row
+            block: float64 array, NaN where a value is missing
+            
+        Returns:
+            float64 array of shape (n_rows, n_features)
+        """
+        if list(names) == list(self.feature_names) and not np.isnan(block).any():
+            return block.T
+        return self.extract_columns(dict(zip(names, block)), block.shape[1])
     
     def _get_category(self, score: float) -> str:
         """Categorize score"""
-        if score >= 80:
-            return 'Excellent'
-        elif score >= 65:
-            return 'Good'
-        elif score >= 50:
-            return 'Fair'
-        else:
-            return 'Poor'
+        return category_label(score)
+    
+    def _get_categories(self, scores: np.ndarray) -> list:
+        """Categorize an array of scores"""
+        return CATEGORY_LABELS[self.category_codes(scores)].tolist()
+    
+    def category_codes(self, scores: np.ndarray) -> np.ndarray:
+        """uint8 index into CATEGORY_LABELS of each score's category"""
+        return category_codes(scores)
+    
+    def _get_importances(self, n_features: int) -> np.ndarray:
+        """Feature importances of the loaded model, uniform if unavailable"""
+        if hasattr(self.model, 'feature_importances_'):
+            return self.model.feature_importances_
+        return np.ones(n_features) / n_features
     
     def _generate_explanation(self, features: np.ndarray, score: float) -> Dict[str, Any]:
         """Generate human-readable explanation of score"""
-        # Get feature importances
-        if hasattr(self.model, 'feature_importances_'):
-            importances = self.model.feature_importances_
-        else:
-            importances = np.ones(len(features)) / len(features)
-        
-        # Get top contributing features
-        top_indices = np.argsort(importances)[::-1][:5]
-        
-        top_features = {}
-        for idx in top_indices:
-            feature_name = self.feature_names[idx]
-            importance = float(importances[idx])
-            feature_value = float(features[idx])
-            
-            top_features[feature_name] = {
-                'importance': importance,
-                'value': feature_value
-            }
+        # Top features by global importance, ranked at load time
+        top_values = features[self._top_indices].tolist()
+        top_features = {
+            feature_name: {'importance': importance, 'value': value}
+            for (feature_name, importance), value in zip(self._top_features, top_values)
+        }
         
         # Generate recommendations
         recommendations = self._generate_recommendations(score, top_features)
@@ -157,22 +626,68 @@ class CarbonScorePredictor:
             }
         }
     
+    def _generate_explanations(self, features: np.ndarray, scores: np.ndarray) -> List[Dict[str, Any]]:
+        """Generate explanations for a batch, computing each part column-wise"""
+        top_values = features[:, self._top_indices].tolist()
+        explanations = self._explanation_frames(scores)
+        for explanation, values in zip(explanations, top_values):
+            explanation['top_features'] = {
+                name: {'importance': importance, 'value': value}
+                for (name, importance), value in zip(self._top_features, values)
+            }
+        return explanations
+    
+    def _generate_contribution_explanations(self, features: np.ndarray, scores: np.ndarray,
+                                            contributions: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Explanations listing each company's largest per-feature contributions
+        
+        Contributions are in score points relative to base_value, the model's
+        expected score, and sum to the unclipped prediction.
+        """
+        n_top = min(TOP_FEATURES, contributions.shape[1])
+        top = np.argsort(-np.abs(contributions), axis=1, kind='stable')[:, :n_top]
+        top_contributions = np.take_along_axis(contributions, top, axis=1).tolist()
+        top_values = np.take_along_axis(features, top, axis=1).tolist()
+        names = self.feature_names
+        importances = self._get_importances(len(names)).tolist()
+        base_value = self.model.bias
+        
+        explanations = self._explanation_frames(scores)
+        for explanation, indices, row_contributions, values in zip(
+                explanations, top.tolist(), top_contributions, top_values):
+            explanation['top_features'] = {
+                names[idx]: {'contribution': contribution, 'value': value, 'importance': importances[idx]}
+                for idx, contribution, value in zip(indices, row_contributions, values)
+            }
+            explanation['base_value'] = base_value
+            explanation['method'] = 'path_attribution'
+        return explanations
+    
+    def _explanation_frames(self, scores: np.ndarray) -> List[Dict[str, Any]]:
+        """Per-row recommendations and score breakdown shared by every explanation mode"""
+        environmental = np.minimum(scores * 0.4, 40).tolist()
+        sustainability = np.minimum(scores * 0.35, 35).tolist()
+        compliance = np.minimum(scores * 0.25, 25).tolist()
+        tiers = np.searchsorted(RECOMMENDATION_THRESHOLDS, scores, side='right').tolist()
+        
+        return [
+            {
+                'top_features': None,
+                'recommendations': list(RECOMMENDATIONS[tier]),
+                'score_breakdown': {
+                    'environmental_impact': environmental[i],
+                    'sustainability_practices': sustainability[i],
+                    'regulatory_compliance': compliance[i]
+                }
+            }
+            for i, tier in enumerate(tiers)
+        ]
+    
     def _generate_recommendations(self, score: float, top_features: Dict) -> list:
         """Generate actionable recommendations"""
-        recommendations = []
-        
-        if score < 50:
-            recommendations.append("Critical: Immediate action required to reduce carbon footprint")
-            recommendations.append("Consider switching to renewable energy sources")
-            recommendations.append("Implement comprehensive waste recycling program")
-        elif score < 70:
-            recommendations.append("Increase renewable energy usage to above 50%")
-            recommendations.append("Improve waste management and recycling rates")
-        else:
-            recommendations.append("Maintain current excellent environmental practices")
-            recommendations.append("Consider carbon offset programs to achieve net-zero")
-        
-        return recommendations
+        tier = int(np.searchsorted(RECOMMENDATION_THRESHOLDS, score, side='right'))
+        return list(RECOMMENDATIONS[tier])
     
     def _calculate_confidence(self, score: float) -> float:
         """Calculate prediction confidence (0-1)"""
@@ -180,44 +695,12 @@ class CarbonScorePredictor:
         if self.metadata:
             # Higher R² = higher confidence
             base_confidence = self.metadata.get('test_r2', 0.8)
-            return min(base_confidence + 0.1, 0.95)
+            return float(min(base_confidence + 0.1, 0.95))
         return 0.85
     
     def fallback_score(self, company_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Deterministic fallback scoring when ML model is unavailable
-        Rule-based scoring system
+        Rule-based scoring system (see fallback.FallbackScorer)
         """
-        score = 50  # Base score
-        
-        # Renewable energy contribution (0-25 points)
-        renewable_pct = company_data.get('renewable_energy_pct', 0)
-        score += (renewable_pct / 100) * 25
-        
-        # Waste recycling contribution (0-20 points)
-        recycling_pct = company_data.get('waste_recycled_pct', 0)
-        score += (recycling_pct / 100) * 20
-        
-        # Emissions penalty (0 to -30 points)
-        emissions = company_data.get('emissions_co2', 0)
-        if emissions > 0:
-            # Normalize emissions (assuming typical range 0-10000)
-            normalized_emissions = min(emissions / 10000, 1.0)
-            score -= normalized_emissions * 30
-        
-        # Energy efficiency bonus (0-15 points)
-        energy = company_data.get('energy_consumption', 0)
-        if energy > 0 and renewable_pct > 50:
-            score += 15
-        
-        score = np.clip(score, 0, 100)
-        
-        return {
-            'score': float(score),
-            'category': self._get_category(score),
-            'explanation': {
-                'method': 'rule_based_fallback',
-                'recommendations': ['ML service unavailable - using deterministic scoring']
-            },
-            'confidence': 0.7
-        }
\ No newline at end of file
+        return _fallback_scorer.fallback_score(company_data)
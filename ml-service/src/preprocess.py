@@ -2,26 +2,40 @@
 Data preprocessing module for CarbonScoreX ML model
 Loads and cleans the carbon emissions dataset
 """
+import os
+from collections import Counter
+
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.impute import SimpleImputer
 
-def load_and_preprocess_data(filepath='/mnt/data/dataset pccoe.csv'):
+from target_rule import CarbonScoreRule
+
+# Rows read per chunk by stream_preprocess_data
+STREAM_CHUNK_ROWS = 100000
+# Observed values per numeric column kept to estimate its median
+MEDIAN_SAMPLE_SIZE = 100000
+
+def load_and_preprocess_data(filepath='/mnt/data/dataset pccoe.csv', data=None):
     """
     Load and preprocess the carbon emissions dataset
     
     Args:
         filepath: Path to the CSV file
+        data: DataFrame to preprocess instead of reading filepath
         
     Returns:
         X: Feature matrix
         y: Target variable (carbon score 0-100)
         feature_names: List of feature names
         scaler: Fitted StandardScaler for inference
+        label_encoders: Fitted LabelEncoder per categorical column
+        target_rule: CarbonScoreRule that produced y, or None if the dataset
+            has a carbon_score column
     """
     # Load the dataset
-    df = pd.read_csv(filepath)
+    df = pd.read_csv(filepath) if data is None else data
     
     print(f"Dataset loaded: {df.shape[0]} rows, {df.shape[1]} columns")
     print(f"Columns: {df.columns.tolist()}")
@@ -38,12 +52,14 @@ def load_and_preprocess_data(filepath='/mnt/data/dataset pccoe.csv'):
     # Categorical columns: fill with mode
     categorical_columns = df_processed.select_dtypes(include=['object']).columns
     for col in categorical_columns:
-        df_processed[col].fillna(df_processed[col].mode()[0] if len(df_processed[col].mode()) > 0 else 'Unknown', inplace=True)
+        df_processed[col] = df_processed[col].fillna(df_processed[col].mode()[0] if len(df_processed[col].mode()) > 0 else 'Unknown')
     
     # Feature engineering: Create carbon score based on key environmental metrics
     # This is a synthetic target if not present in dataset
+    target_rule = None
     if 'carbon_score' not in df_processed.columns:
-        df_processed['carbon_score'] = create_carbon_score(df_processed)
+        target_rule = CarbonScoreRule.fit(df_processed)
+        df_processed['carbon_score'] = target_rule.score(df_processed)
     
     # Encode categorical variables
     label_encoders = {}
@@ -70,45 +86,327 @@ def load_and_preprocess_data(filepath='/mnt/data/dataset pccoe.csv'):
     print(f"Features selected: {len(feature_columns)}")
     print(f"Target range: {y.min():.2f} - {y.max():.2f}")
     
-    return X_scaled, y, feature_columns, scaler, label_encoders
+    return X_scaled, y, feature_columns, scaler, label_encoders, target_rule
 
-def create_carbon_score(df):
+class _ColumnStats:
     """
-    Create a normalized carbon score (0-100) based on environmental metrics
-    Higher score = better environmental performance
+    One-pass statistics of a numeric column, updated chunk by chunk
     
-    Logic:
-    - High renewable energy % -> higher score
-    - High recycling % -> higher score
-    - Low emissions -> higher score
-    - Low energy consumption -> higher score
+    Count, mean and sum of squared deviations are merged with Chan et al.'s
+    parallel update; the median comes from a uniform bottom-k sample of the
+    observed values, exact while the column has at most sample_size of them.
     """
-    score = 50  # Base score
     
-    # Check for common column patterns
-    for col in df.columns:
-        col_lower = col.lower()
+    def __init__(self, sample_size, rng):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.max = np.nan
+        self.missing = 0
+        self.sample_size = sample_size
+        self.rng = rng
+        self.sample = np.empty(0)
+        self.sample_keys = np.empty(0)
+    
+    def update(self, values):
+        observed = values[~np.isnan(values)]
+        self.missing += len(values) - len(observed)
+        if not len(observed):
+            return
+        
+        mean = observed.mean()
+        self.count, self.mean, self.m2 = _merge_moments(
+            self.count, self.mean, self.m2, len(observed), mean, ((observed - mean) ** 2).sum()
+        )
+        self.max = np.fmax(self.max, observed.max())
         
-        # Renewable energy (positive factor)
-        if 'renewable' in col_lower or 'clean_energy' in col_lower:
-            score += (df[col] / df[col].max() * 20).fillna(0)
+        # Keep the values with the smallest random keys
+        self.sample = np.concatenate([self.sample, observed])
+        self.sample_keys = np.concatenate([self.sample_keys, self.rng.random(len(observed))])
+        if len(self.sample) > self.sample_size:
+            keep = np.argpartition(self.sample_keys, self.sample_size)[:self.sample_size]
+            self.sample, self.sample_keys = self.sample[keep], self.sample_keys[keep]
+    
+    @property
+    def median(self):
+        return float(np.median(self.sample)) if len(self.sample) else 0.0
+    
+    def imputed_moments(self):
+        """Mean and variance of the column once missing values are set to the median"""
+        count, mean, m2 = _merge_moments(self.count, self.mean, self.m2, self.missing, self.median, 0.0)
+        return mean, m2 / count if count else 0.0
+
+class _CategoryCounts:
+    """Value counts of a text column, updated chunk by chunk"""
+    
+    def __init__(self):
+        self.counts = Counter()
+        self.missing = 0
+    
+    def update(self, values):
+        self.missing += int(values.isna().sum())
+        self.counts.update(values.value_counts().to_dict())
+    
+    @property
+    def mode(self):
+        """Most frequent value, the smallest on ties (as Series.mode()[0])"""
+        if not self.counts:
+            return 'Unknown'
+        top = max(self.counts.values())
+        return min(value for value, count in self.counts.items() if count == top)
+    
+    @property
+    def categories(self):
+        """Sorted values after imputation, as LabelEncoder.classes_"""
+        return sorted(set(self.counts) | ({self.mode} if self.missing else set()))
+    
+    def encoded_moments(self):
+        """Mean and variance of the label-encoded column after imputation"""
+        counts = self.counts.copy()
+        counts[self.mode] += self.missing
+        categories = self.categories
+        weights = np.array([counts[value] for value in categories], dtype=np.float64)
+        codes = np.arange(len(categories), dtype=np.float64)
+        mean = (weights * codes).sum() / weights.sum()
+        return mean, (weights * (codes - mean) ** 2).sum() / weights.sum()
+
+def _merge_moments(count_a, mean_a, m2_a, count_b, mean_b, m2_b):
+    """Combine (count, mean, sum of squared deviations) of two groups"""
+    count = count_a + count_b
+    if not count_b:
+        return count_a, mean_a, m2_a
+    delta = mean_b - mean_a
+    mean = mean_a + delta * count_b / count
+    m2 = m2_a + m2_b + delta ** 2 * count_a * count_b / count
+    return count, mean, m2
+
+def _is_text(values):
+    return pd.api.types.is_object_dtype(values) or pd.api.types.is_string_dtype(values)
+
+def _is_numeric(values):
+    return pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values)
+
+def stream_preprocess_data(filepath, output_dir, chunksize=STREAM_CHUNK_ROWS,
+                           sample_size=MEDIAN_SAMPLE_SIZE, seed=0):
+    """
+    Memory-bounded load_and_preprocess_data for datasets too large to load at once
+    
+    A first pass over the CSV, one chunk at a time, gathers the statistics
+    preprocessing needs from the whole dataset: medians, modes, categories,
+    column maxima for the synthetic target, and the scaler's mean and
+    variance. A second pass imputes, encodes and scales each chunk into
+    float32 .npy files in output_dir, returned as memory maps. Peak memory
+    depends on chunksize and sample_size, not on the size of the dataset.
+    
+    Medians are exact for columns with at most sample_size observed values
+    and estimated from a uniform sample of that size beyond.
+    
+    Args:
+        filepath: Path to the CSV file
+        output_dir: Directory for features.npy and target.npy
+        chunksize: Rows read per chunk
+        sample_size: Observed values kept per numeric column for its median
+        seed: Random seed of the median samples
+        
+    Returns:
+        Same as load_and_preprocess_data, with X a read-only float32 memory
+        map and y a read-only float64 memory map
+    """
+    # First pass: column kinds and statistics
+    rng = np.random.default_rng(seed)
+    columns = None
+    kinds = {}
+    numeric_stats = {}
+    text_counts = {}
+    n_rows = 0
+    for chunk in pd.read_csv(filepath, chunksize=chunksize):
+        if columns is None:
+            columns = chunk.columns.tolist()
+        n_rows += len(chunk)
+        for col in columns:
+            values = chunk[col]
+            if _is_numeric(values):
+                kinds.setdefault(col, set()).add('numeric')
+                stats = numeric_stats.setdefault(col, _ColumnStats(sample_size, rng))
+                stats.update(values.to_numpy(np.float64))
+            elif _is_text(values):
+                kinds.setdefault(col, set()).add('text')
+                text_counts.setdefault(col, _CategoryCounts()).update(values)
+            else:
+                kinds.setdefault(col, set()).add('other')
+    
+    if not n_rows:
+        raise ValueError(f"No rows in {filepath}")
+    
+    # A column read as numbers in some chunks and text in others is text
+    # throughout; count its values again, all read as text
+    text_columns = [col for col in columns if 'text' in kinds[col]]
+    numeric_columns = [col for col in columns if kinds[col] == {'numeric'}]
+    mixed = [col for col in text_columns if len(kinds[col]) > 1]
+    if mixed:
+        text_counts.update({col: _CategoryCounts() for col in mixed})
+        for chunk in pd.read_csv(filepath, chunksize=chunksize, usecols=mixed, dtype=str):
+            for col in mixed:
+                text_counts[col].update(chunk[col])
+    
+    print(f"Dataset scanned: {n_rows} rows, {len(columns)} columns")
+    print(f"Columns: {columns}")
+    
+    medians = {col: numeric_stats[col].median for col in numeric_columns}
+    maxima = {col: numeric_stats[col].max for col in numeric_columns}
+    modes = {col: text_counts[col].mode for col in text_columns}
+    
+    # Same feature order as load_and_preprocess_data: numeric columns, then encoded ones
+    numeric_features = [col for col in numeric_columns
+                        if col != 'carbon_score' and not col.startswith('Unnamed')]
+    encoded_features = [col for col in text_columns
+                        if col != 'carbon_score' and not col.startswith('Unnamed')]
+    feature_columns = numeric_features + [col + '_encoded' for col in encoded_features]
+    
+    label_encoders = {}
+    codes = {}
+    for col in text_columns:
+        if col != 'carbon_score':
+            le = LabelEncoder()
+            le.classes_ = np.array(text_counts[col].categories, dtype=object)
+            label_encoders[col] = le
+            codes[col] = {value: code for code, value in enumerate(le.classes_)}
+    
+    # Scaler fitted from the merged statistics, as StandardScaler.fit would be
+    moments = [numeric_stats[col].imputed_moments() for col in numeric_features]
+    moments += [text_counts[col].encoded_moments() for col in encoded_features]
+    mean = np.array([m for m, _ in moments], dtype=np.float64)
+    var = np.array([v for _, v in moments], dtype=np.float64)
+    # Near-zero variance is rounding error of a constant feature (sklearn's bound)
+    eps = np.finfo(np.float64).eps
+    constant = var <= n_rows * eps * var + (n_rows * mean * eps) ** 2
+    scaler = StandardScaler()
+    scaler.mean_ = mean
+    scaler.var_ = var
+    scaler.scale_ = np.where(constant, 1.0, np.sqrt(var))
+    scaler.n_samples_seen_ = n_rows
+    scaler.n_features_in_ = len(feature_columns)
+    
+    # Second pass: impute, encode and scale each chunk into the output files
+    os.makedirs(output_dir, exist_ok=True)
+    features_file = os.path.join(output_dir, 'features.npy')
+    target_file = os.path.join(output_dir, 'target.npy')
+    X = np.lib.format.open_memmap(features_file, mode='w+', dtype=np.float32,
+                                  shape=(n_rows, len(feature_columns)))
+    y = np.lib.format.open_memmap(target_file, mode='w+', dtype=np.float64, shape=(n_rows,))
+    
+    target_rule = None
+    start = 0
+    for chunk in pd.read_csv(filepath, chunksize=chunksize, dtype={col: str for col in text_columns}):
+        stop = start + len(chunk)
+        for col in numeric_columns:
+            chunk[col] = chunk[col].astype(np.float64).fillna(medians[col])
+        for col in text_columns:
+            chunk[col] = chunk[col].fillna(modes[col])
         
-        # Recycling (positive factor)
-        if 'recycl' in col_lower or 'waste' in col_lower and 'reduction' in col_lower:
-            score += (df[col] / df[col].max() * 15).fillna(0)
+        if 'carbon_score' in columns:
+            y[start:stop] = chunk['carbon_score']
+        else:
+            if target_rule is None:
+                target_rule = CarbonScoreRule.fit(chunk, maxima)
+            y[start:stop] = target_rule.score(chunk)
         
-        # Emissions (negative factor)
-        if 'emission' in col_lower or 'co2' in col_lower:
-            score -= (df[col] / df[col].max() * 25).fillna(0)
+        block = np.empty((stop - start, len(feature_columns)))
+        for i, col in enumerate(numeric_features):
+            block[:, i] = chunk[col].to_numpy(np.float64)
+        for i, col in enumerate(encoded_features, len(numeric_features)):
+            block[:, i] = chunk[col].map(codes[col]).to_numpy(np.float64)
+        block -= scaler.mean_
+        block /= scaler.scale_
+        X[start:stop] = block
+        start = stop
+    
+    X.flush()
+    y.flush()
+    del X, y
+    X = np.load(features_file, mmap_mode='r')
+    y = np.load(target_file, mmap_mode='r')
+    
+    print(f"Features selected: {len(feature_columns)}")
+    print(f"Target range: {y.min():.2f} - {y.max():.2f}")
+    print(f"✓ Features written to {features_file}")
+    
+    return X, y, feature_columns, scaler, label_encoders, target_rule
+
+def preprocess_new_rows(df, feature_names, categories, target_rule=None):
+    """
+    Preprocess appended rows into the feature space of an existing model
+    
+    Numeric gaps are filled with the new rows' medians and category values
+    are encoded with the model's codes; values the model has not seen get
+    the next free codes, so existing codes keep their meaning.
+    
+    Args:
+        df: New rows, with the columns of the original dataset
+        feature_names: Model feature names, in input order
+        categories: Category values per text column in code order, as saved
+            in the model metadata
+        target_rule: CarbonScoreRule the model's target was computed with,
+            for rows without a carbon_score column
         
-        # Energy consumption (negative factor if high)
-        if 'energy_consumption' in col_lower or 'power_usage' in col_lower:
-            score -= (df[col] / df[col].max() * 15).fillna(0)
+    Returns:
+        X: Unscaled feature matrix
+        y: Target variable (carbon score 0-100)
+        categories: The categories, extended with the unseen values
+    """
+    df_processed = df.copy()
+    
+    # Numeric columns: fill with median (columns with no values stay missing)
+    numeric_columns = df_processed.select_dtypes(include=[np.number]).columns
+    df_processed[numeric_columns] = df_processed[numeric_columns].fillna(df_processed[numeric_columns].median())
+    
+    # Categorical columns: fill with mode, then encode with the model's codes
+    categories = {col: list(values) for col, values in categories.items()}
+    for col, values in categories.items():
+        if col not in df_processed.columns:
+            continue
+        mode = df_processed[col].mode()
+        column = df_processed[col].fillna(mode[0] if len(mode) > 0 else 'Unknown')
+        codes = {value: code for code, value in enumerate(values)}
+        for value in column.unique():
+            if value not in codes:
+                codes[value] = len(values)
+                values.append(value)
+        df_processed[col + '_encoded'] = column.map(codes).astype(np.int64)
+    
+    missing = [col for col in feature_names if col not in df_processed.columns]
+    if missing:
+        raise ValueError(f"New rows lack model features: {missing}")
     
-    # Normalize to 0-100 range
-    score = np.clip(score, 0, 100)
+    if 'carbon_score' in df_processed.columns:
+        y = df_processed['carbon_score'].to_numpy(np.float64)
+    elif target_rule is not None:
+        y = target_rule.score(df_processed)
+    else:
+        raise ValueError("New rows have no carbon_score column and the model has no target rule")
+    
+    X = df_processed[feature_names].to_numpy(np.float64)
+    return X, y, categories
+
+def create_carbon_score(df, maxima=None):
+    """
+    Create a normalized carbon score (0-100) based on environmental metrics
+    Higher score = better environmental performance
     
-    return score
+    Args:
+        df: Company data
+        maxima: Column maxima of the whole dataset, to score it one chunk at a
+            time (default: the maxima of df)
+    
+    Column terms and weights are in target_rule.SCORE_TERMS.
+    
+    Logic:
+    - High renewable energy % -> higher score
+    - High recycling % -> higher score
+    - Low emissions -> higher score
+    - Low energy consumption -> higher score
+    """
+    return CarbonScoreRule.fit(df, maxima).score(df)
 
 def extract_features_from_json(data_dict):
     """
@@ -0,0 +1,180 @@
+"""
+Preprocessed training data cache for CarbonScoreX
+Content-addressed store of preprocessing results, so repeat training and
+search runs skip CSV parsing, imputation, encoding and scaling
+
+Layout:
+    <root>/<key>/features.npy    feature matrix, memory-mapped when loaded
+    <root>/<key>/target.npy      target, memory-mapped when loaded
+    <root>/<key>/state.joblib    feature names, scaler, label encoders, target rule
+    <root>/files.json            content digests by path, size and mtime
+
+The key hashes the input file's content, the preprocessing parameters, the
+source of the preprocessing modules and the pandas/numpy/scikit-learn
+versions, so a changed dataset or changed preprocessing code gets a new
+entry. Entries are written under a temporary name and renamed into place,
+and the least recently used are removed beyond max_entries.
+"""
+import hashlib
+import json
+import os
+import shutil
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+import joblib
+import numpy as np
+
+# Modules whose source is part of every key
+CODE_MODULES = ('preprocess', 'target_rule')
+
+_HASH_BLOCK = 1 << 20
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=1)
+def code_version() -> str:
+    """Digest of the preprocessing source and the library versions it runs on"""
+    import pandas
+    import sklearn
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for module in CODE_MODULES:
+        digest.update(file_digest(os.path.join(src_dir, module + '.py')).encode())
+    for version in (pandas.__version__, np.__version__, sklearn.__version__):
+        digest.update(version.encode())
+    return digest.hexdigest()
+
+
+class PreprocessCache:
+    """Directory of preprocessing results keyed by input content, parameters and code"""
+
+    def __init__(self, root: str, max_entries: int = 8):
+        """
+        Initialize cache
+
+        Args:
+            root: Cache directory (created if missing)
+            max_entries: Entries kept; the least recently used beyond it are removed
+        """
+        self.root = root
+        self.max_entries = max_entries
+        os.makedirs(root, exist_ok=True)
+
+    def _content_digest(self, path: str) -> str:
+        """
+        File digest, rehashed only when the file's size or mtime changed
+
+        Digests are remembered in files.json, so loading a cached entry for an
+        unchanged multi-gigabyte CSV does not read the CSV again.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        memo_file = os.path.join(self.root, 'files.json')
+        try:
+            with open(memo_file) as f:
+                memo = json.load(f)
+        except (OSError, ValueError):
+            memo = {}
+        entry = memo.get(path)
+        if entry and entry['signature'] == signature:
+            return entry['digest']
+
+        digest = file_digest(path)
+        memo[path] = {'signature': signature, 'digest': digest}
+        tmp_file = f"{memo_file}.tmp{os.getpid()}"
+        with open(tmp_file, 'w') as f:
+            json.dump(memo, f)
+        os.replace(tmp_file, memo_file)
+        return digest
+
+    def key(self, filepath: str, **params) -> str:
+        """
+        Cache key of preprocessing filepath with the given parameters
+
+        Args:
+            filepath: Input dataset
+            **params: Preprocessing parameters that change the result
+
+        Returns:
+            Hex digest naming the entry
+        """
+        description = {
+            'content': self._content_digest(filepath),
+            'params': params,
+            'code': code_version()
+        }
+        return hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+
+    def load(self, key: str) -> Optional[Tuple]:
+        """
+        Cached result, with X and y memory-mapped read-only, or None on a miss
+
+        An unreadable entry is removed and reported as a miss.
+        """
+        entry = os.path.join(self.root, key)
+        if not os.path.isdir(entry):
+            return None
+        try:
+            X = np.load(os.path.join(entry, 'features.npy'), mmap_mode='r')
+            y = np.load(os.path.join(entry, 'target.npy'), mmap_mode='r')
+            state = joblib.load(os.path.join(entry, 'state.joblib'))
+        except (OSError, ValueError, EOFError, KeyError):
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        os.utime(entry)    # mark as recently used
+        return (X, y, state['feature_names'], state['scaler'], state['label_encoders'],
+                state['target_rule'])
+
+    def store(self, key: str, result: Tuple):
+        """
+        Save a load_and_preprocess_data / stream_preprocess_data result under key
+
+        Args:
+            key: Entry name from key()
+            result: (X, y, feature_names, scaler, label_encoders, target_rule)
+        """
+        X, y, feature_names, scaler, label_encoders, target_rule = result
+        entry = os.path.join(self.root, key)
+        staging = os.path.join(self.root, f".staging-{key}-{os.getpid()}")
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        try:
+            np.save(os.path.join(staging, 'features.npy'), X)
+            np.save(os.path.join(staging, 'target.npy'), y)
+            joblib.dump({
+                'feature_names': list(feature_names),
+                'scaler': scaler,
+                'label_encoders': label_encoders,
+                'target_rule': target_rule
+            }, os.path.join(staging, 'state.joblib'))
+            os.rename(staging, entry)
+        except OSError:
+            # Another process stored the same entry first
+            shutil.rmtree(staging, ignore_errors=True)
+            if not os.path.isdir(entry):
+                raise
+        self.prune()
+
+    def entries(self) -> Dict[str, Any]:
+        """Entry names mapped to their last-use time, most recent first"""
+        entries = {
+            name: os.path.getmtime(os.path.join(self.root, name))
+            for name in os.listdir(self.root)
+            if not name.startswith('.') and os.path.isdir(os.path.join(self.root, name))
+        }
+        return dict(sorted(entries.items(), key=lambda item: item[1], reverse=True))
+
+    def prune(self):
+        """Remove the least recently used entries beyond max_entries"""
+        for name in list(self.entries())[self.max_entries:]:
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
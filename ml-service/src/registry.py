@@ -0,0 +1,115 @@
+"""
+Versioned model registry for CarbonScoreX
+Keeps every published model in its own directory and an atomically updated
+pointer to the live one
+
+Layout:
+    <root>/CURRENT                  name of the live version
+    <root>/versions/<version>/      model artifacts as written by train_model.py
+"""
+import os
+import re
+import shutil
+import time
+from typing import Iterable, List, Optional
+
+_VERSION_PATTERN = re.compile(r'^[A-Za-z0-9][A-Za-z0-9._-]*$')
+
+
+class ModelRegistry:
+    """
+    Directory of immutable model versions plus a CURRENT pointer
+
+    Version directories are written under a temporary name and renamed into
+    place, and CURRENT is replaced with os.replace, so readers (including other
+    service processes polling the registry) never see a half-published model.
+    """
+
+    def __init__(self, root: str):
+        """
+        Initialize registry
+
+        Args:
+            root: Registry directory (created if missing)
+        """
+        self.root = root
+        self.versions_dir = os.path.join(root, 'versions')
+        os.makedirs(self.versions_dir, exist_ok=True)
+
+    def _check_name(self, version: str):
+        if not _VERSION_PATTERN.match(version):
+            raise ValueError(f"Invalid model version name: {version!r}")
+
+    def versions(self) -> List[str]:
+        """Published versions, oldest name first"""
+        return sorted(
+            name for name in os.listdir(self.versions_dir)
+            if _VERSION_PATTERN.match(name) and os.path.isdir(os.path.join(self.versions_dir, name))
+        )
+
+    def version_path(self, version: str) -> str:
+        """
+        Model directory of a published version
+
+        Raises:
+            KeyError: If the version has not been published
+        """
+        self._check_name(version)
+        path = os.path.join(self.versions_dir, version)
+        if not os.path.isdir(path):
+            raise KeyError(f"Unknown model version: {version}")
+        return path
+
+    def current(self) -> Optional[str]:
+        """Name of the live version, or None if nothing is active yet"""
+        try:
+            with open(os.path.join(self.root, 'CURRENT')) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def activate(self, version: str):
+        """Atomically point CURRENT at a published version"""
+        self.version_path(version)
+        pointer = os.path.join(self.root, 'CURRENT')
+        tmp_pointer = f"{pointer}.tmp{os.getpid()}"
+        with open(tmp_pointer, 'w') as f:
+            f.write(version + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_pointer, pointer)
+
+    def publish(self, model_dir: str, version: Optional[str] = None, activate: bool = False,
+                files: Optional[Iterable[str]] = None) -> str:
+        """
+        Copy a trained model directory into the registry as a new version
+
+        Args:
+            model_dir: Directory with model artifacts (bundle and/or joblib files)
+            version: Version name (default: UTC timestamp)
+            activate: Also make it the live version
+            files: Artifact file names to copy (default: the whole directory)
+
+        Returns:
+            The published version name
+
+        Raises:
+            ValueError: If the name is invalid or already published
+        """
+        version = version or time.strftime('%Y%m%d-%H%M%S', time.gmtime())
+        self._check_name(version)
+        target = os.path.join(self.versions_dir, version)
+        if os.path.exists(target):
+            raise ValueError(f"Model version already published: {version}")
+
+        staging = os.path.join(self.versions_dir, f".staging-{version}-{os.getpid()}")
+        if files is None:
+            shutil.copytree(model_dir, staging)
+        else:
+            os.makedirs(staging)
+            for name in files:
+                shutil.copy2(os.path.join(model_dir, name), staging)
+        os.rename(staging, target)
+        if activate:
+            self.activate(version)
+        return version
@@ -0,0 +1,200 @@
+"""
+Offline bulk scoring for CarbonScoreX
+Scores a CSV or Parquet export in chunks across worker processes and writes
+score/category/confidence columns to an output file
+
+Usage:
+    python score_file.py companies.csv scored.parquet --workers 8
+"""
+import argparse
+import os
+import resource
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from inference import CarbonScorePredictor
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Predictor owned by each worker process, loaded once by _init_worker
+_worker_predictor = None
+
+
+def _init_worker(model_path):
+    global _worker_predictor
+    _worker_predictor = CarbonScorePredictor(model_path=model_path)
+
+
+def _score_chunk(features):
+    return _worker_predictor.predict_scores(features)
+
+
+def _file_format(path):
+    """'parquet' or 'csv', from the file extension"""
+    return 'parquet' if os.path.splitext(path)[1].lower() in ('.parquet', '.pq') else 'csv'
+
+
+def check_parquet_support(*paths):
+    """Raise ImportError if any of paths is a Parquet file and pyarrow is not installed"""
+    for path in paths:
+        if _file_format(path) == 'parquet' and pq is None:
+            raise ImportError(f"Parquet files need pyarrow (pip install pyarrow): {path}")
+
+
+def iter_chunks(path, chunk_size):
+    """
+    Read a CSV or Parquet file as DataFrame chunks of at most chunk_size rows
+
+    Only one chunk is materialized at a time, so files larger than RAM are fine.
+    """
+    if _file_format(path) == 'parquet':
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+
+class ChunkWriter:
+    """Appends DataFrame chunks to a CSV or Parquet output file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.format = _file_format(path)
+        self._parquet = None
+        self._first = True
+
+    def write(self, frame):
+        if self.format == 'parquet':
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table.cast(self._parquet.schema))
+        else:
+            frame.to_csv(self.path, mode='w' if self._first else 'a', header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def peak_memory_mb():
+    """Peak RSS of this process and of its largest worker, in MB (Linux reports KB)"""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    workers = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return own, workers
+
+
+def score_file(input_path, output_path, model_path='../models', chunk_size=50000,
+               workers=None, keep_columns=None):
+    """
+    Score every row of a CSV/Parquet file and write the results
+
+    Args:
+        input_path: CSV or Parquet file with company metrics (aliases accepted)
+        output_path: CSV or Parquet file to write, chosen by extension
+        model_path: Directory containing model artifacts
+        chunk_size: Rows read and scored per chunk
+        workers: Scoring processes (default: CPU count; 1 scores in-process)
+        keep_columns: Input columns copied to the output (default: all)
+
+    Returns:
+        Dictionary with row count, elapsed seconds, rows/sec and the number
+        of scoring processes used
+
+    Raises:
+        ImportError: A Parquet file is given and pyarrow is not installed
+    """
+    check_parquet_support(input_path, output_path)
+    workers = workers or os.cpu_count() or 1
+    predictor = CarbonScorePredictor(model_path=model_path)
+    confidence = predictor._calculate_confidence(None)
+
+    pool = None
+    if workers > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_path,))
+
+    writer = ChunkWriter(output_path)
+    # Chunks in flight, oldest first; bounded so memory does not grow with file size
+    in_flight = deque()
+    total_rows = 0
+    start = time.perf_counter()
+
+    def flush_oldest():
+        nonlocal total_rows
+        frame, scores = in_flight.popleft()
+        scores = scores.result() if pool is not None else scores
+        output = frame if keep_columns is None else frame[keep_columns]
+        output = output.assign(
+            score=scores,
+            category=predictor._get_categories(scores),
+            confidence=confidence
+        )
+        writer.write(output)
+        total_rows += len(frame)
+        print(f"   {total_rows:,} rows scored ({total_rows / (time.perf_counter() - start):,.0f} rows/s)")
+
+    try:
+        for frame in iter_chunks(input_path, chunk_size):
+            features = predictor.extract_columns(frame, len(frame))
+            if pool is not None:
+                in_flight.append((frame, pool.submit(_score_chunk, features)))
+            else:
+                in_flight.append((frame, predictor.predict_scores(features)))
+            while len(in_flight) > 2 * workers:
+                flush_oldest()
+        while in_flight:
+            flush_oldest()
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.shutdown()
+
+    elapsed = time.perf_counter() - start
+    return {
+        'rows': total_rows,
+        'seconds': elapsed,
+        'rows_per_sec': total_rows / elapsed if elapsed else 0.0,
+        'workers': workers
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Score a CSV/Parquet file of companies')
+    parser.add_argument('input', help='Input .csv or .parquet file')
+    parser.add_argument('output', help='Output .csv or .parquet file')
+    parser.add_argument('--model-path', default='../models', help='Model artifacts directory')
+    parser.add_argument('--chunk-size', type=int, default=50000, help='Rows per chunk')
+    parser.add_argument('--workers', type=int, default=None, help='Scoring processes (default: CPU count)')
+    parser.add_argument('--keep-columns', nargs='*', default=None,
+                        help='Input columns to copy to the output (default: all)')
+    args = parser.parse_args()
+    try:
+        check_parquet_support(args.input, args.output)
+    except ImportError as e:
+        parser.error(str(e))
+
+    print("=" * 60)
+    print("CarbonScoreX Bulk Scoring")
+    print("=" * 60)
+    stats = score_file(args.input, args.output, model_path=args.model_path,
+                       chunk_size=args.chunk_size, workers=args.workers,
+                       keep_columns=args.keep_columns)
+    own, worker = peak_memory_mb()
+    print(f"\n   ✓ {stats['rows']:,} rows written to {args.output}")
+    print(f"   - Time: {stats['seconds']:.2f}s ({stats['rows_per_sec']:,.0f} rows/s)")
+    if stats['workers'] == 1:
+        print(f"   - Peak memory: {own:.0f} MB")
+    else:
+        print(f"   - Peak memory: {own:.0f} MB main process, {worker:.0f} MB largest worker")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""
+Production server for the CarbonScoreX ML service
+Loads the model once, then forks N uvicorn workers that share its memory
+
+The master process imports api (loading and warming the model from its
+memory-mapped bundle), binds the listening socket and forks the workers.
+The bundle's arrays are a read-only shared file mapping, so every worker
+reads the same physical pages; everything else built before the fork is
+shared copy-on-write. The master restarts workers that die.
+
+Each worker holds its own reference to the model, so with several workers use
+ML_REGISTRY_POLL_S to have every worker follow registry version changes.
+
+Usage:
+    python serve.py --workers 4 --port 8000
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import time
+
+
+def bind_socket(host, port, backlog=2048):
+    """Listening socket inherited by every worker"""
+    sock = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock, log_level):
+    import uvicorn
+    # Restore default handlers; uvicorn installs its own graceful-shutdown ones
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=log_level, lifespan='on')
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(host='0.0.0.0', port=8000, workers=None, log_level='info'):
+    """
+    Run the API in pre-forked worker processes until SIGINT/SIGTERM
+
+    Args:
+        host: Interface to bind
+        port: Port to bind
+        workers: Worker processes (default: CPU count)
+        log_level: uvicorn log level
+    """
+    workers = workers or os.cpu_count() or 1
+    # Worker-level process pools would multiply with the forked workers
+    os.environ.setdefault('ML_PROCESS_WORKERS', '0')
+
+    import api
+    sock = bind_socket(host, port)
+    print(f"✓ Listening on {host}:{port}, model {api._model_version()}, {workers} workers")
+
+    # Keep the garbage collector from writing to (and so un-sharing) objects built so far
+    gc.collect()
+    gc.freeze()
+
+    children = set()
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _run_worker(api.app, sock, log_level)
+            finally:
+                os._exit(0)
+        children.add(pid)
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for _ in range(workers):
+        spawn()
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        children.discard(pid)
+        if not stopping:
+            print(f"Warning: worker {pid} exited with status {status}, restarting")
+            time.sleep(1)
+            spawn()
+    sock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the CarbonScoreX ML API with pre-forked workers')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--log-level', default='info')
+    args = parser.parse_args()
+    serve(host=args.host, port=args.port, workers=args.workers, log_level=args.log_level)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Streaming input helpers for CarbonScoreX bulk scoring
+Splits an incoming NDJSON or CSV byte stream into fixed-size chunks of lines
+"""
+import asyncio
+import csv
+import json
+import tempfile
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from starlette.responses import StreamingResponse
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+
+
+class LineTooLongError(Exception):
+    """Raised when a single input line exceeds the configured limit"""
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body generator is still reading the request body
+
+    The base class listens for client disconnects by consuming receive(), which
+    would swallow the request chunks the generator is waiting for. A disconnect
+    instead surfaces as ClientDisconnect from request.stream().
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+class OutputSpool:
+    """
+    FIFO of response chunks between the scoring task and the response writer
+
+    Chunks are held in memory up to max_memory bytes and overflow to a temporary
+    file after that, so a client that uploads its whole body before reading the
+    response cannot stall input processing or grow memory without bound.
+    """
+
+    def __init__(self, max_memory: int = 8 << 20):
+        self.max_memory = max_memory
+        self._memory = deque()
+        self._memory_bytes = 0
+        self._file = None
+        self._read_pos = 0
+        self._write_pos = 0
+        self._closed = False
+        self._ready = asyncio.Event()
+
+    def put(self, data: bytes):
+        """Append a chunk; never blocks"""
+        # Once spilling, keep appending to the file so chunks stay in order
+        if self._file is None and self._memory_bytes + len(data) <= self.max_memory:
+            self._memory.append(data)
+            self._memory_bytes += len(data)
+        else:
+            if self._file is None:
+                self._file = tempfile.TemporaryFile()
+            self._file.seek(self._write_pos)
+            self._file.write(data)
+            self._write_pos += len(data)
+        self._ready.set()
+
+    def close(self):
+        """Mark the end of output"""
+        self._closed = True
+        self._ready.set()
+
+    async def get(self) -> Optional[bytes]:
+        """Next chunk in order, or None once closed and drained"""
+        while True:
+            if self._memory:
+                data = self._memory.popleft()
+                self._memory_bytes -= len(data)
+                return data
+            if self._file is not None:
+                self._file.seek(self._read_pos)
+                data = self._file.read(min(1 << 20, self._write_pos - self._read_pos))
+                self._read_pos += len(data)
+                if self._read_pos == self._write_pos:
+                    self._file.close()
+                    self._file = None
+                    self._read_pos = self._write_pos = 0
+                return data
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+
+    def discard(self):
+        """Release spooled data without reading it"""
+        self._memory.clear()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def stream_format(content_type: Optional[str]) -> str:
+    """Input format for a request Content-Type (NDJSON unless CSV is declared)"""
+    if content_type and content_type.split(';')[0].strip().lower() in ('text/csv', 'application/csv'):
+        return CSV
+    return NDJSON
+
+
+async def iter_line_chunks(byte_stream: AsyncIterator[bytes], chunk_lines: int,
+                           max_line_bytes: int = 1 << 20) -> AsyncIterator[List[Tuple[int, bytes]]]:
+    """
+    Group a byte stream into lists of at most chunk_lines non-empty lines
+
+    Only the current partial line and one chunk of lines are held in memory,
+    regardless of the total input size.
+
+    Args:
+        byte_stream: Async iterator of raw body bytes
+        chunk_lines: Lines per yielded chunk
+        max_line_bytes: Longest accepted line
+
+    Yields:
+        Lists of (1-based line number, line bytes without the newline)
+    """
+    buffer = b''
+    line_no = 0
+    chunk = []
+    async for data in byte_stream:
+        buffer += data
+        lines = buffer.split(b'\n')
+        buffer = lines.pop()
+        if len(buffer) > max_line_bytes:
+            raise LineTooLongError(f"Line {line_no + len(lines) + 1} exceeds {max_line_bytes} bytes")
+        for line in lines:
+            line_no += 1
+            line = line.rstrip(b'\r')
+            if line.strip():
+                chunk.append((line_no, line))
+                if len(chunk) >= chunk_lines:
+                    yield chunk
+                    chunk = []
+    if buffer.strip():
+        chunk.append((line_no + 1, buffer.rstrip(b'\r')))
+    if chunk:
+        yield chunk
+
+
+def parse_csv_header(line: bytes) -> List[str]:
+    """Column names from a CSV header line"""
+    return [name.strip() for name in next(csv.reader([line.decode('utf-8')]))]
+
+
+def decode_line(line: bytes, fmt: str, header: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Decode one NDJSON object or CSV row into a dictionary
+
+    Empty CSV cells are treated as missing values.
+
+    Raises:
+        ValueError: If the line is not a JSON object or does not match the header
+    """
+    if fmt == CSV:
+        values = next(csv.reader([line.decode('utf-8')]))
+        if len(values) != len(header):
+            raise ValueError(f"Expected {len(header)} CSV fields, got {len(values)}")
+        return {name: value for name, value in zip(header, values) if value.strip() != ''}
+
+    record = json.loads(line)
+    if not isinstance(record, dict):
+        raise ValueError("Each line must be a JSON object")
+    return record
@@ -0,0 +1,134 @@
+"""
+Synthetic carbon score target for CarbonScoreX training data
+Scores companies 0-100 from the environmental columns a dataset happens to
+have, for datasets without a carbon_score column
+
+Columns are classified by name once into weighted terms; scoring is then a
+single pass over a float32 block of the matched columns. The fitted rule
+(matched columns, weights and the training maxima they are normalized by) is
+saved with the model metadata, so new rows can be scored exactly as the
+training rows were.
+"""
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+BASE_SCORE = 50
+
+# (name patterns, weight) of each score term. A column matches a term when
+# its lowercased name contains every part of one of the patterns; a column
+# matching several terms gets the sum of their weights.
+SCORE_TERMS = (
+    ((('renewable',), ('clean_energy',)), 20),           # renewable energy (positive)
+    ((('recycl',), ('waste', 'reduction')), 15),         # recycling (positive)
+    ((('emission',), ('co2',)), -25),                    # emissions (negative)
+    ((('energy_consumption',), ('power_usage',)), -15),  # energy consumption (negative)
+)
+
+
+@lru_cache(maxsize=4096)
+def column_weight(name: str) -> float:
+    """Total weight of the score terms a column name matches (0 if none)"""
+    name = name.lower()
+    return float(sum(
+        weight for patterns, weight in SCORE_TERMS
+        if any(all(part in name for part in pattern) for pattern in patterns)
+    ))
+
+
+class CarbonScoreRule:
+    """
+    Fitted synthetic scoring rule: score = clip(50 + sum(weight * value / max), 0, 100)
+
+    Missing values, and 0/0 from a column whose maximum is 0, contribute
+    nothing, as in the original per-column formula.
+    """
+
+    def __init__(self, columns: List[str], weights: List[float], maxima: List[float]):
+        self.columns = list(columns)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.maxima = np.asarray(maxima, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self._coefficients = (self.weights / self.maxima).astype(np.float32)
+        self._finite = bool(np.isfinite(self._coefficients).all())
+
+    @classmethod
+    def fit(cls, df, maxima: Optional[Dict[str, float]] = None) -> 'CarbonScoreRule':
+        """
+        Classify the numeric columns of a DataFrame and take their maxima
+
+        Args:
+            df: Training data (only numeric columns are scored)
+            maxima: Column maxima of the whole dataset, when df is one chunk
+                of it (default: the maxima of df)
+        """
+        columns, weights = [], []
+        for col in df.columns:
+            dtype = df[col].dtype
+            if dtype.kind not in 'iuf':
+                continue
+            weight = column_weight(str(col))
+            if weight:
+                columns.append(col)
+                weights.append(weight)
+        if maxima is None:
+            # fmax skips NaN, as DataFrame.max does
+            maxima = {col: np.fmax.reduce(df[col].to_numpy()) if len(df) else np.nan for col in columns}
+        return cls(columns, weights, [maxima[col] for col in columns])
+
+    def score_matrix(self, block: np.ndarray) -> np.ndarray:
+        """
+        Scores of a (n_rows, len(columns)) block of raw values
+
+        Args:
+            block: float32 block, overwritten (other dtypes are copied)
+
+        Returns:
+            float64 array of scores clipped to 0-100
+        """
+        if block.dtype != np.float32:
+            block = block.astype(np.float32)
+        # Missing values contribute nothing
+        np.copyto(block, 0, where=np.isnan(block))
+        if self._finite:
+            scores = (block @ self._coefficients).astype(np.float64)
+        else:
+            # A column with maximum 0: 0/0 contributes nothing, other values
+            # give +/-inf terms that saturate the score
+            with np.errstate(invalid='ignore'):
+                np.multiply(block, self._coefficients, out=block)
+            np.copyto(block, 0, where=np.isnan(block))
+            scores = block.sum(axis=1, dtype=np.float64)
+        scores += BASE_SCORE
+        return np.clip(scores, 0, 100)
+
+    def _empty_block(self, n_rows: int) -> np.ndarray:
+        # Column-major, so each column is filled with one contiguous copy
+        return np.empty((n_rows, len(self.columns)), dtype=np.float32, order='F')
+
+    def score(self, df) -> np.ndarray:
+        """Scores of each row of a DataFrame with the rule's columns"""
+        block = self._empty_block(len(df))
+        for i, col in enumerate(self.columns):
+            block[:, i] = df[col].to_numpy(np.float32, na_value=np.nan)
+        return self.score_matrix(block)
+
+    def score_records(self, companies: List[Dict[str, Any]]) -> np.ndarray:
+        """Scores of company dictionaries; absent or null values contribute nothing"""
+        block = self._empty_block(len(companies))
+        for i, col in enumerate(self.columns):
+            block[:, i] = [company.get(col) for company in companies]
+        return self.score_matrix(block)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-safe form, stored in the model metadata as 'target_rule'"""
+        return {
+            'columns': self.columns,
+            'weights': self.weights.tolist(),
+            'maxima': self.maxima.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CarbonScoreRule':
+        return cls(data['columns'], data['weights'], data['maxima'])
@@ -3,22 +3,269 @@ Model training script for CarbonScoreX
 Trains XGBoost model to predict carbon scores (0-100)
 """
 import os
+import argparse
+import contextlib
+import copy
+import json
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 import joblib
 import numpy as np
-from sklearn.model_selection import train_test_split, cross_val_score
+import pandas as pd
+from sklearn.base import clone
+from sklearn.model_selection import ParameterGrid, ParameterSampler
+from sklearn.utils import check_random_state
 from sklearn.ensemble import RandomForestRegressor
-from xgboost import XGBRegressor
+from xgboost import Booster, XGBRegressor
 from sklearn.metrics import mean_absolute_error, r2_score, mean_squared_error
 import matplotlib.pyplot as plt
-from preprocess import load_and_preprocess_data
+from preprocess import MEDIAN_SAMPLE_SIZE, load_and_preprocess_data, preprocess_new_rows, stream_preprocess_data
+from preprocess_cache import PreprocessCache
+from target_rule import CarbonScoreRule
+from inference import TreeEnsemble
+from bundle import write_bundle
+from registry import ModelRegistry
 
-def train_model(model_type='xgboost', save_path='../models'):
+# Largest allowed |compiled - original| prediction difference at export
+EXPORT_PARITY_TOLERANCE = 1e-3
+
+DATASET_PATH = '/mnt/data/dataset pccoe.csv'
+
+# Preprocessed data cache used by the command line (--no-cache disables it)
+PREPROCESS_CACHE_DIR = os.environ.get('ML_PREPROCESS_CACHE', '../cache/preprocessed')
+
+# Cross-validation folds and the seed of their shuffle. Fold 1 holds out the
+# same test set as train_test_split(test_size=1 / CV_FOLDS, random_state=SPLIT_SEED)
+CV_FOLDS = 5
+SPLIT_SEED = 42
+
+# Model settings by type, apart from n_estimators and n_jobs
+MODEL_PARAMS = {
+    'xgboost': {
+        'max_depth': 6,
+        'learning_rate': 0.1,
+        'subsample': 0.8,
+        'colsample_bytree': 0.8,
+        'random_state': 42,
+        'objective': 'reg:squarederror'
+    },
+    'random_forest': {
+        'max_depth': 10,
+        'min_samples_split': 5,
+        'min_samples_leaf': 2,
+        'random_state': 42
+    }
+}
+
+# Values search_hyperparameters samples settings from, by model type
+SEARCH_SPACE = {
+    'xgboost': {
+        'max_depth': [3, 4, 6, 8, 10],
+        'learning_rate': [0.03, 0.05, 0.1, 0.2],
+        'subsample': [0.6, 0.8, 1.0],
+        'colsample_bytree': [0.6, 0.8, 1.0],
+        'min_child_weight': [1, 3, 10],
+        'reg_lambda': [0.1, 1.0, 10.0]
+    },
+    'random_forest': {
+        'max_depth': [6, 10, 16, None],
+        'min_samples_split': [2, 5, 10],
+        'min_samples_leaf': [1, 2, 4],
+        'max_features': [0.5, 0.8, 1.0]
+    }
+}
+
+# Boosting rounds without a better validation MAE before a search trial stops
+EARLY_STOPPING_ROUNDS = 20
+
+# Largest relative increase of the held-out MAE, over the current model's,
+# that update_model still publishes
+UPDATE_MAE_TOLERANCE = 0.02
+
+# Training data of each fold-fitting process, set by _init_fold_worker
+_fold_X = None
+_fold_y = None
+
+def build_model(model_type, n_estimators=200, n_jobs=None, **params):
+    """
+    Unfitted model with the MODEL_PARAMS settings
+    
+    Args:
+        model_type: 'xgboost' or 'random_forest'
+        n_estimators: Number of trees
+        n_jobs: Threads per fit (default: all cores)
+        **params: Settings overriding MODEL_PARAMS
+        
+    Returns:
+        XGBRegressor or RandomForestRegressor
+    """
+    if model_type not in MODEL_PARAMS:
+        raise ValueError(f"Unknown model type: {model_type}")
+    settings = dict(MODEL_PARAMS[model_type], n_estimators=n_estimators, n_jobs=n_jobs or -1)
+    settings.update(params)
+    if model_type == 'xgboost':
+        return XGBRegressor(**settings)
+    return RandomForestRegressor(**settings)
+
+def fold_indices(n_samples, n_folds=CV_FOLDS, random_state=SPLIT_SEED):
+    """
+    Shuffled k-fold (train, test) row indices
+    
+    Fold 1 reproduces train_test_split(test_size=1 / n_folds,
+    random_state=random_state) exactly, row order included, so its model is
+    the one a plain train/test split would have trained.
+    
+    Args:
+        n_samples: Number of rows
+        n_folds: Number of folds
+        random_state: Seed of the shuffle
+        
+    Returns:
+        List of (train_index, test_index) arrays, one pair per fold
+    """
+    permutation = check_random_state(random_state).permutation(n_samples)
+    sizes = np.full(n_folds, n_samples // n_folds)
+    sizes[:n_samples % n_folds] += 1
+    bounds = np.concatenate([[0], np.cumsum(sizes)])
+    return [
+        (np.concatenate([permutation[:start], permutation[stop:]]), permutation[start:stop])
+        for start, stop in zip(bounds[:-1], bounds[1:])
+    ]
+
+@contextlib.contextmanager
+def spill_directory(chunksize=None, data=None):
+    """
+    Temporary directory for the memory-mapped output of chunked preprocessing
+    
+    Created only when a CSV is preprocessed in chunks (chunksize set, no
+    DataFrame) and removed with its contents on exit; yields None otherwise.
+    """
+    if not chunksize or data is not None:
+        yield None
+        return
+    with tempfile.TemporaryDirectory(prefix='carbonscore-', ignore_cleanup_errors=True) as spill_dir:
+        yield spill_dir
+
+def _init_fold_worker(features_file, target_file):
+    global _fold_X, _fold_y
+    # Memory-mapped, so worker processes share one copy through the page cache
+    _fold_X = np.load(features_file, mmap_mode='r')
+    _fold_y = np.load(target_file, mmap_mode='r')
+
+@contextlib.contextmanager
+def shared_training_data(X, y, workers=1):
+    """
+    Make X and y available to training tasks run with run_tasks
+    
+    With workers > 1, yields a process pool whose workers memory-map one
+    saved copy of the data; otherwise yields None and tasks run in this
+    process on X and y directly.
+    """
+    global _fold_X, _fold_y
+    if workers <= 1:
+        _fold_X, _fold_y = X, y
+        try:
+            yield None
+        finally:
+            _fold_X = _fold_y = None
+        return
+    
+    with tempfile.TemporaryDirectory(prefix='carbonscore-folds-') as shared_dir:
+        features_file = os.path.join(shared_dir, 'features.npy')
+        target_file = os.path.join(shared_dir, 'target.npy')
+        np.save(features_file, X)
+        np.save(target_file, y)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_fold_worker,
+                                 initargs=(features_file, target_file)) as pool:
+            yield pool
+
+def run_tasks(pool, fn, tasks):
+    """fn(*task) for every task, on the pool if there is one; results in task order"""
+    if pool is None:
+        return [fn(*task) for task in tasks]
+    futures = [pool.submit(fn, *task) for task in tasks]
+    return [future.result() for future in futures]
+
+def _fit_fold(model_type, n_estimators, n_jobs, train_index, test_index, final, params=None):
+    """
+    Fit one fold and score its held-out rows
+    
+    Returns:
+        Metrics dictionary, and the fitted model if final (else None)
+    """
+    start = time.perf_counter()
+    model = build_model(model_type, n_estimators, n_jobs, **(params or {}))
+    X_train, y_train = _fold_X[train_index], _fold_y[train_index]
+    model.fit(X_train, y_train)
+    
+    y_test = _fold_y[test_index]
+    y_pred = model.predict(_fold_X[test_index])
+    result = {
+        'mae': mean_absolute_error(y_test, y_pred),
+        'rmse': np.sqrt(mean_squared_error(y_test, y_pred)),
+        'r2': r2_score(y_test, y_pred)
+    }
+    if final:
+        y_train_pred = model.predict(X_train)
+        result['train_mae'] = mean_absolute_error(y_train, y_train_pred)
+        result['train_r2'] = r2_score(y_train, y_train_pred)
+    result['seconds'] = time.perf_counter() - start
+    return result, model if final else None
+
+def cross_validate(X, y, folds, model_type='xgboost', n_estimators=200, workers=1, params=None):
+    """
+    Fit every fold, in parallel processes when workers > 1
+    
+    Each process fits one fold at a time with cpu_count / workers threads.
+    The first fold's model is kept as the final model; the others are only
+    scored on their held-out rows.
+    
+    Args:
+        X: Feature matrix
+        y: Target
+        folds: (train_index, test_index) pairs from fold_indices
+        model_type: 'xgboost' or 'random_forest'
+        n_estimators: Number of trees
+        workers: Fold-fitting processes (1 fits in this process)
+        params: Settings overriding MODEL_PARAMS
+        
+    Returns:
+        Per-fold metrics in fold order, and the first fold's fitted model
+    """
+    n_jobs = max(1, (os.cpu_count() or 1) // workers)
+    tasks = [
+        (model_type, n_estimators, n_jobs, train_index, test_index, i == 0, params)
+        for i, (train_index, test_index) in enumerate(folds)
+    ]
+    with shared_training_data(X, y, workers) as pool:
+        results = run_tasks(pool, _fit_fold, tasks)
+    return [result for result, _ in results], results[0][1]
+
+
+def train_model(model_type='xgboost', save_path='../models', registry_path=None,
+                filepath=DATASET_PATH, data=None, n_estimators=200, chunksize=None,
+                n_folds=CV_FOLDS, cv_workers=None, model_params=None, cache_dir=None):
     """
     Train carbon scoring model
     
     Args:
         model_type: 'xgboost' or 'random_forest'
         save_path: Directory to save trained model
+        registry_path: Model registry to also publish the artifacts to as a new
+            (inactive) version
+        filepath: CSV dataset to train on
+        data: DataFrame to train on instead of reading filepath
+        n_estimators: Number of trees
+        chunksize: Preprocess filepath in chunks of this many rows, with
+            stream_preprocess_data, instead of loading it whole
+        n_folds: Cross-validation folds; the final model is the fold 1 fit,
+            tested on its held-out 1/n_folds of the data
+        cv_workers: Processes fitting folds in parallel (default: CPU count,
+            at most n_folds; 1 fits them in-process, one after another)
+        model_params: Settings overriding MODEL_PARAMS, e.g. the best found
+            by search_hyperparameters
+        cache_dir: Preprocessed data cache directory (default: no cache)
         
     Returns:
         Trained model, evaluation metrics
@@ -27,92 +274,585 @@ def train_model(model_type='xgboost', save_path='../models'):
     print("CarbonScoreX Model Training")
     print("=" * 60)
     
-    # Load and preprocess data
-    print("\n1. Loading data from /mnt/data/dataset pccoe.csv...")
-    X, y, feature_names, scaler, label_encoders = load_and_preprocess_data(
-        filepath='/mnt/data/dataset pccoe.csv'
-    )
+    stage_seconds = {}
+    stage_start = time.perf_counter()
     
-    # Split data
-    print("\n2. Splitting data (80% train, 20% test)...")
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42
-    )
+    # Load and preprocess data
+    print(f"\n1. Loading data from {filepath if data is None else 'DataFrame'}...")
+    with spill_directory(chunksize, data) as spill_dir:
+        X, y, feature_names, scaler, label_encoders, target_rule = load_training_data(
+            filepath, data, chunksize, spill_dir, cache_dir
+        )
+        
+        stage_seconds['load'] = time.perf_counter() - stage_start
+        print(f"   ✓ Loaded in {stage_seconds['load']:.2f}s")
+        
+        # Split data: fold 1 holds out the test set, the other folds only cross-validate
+        print(f"\n2. Splitting data into {n_folds} folds (fold 1: {100 - 100 // n_folds}% train, "
+              f"{100 // n_folds}% test)...")
+        folds = fold_indices(len(y), n_folds)
+        train_index, test_index = folds[0]
+        print(f"   Training set: {len(train_index)} samples")
+        print(f"   Test set: {len(test_index)} samples")
+        
+        # Train the final model and the other cross-validation folds together
+        workers = max(1, min(cv_workers or os.cpu_count() or 1, n_folds))
+        print(f"\n3. Training {model_type} model and {n_folds - 1} more cross-validation folds "
+              f"({workers} worker{'s' if workers > 1 else ''})...")
+        stage_start = time.perf_counter()
+        fold_results, model = cross_validate(X, y, folds, model_type, n_estimators, workers, model_params)
+        stage_seconds['train'] = time.perf_counter() - stage_start
+        fold_seconds = ', '.join(f"{result['seconds']:.1f}s" for result in fold_results)
+        print(f"   ✓ Model training complete in {stage_seconds['train']:.2f}s (fold fits: {fold_seconds})")
+        
+        # Evaluate model
+        print("\n4. Evaluating model performance...")
+        final = fold_results[0]
+        train_mae, train_r2 = final['train_mae'], final['train_r2']
+        test_mae, test_rmse, test_r2 = final['mae'], final['rmse'], final['r2']
+        
+        print(f"\n   Training Metrics:")
+        print(f"   - MAE: {train_mae:.2f}")
+        print(f"   - R²: {train_r2:.4f}")
+        
+        print(f"\n   Test Metrics:")
+        print(f"   - MAE: {test_mae:.2f}")
+        print(f"   - RMSE: {test_rmse:.2f}")
+        print(f"   - R²: {test_r2:.4f}")
+        
+        # Cross-validation, from the held-out fold of every fit above
+        print(f"\n5. {n_folds}-fold cross-validation...")
+        fold_maes = np.array([result['mae'] for result in fold_results])
+        cv_mae = fold_maes.mean()
+        cv_std = fold_maes.std()
+        print(f"   Cross-validation MAE: {cv_mae:.2f} (+/- {cv_std:.2f})")
+        
+        stage_start = time.perf_counter()
+        
+        # Feature importance
+        print("\n6. Feature importance analysis...")
+        importances = report_feature_importances(model, feature_names)
+        
+        # Save model artifacts
+        print(f"\n7. Saving model artifacts to {save_path}...")
+        metadata = {
+            'model_type': model_type,
+            'test_mae': test_mae,
+            'test_rmse': test_rmse,
+            'test_r2': test_r2,
+            'cv_mae': cv_mae,
+            'params': dict(MODEL_PARAMS[model_type], n_estimators=n_estimators, **(model_params or {})),
+            'n_features': len(feature_names),
+            'feature_names': feature_names
+        }
+        save_model_artifacts(model, model_type, scaler, feature_names, metadata, target_rule,
+                             X[test_index], save_path, registry_path, label_encoders)
+        
+        stage_seconds['save'] = time.perf_counter() - stage_start
+        
+        print("\n" + "=" * 60)
+        print("Training Complete!")
+        print("=" * 60)
+        print("   " + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in stage_seconds.items())
+              + f" (total {sum(stage_seconds.values()):.2f}s)")
+        
+        return model, {
+            'test_mae': test_mae,
+            'test_r2': test_r2,
+            'cv_mae': cv_mae,
+            'stage_seconds': stage_seconds,
+            'feature_importances': importances
+        }
+
+def sample_settings(space, n_trials, random_state=SPLIT_SEED):
+    """n_trials distinct settings drawn from a grid of values (the whole grid if smaller)"""
+    return list(ParameterSampler(space, n_iter=min(n_trials, len(ParameterGrid(space))),
+                                 random_state=random_state))
+
+def halving_schedule(n_trials, min_estimators, max_estimators, eta=3):
+    """
+    Successive-halving rungs as (configurations, n_estimators) pairs
     
-    print(f"   Training set: {X_train.shape[0]} samples")
-    print(f"   Test set: {X_test.shape[0]} samples")
+    Each rung keeps the best 1/eta of the configurations and gives them eta
+    times more trees; the last rung trains with max_estimators.
+    """
+    rungs = []
+    survivors, budget = n_trials, min_estimators
+    while budget < max_estimators and survivors > 1:
+        rungs.append((survivors, budget))
+        survivors = -(-survivors // eta)
+        budget *= eta
+    rungs.append((survivors, max_estimators))
+    return rungs
+
+def _fit_trial(model_type, params, n_estimators, n_jobs, train_index, valid_index):
+    """
+    Fit one search configuration and score it on the validation rows
     
-    # Initialize model
-    print(f"\n3. Training {model_type} model...")
+    XGBoost trials stop once the validation MAE has not improved for
+    EARLY_STOPPING_ROUNDS rounds, and predict with their best iteration.
     
+    Returns:
+        Dictionary with the validation MAE, the trees used, whether early
+        stopping ended the fit, and its seconds
+    """
+    start = time.perf_counter()
+    X_valid, y_valid = _fold_X[valid_index], _fold_y[valid_index]
     if model_type == 'xgboost':
-        model = XGBRegressor(
-            n_estimators=200,
-            max_depth=6,
-            learning_rate=0.1,
-            subsample=0.8,
-            colsample_bytree=0.8,
-            random_state=42,
-            objective='reg:squarederror'
+        model = build_model(model_type, n_estimators, n_jobs, eval_metric='mae',
+                            early_stopping_rounds=EARLY_STOPPING_ROUNDS, **params)
+        model.fit(_fold_X[train_index], _fold_y[train_index], eval_set=[(X_valid, y_valid)], verbose=False)
+        trees = model.best_iteration + 1
+        stopped_early = model.get_booster().num_boosted_rounds() < n_estimators
+    else:
+        model = build_model(model_type, n_estimators, n_jobs, **params)
+        model.fit(_fold_X[train_index], _fold_y[train_index])
+        trees, stopped_early = n_estimators, False
+    return {
+        'validation_mae': mean_absolute_error(y_valid, model.predict(X_valid)),
+        'trees': trees,
+        'stopped_early': stopped_early,
+        'seconds': time.perf_counter() - start
+    }
+
+def search_hyperparameters(model_type='xgboost', save_path='../models', registry_path=None,
+                           filepath=DATASET_PATH, data=None, chunksize=None, space=None,
+                           n_trials=27, min_estimators=50, max_estimators=1000, eta=3,
+                           workers=None, results_file=None, cache_dir=None):
+    """
+    Successive-halving hyperparameter search; saves the best model like train_model
+    
+    n_trials settings sampled from space are fitted on fold 1's training rows
+    less a validation fold, with min_estimators trees each. The best 1/eta
+    continue with eta times more trees, rung after rung, up to
+    max_estimators. XGBoost trials stop early on the validation MAE, and a
+    trial that stopped early keeps its score rather than being refitted with
+    more trees. The preprocessed matrix is loaded once and memory-mapped by
+    every worker process.
+    
+    The winner is refitted on all of fold 1's training rows (with its best
+    number of trees) and tested on the held-out rows train_model tests on.
+    
+    Args:
+        model_type: 'xgboost' or 'random_forest'
+        save_path: Directory to save the best model and the results table to
+        registry_path: Model registry to also publish the best model to
+        filepath: CSV dataset to train on
+        data: DataFrame to train on instead of reading filepath
+        chunksize: Preprocess filepath in chunks of this many rows
+        space: Values to sample each setting from (default: SEARCH_SPACE)
+        n_trials: Settings sampled for the first rung
+        min_estimators: Trees per trial in the first rung
+        max_estimators: Trees per trial in the last rung
+        eta: Factor by which each rung cuts trials and grows trees
+        workers: Trial-fitting processes (default: CPU count)
+        results_file: CSV file for the results table (default:
+            search_results.csv in save_path)
+        cache_dir: Preprocessed data cache directory (default: no cache)
+        
+    Returns:
+        Best model, its metrics (including 'params'), and the results table
+        with one row per fit
+    """
+    print("=" * 60)
+    print("CarbonScoreX Hyperparameter Search")
+    print("=" * 60)
+    
+    stage_seconds = {}
+    stage_start = time.perf_counter()
+    
+    print(f"\n1. Loading data from {filepath if data is None else 'DataFrame'}...")
+    with spill_directory(chunksize, data) as spill_dir:
+        X, y, feature_names, scaler, label_encoders, target_rule = load_training_data(
+            filepath, data, chunksize, spill_dir, cache_dir
         )
-    else:  # random_forest
-        model = RandomForestRegressor(
-            n_estimators=200,
-            max_depth=10,
-            min_samples_split=5,
-            min_samples_leaf=2,
-            random_state=42,
-            n_jobs=-1
+        stage_seconds['load'] = time.perf_counter() - stage_start
+        print(f"   ✓ Loaded in {stage_seconds['load']:.2f}s")
+        
+        # The test rows of train_model stay untouched until the winner is chosen
+        print("\n2. Splitting data...")
+        train_index, test_index = fold_indices(len(y))[0]
+        fit_rows, valid_rows = fold_indices(len(train_index))[0]
+        fit_index, valid_index = train_index[fit_rows], train_index[valid_rows]
+        print(f"   Trial training set: {len(fit_index)} samples")
+        print(f"   Validation set: {len(valid_index)} samples")
+        print(f"   Test set: {len(test_index)} samples")
+        
+        settings = sample_settings(space or SEARCH_SPACE[model_type], n_trials)
+        rungs = halving_schedule(len(settings), min_estimators, max_estimators, eta)
+        workers = max(1, min(workers or os.cpu_count() or 1, len(settings)))
+        n_jobs = max(1, (os.cpu_count() or 1) // workers)
+        print(f"\n3. Searching {len(settings)} {model_type} settings in {len(rungs)} rungs "
+              f"({workers} worker{'s' if workers > 1 else ''})...")
+        stage_start = time.perf_counter()
+        
+        rows = []
+        latest = {}    # trial -> its most recent result
+        survivors = list(range(len(settings)))
+        with shared_training_data(X, y, workers) as pool:
+            for rung, (n_configs, budget) in enumerate(rungs):
+                rung_start = time.perf_counter()
+                if rung:
+                    survivors = sorted(survivors, key=lambda trial: latest[trial]['validation_mae'])[:n_configs]
+                refit = [trial for trial in survivors if not latest.get(trial, {}).get('stopped_early')]
+                results = run_tasks(pool, _fit_trial, [
+                    (model_type, settings[trial], budget, n_jobs, fit_index, valid_index) for trial in refit
+                ])
+                for trial, result in zip(refit, results):
+                    latest[trial] = result
+                    rows.append(dict(trial=trial, rung=rung, n_estimators=budget, **result, **settings[trial]))
+                best = min(latest[trial]['validation_mae'] for trial in survivors)
+                print(f"   Rung {rung + 1}: {len(survivors)} settings x {budget} trees, "
+                      f"{len(refit)} fitted, best validation MAE {best:.4f} "
+                      f"({time.perf_counter() - rung_start:.2f}s)")
+        stage_seconds['search'] = time.perf_counter() - stage_start
+        
+        best_trial = min(survivors, key=lambda trial: latest[trial]['validation_mae'])
+        best_params = settings[best_trial]
+        best_trees = latest[best_trial]['trees']
+        print(f"   ✓ Best settings (trial {best_trial}): {best_params}, {best_trees} trees")
+        
+        results_table = pd.DataFrame(rows)
+        results_file = results_file or os.path.join(save_path, 'search_results.csv')
+        os.makedirs(os.path.dirname(os.path.abspath(results_file)), exist_ok=True)
+        results_table.to_csv(results_file, index=False)
+        print(f"   ✓ Results table ({len(results_table)} fits) saved: {results_file}")
+        
+        # Refit the winner on all training rows, then test it
+        print("\n4. Training the best settings and evaluating...")
+        stage_start = time.perf_counter()
+        [final], model = cross_validate(X, y, [(train_index, test_index)], model_type, best_trees,
+                                        params=best_params)
+        stage_seconds['train'] = time.perf_counter() - stage_start
+        print(f"   - Validation MAE: {latest[best_trial]['validation_mae']:.2f}")
+        print(f"   - Test MAE: {final['mae']:.2f}")
+        print(f"   - Test RMSE: {final['rmse']:.2f}")
+        print(f"   - Test R²: {final['r2']:.4f}")
+        
+        stage_start = time.perf_counter()
+        print("\n5. Feature importance analysis...")
+        importances = report_feature_importances(model, feature_names)
+        
+        print(f"\n6. Saving model artifacts to {save_path}...")
+        params = dict(MODEL_PARAMS[model_type], n_estimators=best_trees, **best_params)
+        metadata = {
+            'model_type': model_type,
+            'test_mae': final['mae'],
+            'test_rmse': final['rmse'],
+            'test_r2': final['r2'],
+            'validation_mae': latest[best_trial]['validation_mae'],
+            'params': params,
+            'n_features': len(feature_names),
+            'feature_names': feature_names
+        }
+        save_model_artifacts(model, model_type, scaler, feature_names, metadata, target_rule,
+                             X[test_index], save_path, registry_path, label_encoders)
+        stage_seconds['save'] = time.perf_counter() - stage_start
+        
+        print("\n" + "=" * 60)
+        print("Search Complete!")
+        print("=" * 60)
+        print("   " + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in stage_seconds.items())
+              + f" (total {sum(stage_seconds.values()):.2f}s)")
+        
+        return model, {
+            'test_mae': final['mae'],
+            'test_r2': final['r2'],
+            'validation_mae': latest[best_trial]['validation_mae'],
+            'params': params,
+            'stage_seconds': stage_seconds,
+            'feature_importances': importances
+        }, results_table
+
+def rescale_thresholds(threshold, feature, old_scaler, new_scaler):
+    """
+    Split thresholds moved from one scaler's feature space to another's
+    
+    A split x < t on features scaled by old_scaler selects the same raw
+    values as x < t' on features scaled by new_scaler, with
+    t' = (t * old_scale + old_mean - new_mean) / new_scale.
+    
+    Args:
+        threshold: Split thresholds
+        feature: Feature index of each split
+        old_scaler: StandardScaler the thresholds were learned with
+        new_scaler: StandardScaler the model will be fed by
+        
+    Returns:
+        Thresholds for new_scaler's features
+    """
+    raw = threshold * old_scaler.scale_[feature] + old_scaler.mean_[feature]
+    return (raw - new_scaler.mean_[feature]) / new_scaler.scale_[feature]
+
+def _rescaled_booster(model, old_scaler, new_scaler):
+    """Copy of an XGBRegressor's booster with its splits moved to new_scaler's features"""
+    booster = model.get_booster()
+    try:
+        booster = booster[:model.best_iteration + 1]
+    except AttributeError:
+        pass
+    raw_model = json.loads(booster.save_raw(raw_format='json'))
+    for tree in raw_model['learner']['gradient_booster']['model']['trees']:
+        # Leaves store their value in split_conditions; only splits move
+        is_split = np.array(tree['left_children']) >= 0
+        conditions = np.array(tree['split_conditions'], dtype=np.float64)
+        feature = np.array(tree['split_indices'])[is_split]
+        conditions[is_split] = rescale_thresholds(conditions[is_split], feature, old_scaler, new_scaler)
+        tree['split_conditions'] = conditions.tolist()
+    return Booster(model_file=bytearray(json.dumps(raw_model).encode()))
+
+def warm_start_model(model, model_type, X, y, n_estimators, old_scaler, new_scaler):
+    """
+    Continue training a fitted model on new rows only
+    
+    XGBoost adds n_estimators boosting rounds to the existing booster; a
+    random forest adds n_estimators trees fitted on the new rows. The existing
+    trees are first moved to new_scaler's feature space, so they predict
+    exactly as before.
+    
+    Args:
+        model: Fitted XGBRegressor or RandomForestRegressor (left unchanged)
+        model_type: 'xgboost' or 'random_forest'
+        X: New rows, scaled by new_scaler
+        y: Target of the new rows
+        n_estimators: Boosting rounds or trees to add
+        old_scaler: StandardScaler the model was trained with
+        new_scaler: StandardScaler X is scaled by
+        
+    Returns:
+        Updated model
+    """
+    if model_type == 'xgboost':
+        booster = _rescaled_booster(model, old_scaler, new_scaler)
+        updated = clone(model).set_params(n_estimators=n_estimators)
+        updated.fit(X, y, xgb_model=booster)
+        return updated
+    
+    updated = copy.deepcopy(model)
+    for estimator in updated.estimators_:
+        tree = estimator.tree_
+        # threshold is a writable view of the tree's nodes; leaves have no feature
+        is_split = tree.feature >= 0
+        tree.threshold[is_split] = rescale_thresholds(
+            tree.threshold[is_split], tree.feature[is_split], old_scaler, new_scaler
         )
+    updated.set_params(warm_start=True, n_estimators=len(updated.estimators_) + n_estimators)
+    updated.fit(X, y)
+    return updated.set_params(warm_start=False)
+
+def tree_count(model, model_type):
+    """
+    Boosting rounds or trees of a fitted model
     
-    # Train model
-    model.fit(X_train, y_train)
-    print("   ✓ Model training complete")
-    
-    # Evaluate model
-    print("\n4. Evaluating model performance...")
-    
-    # Training set predictions
-    y_train_pred = model.predict(X_train)
-    train_mae = mean_absolute_error(y_train, y_train_pred)
-    train_r2 = r2_score(y_train, y_train_pred)
-    
-    # Test set predictions
-    y_test_pred = model.predict(X_test)
-    test_mae = mean_absolute_error(y_test, y_test_pred)
-    test_rmse = np.sqrt(mean_squared_error(y_test, y_test_pred))
-    test_r2 = r2_score(y_test, y_test_pred)
-    
-    print(f"\n   Training Metrics:")
-    print(f"   - MAE: {train_mae:.2f}")
-    print(f"   - R²: {train_r2:.4f}")
-    
-    print(f"\n   Test Metrics:")
-    print(f"   - MAE: {test_mae:.2f}")
-    print(f"   - RMSE: {test_rmse:.2f}")
-    print(f"   - R²: {test_r2:.4f}")
-    
-    # Cross-validation
-    print("\n5. Performing 5-fold cross-validation...")
-    cv_scores = cross_val_score(model, X, y, cv=5, 
-                                scoring='neg_mean_absolute_error')
-    cv_mae = -cv_scores.mean()
-    cv_std = cv_scores.std()
-    print(f"   Cross-validation MAE: {cv_mae:.2f} (+/- {cv_std:.2f})")
-    
-    # Feature importance
-    print("\n6. Feature importance analysis...")
-    if hasattr(model, 'feature_importances_'):
-        importances = model.feature_importances_
-        indices = np.argsort(importances)[::-1]
-        
-        print("\n   Top 10 Most Important Features:")
-        for i in range(min(10, len(feature_names))):
-            idx = indices[i]
-            print(f"   {i+1}. {feature_names[idx]}: {importances[idx]:.4f}")
-    
-    # Save model artifacts
-    print(f"\n7. Saving model artifacts to {save_path}...")
+    Read from the model itself: an updated XGBRegressor's n_estimators is only
+    the rounds added by its last fit, and older metadata has no 'params'.
+    """
+    if model_type == 'xgboost':
+        return model.get_booster().num_boosted_rounds()
+    return len(model.estimators_)
+
+def load_model_artifacts(model_path='../models'):
+    """
+    Load a saved model with its scaler, feature names and metadata
+    
+    Args:
+        model_path: Directory save_model_artifacts wrote to
+        
+    Returns:
+        Model, scaler, feature names, metadata
+    """
+    metadata = joblib.load(os.path.join(model_path, 'model_metadata.joblib'))
+    model = joblib.load(os.path.join(model_path, f"carbon_score_model_{metadata['model_type']}.joblib"))
+    scaler = joblib.load(os.path.join(model_path, 'scaler.joblib'))
+    feature_names = joblib.load(os.path.join(model_path, 'feature_names.joblib'))
+    return model, scaler, feature_names, metadata
+
+def update_model(filepath=None, data=None, model_path='../models', save_path=None, registry_path=None,
+                 n_estimators=50, n_folds=CV_FOLDS, tolerance=UPDATE_MAE_TOLERANCE):
+    """
+    Incrementally update a trained model with newly appended rows
+    
+    Only the new rows are preprocessed and trained on: the scaler statistics
+    are updated with partial_fit, and the model continues from its saved
+    trees (see warm_start_model). The update is validated on the new rows'
+    held-out fold and published only if its MAE there is within tolerance
+    of the current model's.
+    
+    Args:
+        filepath: CSV of the new rows
+        data: DataFrame of the new rows instead of reading filepath
+        model_path: Directory of the model to update
+        save_path: Directory to publish the updated model to (default:
+            model_path)
+        registry_path: Model registry to also publish the update to as a new
+            (inactive) version
+        n_estimators: Boosting rounds (XGBoost) or trees (random forest) to add
+        n_folds: The held-out validation rows are 1/n_folds of the new rows
+        tolerance: Largest relative MAE increase over the current model that
+            is still published
+        
+    Returns:
+        Updated model, evaluation metrics ('published' is False when the
+        update was rejected)
+    """
+    print("=" * 60)
+    print("CarbonScoreX Incremental Model Update")
+    print("=" * 60)
+    
+    stage_seconds = {}
+    stage_start = time.perf_counter()
+    save_path = save_path or model_path
+    
+    # Load the current model and the new rows
+    print(f"\n1. Loading model from {model_path} and new rows from {filepath if data is None else 'DataFrame'}...")
+    model, old_scaler, feature_names, metadata = load_model_artifacts(model_path)
+    model_type = metadata['model_type']
+    if 'categories' not in metadata and any(col.endswith('_encoded') for col in feature_names):
+        raise ValueError(f"Model in {model_path} has no saved category codes; retrain it with train_model")
+    target_rule = CarbonScoreRule.from_dict(metadata['target_rule']) if 'target_rule' in metadata else None
+    df = pd.read_csv(filepath) if data is None else data
+    X_raw, y, categories = preprocess_new_rows(df, feature_names, metadata.get('categories', {}), target_rule)
+    # Columns with no values in the new rows: the training mean
+    X_raw = np.where(np.isnan(X_raw), old_scaler.mean_, X_raw)
+    print(f"   New rows: {len(y)}, model: {model_type} with {tree_count(model, model_type)} trees")
+    
+    stage_seconds['load'] = time.perf_counter() - stage_start
+    
+    # Hold out the validation rows; update the scaler with the rest
+    print(f"\n2. Updating on {100 - 100 // n_folds}% of the new rows ({100 // n_folds}% held out)...")
+    stage_start = time.perf_counter()
+    train_index, test_index = fold_indices(len(y), n_folds)[0]
+    scaler = copy.deepcopy(old_scaler)
+    scaler.partial_fit(X_raw[train_index])
+    X = scaler.transform(X_raw)
+    updated = warm_start_model(model, model_type, X[train_index], y[train_index], n_estimators,
+                               old_scaler, scaler)
+    stage_seconds['train'] = time.perf_counter() - stage_start
+    print(f"   ✓ Added {n_estimators} {'boosting rounds' if model_type == 'xgboost' else 'trees'} "
+          f"in {stage_seconds['train']:.2f}s")
+    
+    # Validate against the current model on the held-out rows
+    print("\n3. Validating on the held-out rows...")
+    stage_start = time.perf_counter()
+    y_test = y[test_index]
+    current_mae = mean_absolute_error(y_test, model.predict(old_scaler.transform(X_raw[test_index])))
+    predictions = updated.predict(X[test_index])
+    test_mae = mean_absolute_error(y_test, predictions)
+    test_rmse = np.sqrt(mean_squared_error(y_test, predictions))
+    test_r2 = r2_score(y_test, predictions)
+    published = test_mae <= current_mae * (1 + tolerance)
+    print(f"   Current model MAE: {current_mae:.2f}")
+    print(f"   Updated model MAE: {test_mae:.2f} (RMSE {test_rmse:.2f}, R² {test_r2:.4f})")
+    stage_seconds['validate'] = time.perf_counter() - stage_start
+    
+    stage_start = time.perf_counter()
+    if published:
+        print(f"\n4. Publishing updated model to {save_path}...")
+        update = {
+            'rows': int(len(y)),
+            'estimators_added': n_estimators,
+            'holdout_mae': test_mae,
+            'previous_holdout_mae': current_mae
+        }
+        metadata = {key: value for key, value in metadata.items() if key not in ('cv_mae', 'validation_mae')}
+        metadata.update({
+            'test_mae': test_mae,
+            'test_rmse': test_rmse,
+            'test_r2': test_r2,
+            'params': dict(metadata.get('params', {}), n_estimators=tree_count(updated, model_type)),
+            'categories': categories,
+            'updates': metadata.get('updates', []) + [update]
+        })
+        save_model_artifacts(updated, model_type, scaler, feature_names, metadata, target_rule,
+                             X[test_index], save_path, registry_path)
+    else:
+        print(f"\n4. Not published: MAE exceeds the current model's by more than {tolerance:.0%}")
+    stage_seconds['save'] = time.perf_counter() - stage_start
+    
+    print("\n" + "=" * 60)
+    print("Update Complete!" if published else "Update Rejected")
+    print("=" * 60)
+    print("   " + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in stage_seconds.items())
+          + f" (total {sum(stage_seconds.values()):.2f}s)")
+    
+    return updated, {
+        'test_mae': test_mae,
+        'test_r2': test_r2,
+        'previous_mae': current_mae,
+        'published': published,
+        'stage_seconds': stage_seconds
+    }
+
+def load_training_data(filepath=DATASET_PATH, data=None, chunksize=None, work_dir=None, cache_dir=None):
+    """
+    Preprocessed training data for every training mode
+    
+    Args:
+        filepath: CSV dataset to train on
+        data: DataFrame to train on instead of reading filepath
+        chunksize: Preprocess filepath in chunks of this many rows, with
+            stream_preprocess_data, instead of loading it whole
+        work_dir: Directory for the memory-mapped output of chunked
+            preprocessing (required with chunksize)
+        cache_dir: PreprocessCache directory; a file preprocessed before
+            with the same content, parameters and code is loaded from it
+            memory-mapped instead (DataFrames are not cached)
+        
+    Returns:
+        Same as load_and_preprocess_data
+    """
+    if chunksize and data is None:
+        params = {'mode': 'stream', 'chunksize': chunksize, 'sample_size': MEDIAN_SAMPLE_SIZE}
+        preprocess = lambda: stream_preprocess_data(filepath, work_dir, chunksize=chunksize)
+    else:
+        params = {'mode': 'full'}
+        preprocess = lambda: load_and_preprocess_data(filepath=filepath, data=data)
+    if not cache_dir or data is not None:
+        return preprocess()
+    
+    cache = PreprocessCache(cache_dir)
+    key = cache.key(filepath, **params)
+    result = cache.load(key)
+    if result is not None:
+        print(f"   ✓ Preprocessed data loaded from cache entry {key[:12]}")
+        return result
+    result = preprocess()
+    cache.store(key, result)
+    print(f"   ✓ Preprocessed data cached as {key[:12]}")
+    return result
+
+def report_feature_importances(model, feature_names):
+    """Print the ten most important features; returns every feature's importance by name"""
+    if not hasattr(model, 'feature_importances_'):
+        return {}
+    importances = model.feature_importances_
+    indices = np.argsort(importances)[::-1]
+    
+    print("\n   Top 10 Most Important Features:")
+    for i in range(min(10, len(feature_names))):
+        idx = indices[i]
+        print(f"   {i+1}. {feature_names[idx]}: {importances[idx]:.4f}")
+    return dict(zip(feature_names, importances))
+
+def save_model_artifacts(model, model_type, scaler, feature_names, metadata, target_rule,
+                         X_check, save_path, registry_path=None, label_encoders=None):
+    """
+    Save the model, scaler, feature names, metadata and bundle for inference
+    
+    Args:
+        model: Fitted model
+        model_type: 'xgboost' or 'random_forest'
+        scaler: Fitted StandardScaler
+        feature_names: Feature names in model input order
+        metadata: Training metadata dictionary
+        target_rule: CarbonScoreRule of a synthetic target, or None
+        X_check: Scaled rows the bundle's predictions are checked on
+        save_path: Directory to save the artifacts to
+        registry_path: Model registry to also publish the artifacts to as a new
+            (inactive) version
+        label_encoders: Fitted LabelEncoder per categorical column, saved as
+            the metadata 'categories' for update_model
+    """
     os.makedirs(save_path, exist_ok=True)
     
     # Save model
@@ -131,32 +871,259 @@ def train_model(model_type='xgboost', save_path='../models'):
     print(f"   ✓ Feature names saved: {features_filename}")
     
     # Save metadata
-    metadata = {
-        'model_type': model_type,
-        'test_mae': test_mae,
-        'test_rmse': test_rmse,
-        'test_r2': test_r2,
-        'cv_mae': cv_mae,
-        'n_features': len(feature_names),
-        'feature_names': feature_names
-    }
+    if target_rule is not None:
+        # How the synthetic target was computed, to score new rows the same way
+        metadata = dict(metadata, target_rule=target_rule.to_dict())
+    if label_encoders:
+        # Category codes, to encode appended rows the same way
+        metadata = dict(metadata, categories={col: le.classes_.tolist() for col, le in label_encoders.items()})
     metadata_filename = os.path.join(save_path, 'model_metadata.joblib')
     joblib.dump(metadata, metadata_filename)
     print(f"   ✓ Metadata saved: {metadata_filename}")
     
-    print("\n" + "=" * 60)
-    print("Training Complete!")
-    print("=" * 60)
+    # Export everything inference needs as one memory-mappable bundle
+    bundle_filename = os.path.join(save_path, f'carbon_score_model_{model_type}.bundle')
+    parity_error = export_model_bundle(model, scaler, X_check, feature_names, metadata, bundle_filename)
+    print(f"   ✓ Model bundle saved: {bundle_filename} (max parity error {parity_error:.2e})")
     
-    return model, {
-        'test_mae': test_mae,
-        'test_r2': test_r2,
-        'feature_importances': dict(zip(feature_names, importances)) if hasattr(model, 'feature_importances_') else {}
+    if registry_path:
+        version = ModelRegistry(registry_path).publish(save_path, files=[
+            os.path.basename(path) for path in (
+                model_filename, scaler_filename, features_filename, metadata_filename, bundle_filename
+            )
+        ])
+        print(f"   ✓ Published to registry {registry_path} as version {version}")
+        print(f"     (serve it with POST /admin/reload {{\"version\": \"{version}\"}})")
+
+def _tree_depth(left, right, root=0):
+    """Maximum number of splits on any root-to-leaf path"""
+    depth, stack = 0, [(root, 0)]
+    while stack:
+        node, level = stack.pop()
+        if left[node] < 0:
+            depth = max(depth, level)
+        else:
+            stack.append((left[node], level + 1))
+            stack.append((right[node], level + 1))
+    return depth
+
+def _xgboost_trees(model):
+    """Collect per-tree node arrays and the base score from an XGBRegressor"""
+    learner = json.loads(model.get_booster().save_raw(raw_format='json'))['learner']
+    base_score = float(learner['learner_model_param']['base_score'].strip('[]'))
+    trees = learner['gradient_booster']['model']['trees']
+    
+    # predict() stops at the best iteration when early stopping was used
+    try:
+        trees = trees[:model.best_iteration + 1]
+    except AttributeError:
+        pass
+    
+    nodes = []
+    for tree in trees:
+        left = np.array(tree['left_children'], dtype=np.int64)
+        # Leaves store their value in split_conditions; thresholds are float32
+        conditions = np.array(tree['split_conditions'], dtype=np.float32).astype(np.float64)
+        is_leaf = left < 0
+        nodes.append({
+            'feature': np.array(tree['split_indices'], dtype=np.int64),
+            'threshold': conditions,
+            'left': left,
+            'right': np.array(tree['right_children'], dtype=np.int64),
+            'value': np.where(is_leaf, conditions, 0.0),
+            'cover': np.array(tree['sum_hessian'], dtype=np.float64),
+            'default_left': np.array(tree['default_left'], dtype=bool)
+        })
+    return nodes, base_score
+
+def _random_forest_trees(model):
+    """Collect per-tree node arrays from a fitted RandomForestRegressor"""
+    nodes = []
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        missing_left = getattr(tree, 'missing_go_to_left', None)
+        nodes.append({
+            'feature': tree.feature.astype(np.int64),
+            'threshold': tree.threshold.astype(np.float64),
+            'left': tree.children_left.astype(np.int64),
+            'right': tree.children_right.astype(np.int64),
+            'value': tree.value[:, 0, 0].astype(np.float64),
+            'cover': tree.weighted_n_node_samples.astype(np.float64),
+            'default_left': (np.zeros(tree.node_count, dtype=bool) if missing_left is None
+                             else missing_left.astype(bool))
+        })
+    return nodes, 0.0
+
+def _node_expected_values(left, right, value, cover, order):
+    """
+    Expected tree output at every node: the cover-weighted mean of the leaves below it
+    
+    order must list parents before children (e.g. _adjacent_order), so walking it
+    backwards visits both children of a node before the node itself.
+    """
+    expected = np.array(value, dtype=np.float64)
+    for node in order[::-1]:
+        if left[node] >= 0:
+            l, r = left[node], right[node]
+            total = cover[l] + cover[r]
+            if total > 0:
+                expected[node] = (cover[l] * expected[l] + cover[r] * expected[r]) / total
+            else:
+                expected[node] = (expected[l] + expected[r]) / 2
+    return expected
+
+def _adjacent_order(left, right):
+    """Breadth-first node order in which every right child directly follows its left sibling"""
+    order = [0]
+    for node in order:
+        if left[node] >= 0:
+            order.extend((left[node], right[node]))
+    return np.array(order, dtype=np.int64)
+
+def flatten_tree_ensemble(model):
+    """
+    Flatten a trained XGBoost or random forest ensemble into compact node arrays
+    
+    Nodes are renumbered so right = left + 1, and every split is rewritten as
+    "go right when x > threshold" on float32 inputs. Leaves point to themselves with
+    an infinite threshold, so extra traversal steps are no-ops. node_value holds
+    each node's expected output, used for per-prediction path attributions.
+    
+    Args:
+        model: Fitted XGBRegressor or RandomForestRegressor
+        
+    Returns:
+        Dictionary of arrays accepted by inference.TreeEnsemble
+    """
+    if hasattr(model, 'get_booster'):
+        trees, base_score = _xgboost_trees(model)
+        average, inclusive = False, False    # sum of trees, left when x < threshold
+    else:
+        trees, base_score = _random_forest_trees(model)
+        average, inclusive = True, True      # mean of trees, left when x <= threshold
+    
+    columns = {key: [] for key in ('feature', 'threshold', 'left', 'right', 'value', 'node_value', 'default_left')}
+    roots, offset, max_depth = [], 0, 0
+    for tree in trees:
+        order = _adjacent_order(tree['left'], tree['right'])
+        new_id = np.empty(len(tree['left']), dtype=np.int64)
+        new_id[order] = np.arange(len(order)) + offset
+        max_depth = max(max_depth, _tree_depth(tree['left'], tree['right']))
+        
+        left = tree['left'][order]
+        is_leaf = left < 0
+        threshold = tree['threshold'][order]
+        if not inclusive:
+            # For float32 x, x < t is exactly x <= (the float32 just below t)
+            threshold = np.nextafter(threshold.astype(np.float32), np.float32(-np.inf)).astype(np.float64)
+        
+        columns['feature'].append(np.where(is_leaf, 0, tree['feature'][order]))
+        columns['threshold'].append(np.where(is_leaf, np.inf, threshold))
+        columns['left'].append(np.where(is_leaf, new_id[order], new_id[np.maximum(left, 0)]))
+        columns['right'].append(np.where(is_leaf, new_id[order], new_id[np.maximum(tree['right'][order], 0)]))
+        columns['value'].append(tree['value'][order])
+        columns['node_value'].append(
+            _node_expected_values(tree['left'], tree['right'], tree['value'], tree['cover'], order)[order]
+        )
+        columns['default_left'].append(tree['default_left'][order] | is_leaf)
+        roots.append(offset)
+        offset += len(order)
+    
+    arrays = {
+        # Index arrays use the engine's index dtype so bundles load without copying
+        'feature': np.concatenate(columns['feature']).astype(np.intp),
+        'threshold': np.concatenate(columns['threshold']),
+        'left': np.concatenate(columns['left']).astype(np.intp),
+        'right': np.concatenate(columns['right']).astype(np.intp),
+        'value': np.concatenate(columns['value']),
+        'node_value': np.concatenate(columns['node_value']),
+        'default_left': np.concatenate(columns['default_left']),
+        'roots': np.array(roots, dtype=np.intp),
+        'base_score': np.float64(base_score),
+        'average': np.bool_(average),
+        'max_depth': np.int32(max_depth),
+        'n_features': np.int32(model.n_features_in_),
+        'feature_importances': np.asarray(model.feature_importances_, dtype=np.float64)
     }
+    return arrays
+
+def export_model_bundle(model, scaler, X_check, feature_names, metadata, filename):
+    """
+    Export a trained ensemble as a single-file bundle for the numpy inference engine
+    
+    The bundle holds the flattened trees, the scaler statistics, feature names
+    and metadata, so serving needs neither joblib nor xgboost/sklearn.
+    
+    Args:
+        model: Fitted XGBRegressor or RandomForestRegressor
+        scaler: Fitted StandardScaler, stored as plain mean/scale arrays
+        X_check: Scaled feature matrix used to check predictions match the model
+        feature_names: Feature names in model input order
+        metadata: Training metadata dictionary
+        filename: Output .bundle path
+        
+    Returns:
+        Maximum absolute prediction difference on X_check
+    """
+    arrays = flatten_tree_ensemble(model)
+    engine = TreeEnsemble(arrays)
+    predictions, contributions = engine.predict_contributions(X_check)
+    
+    parity_error = float(np.max(np.abs(predictions - model.predict(X_check))))
+    if parity_error > EXPORT_PARITY_TOLERANCE:
+        raise ValueError(
+            f"Compiled ensemble deviates from the model by {parity_error:.2e} "
+            f"(tolerance {EXPORT_PARITY_TOLERANCE:.0e})"
+        )
+    
+    # Path attributions plus the bias must add up to each prediction
+    additivity_error = float(np.max(np.abs(contributions.sum(axis=1) + engine.bias - predictions)))
+    if additivity_error > EXPORT_PARITY_TOLERANCE:
+        raise ValueError(f"Feature contributions do not sum to predictions (off by {additivity_error:.2e})")
+    
+    arrays['scaler_mean'] = np.asarray(scaler.mean_, dtype=np.float64)
+    arrays['scaler_scale'] = np.asarray(scaler.scale_, dtype=np.float64)
+    metadata = dict(metadata, parity_max_abs_error=parity_error)
+    write_bundle(filename, arrays, {'metadata': metadata, 'feature_names': list(feature_names)})
+    return parity_error
 
 if __name__ == '__main__':
-    # Train model
-    model, metrics = train_model(model_type='xgboost')
+    parser = argparse.ArgumentParser(description='Train the CarbonScoreX model')
+    parser.add_argument('--model-type', default='xgboost', choices=sorted(MODEL_PARAMS))
+    parser.add_argument('--data', default=DATASET_PATH, help='CSV dataset to train on')
+    parser.add_argument('--save-path', default='../models', help='Directory to save the model to')
+    parser.add_argument('--chunksize', type=int, default=None,
+                        help='Preprocess the CSV in chunks of this many rows')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Processes fitting folds or search trials (default: CPU count)')
+    parser.add_argument('--search', action='store_true',
+                        help='Search hyperparameters with successive halving before saving')
+    parser.add_argument('--trials', type=int, default=27, help='Settings sampled by --search')
+    parser.add_argument('--cache-dir', default=PREPROCESS_CACHE_DIR,
+                        help='Preprocessed data cache (default: $ML_PREPROCESS_CACHE or ../cache/preprocessed)')
+    parser.add_argument('--no-cache', action='store_true', help='Always preprocess the CSV from scratch')
+    parser.add_argument('--update', metavar='CSV',
+                        help='Update the model in --save-path with these new rows instead of retraining')
+    parser.add_argument('--update-estimators', type=int, default=50,
+                        help='Boosting rounds or trees --update adds')
+    args = parser.parse_args()
+    cache_dir = None if args.no_cache else args.cache_dir
+    
+    if args.update:
+        model, metrics = update_model(filepath=args.update, model_path=args.save_path,
+                                      n_estimators=args.update_estimators)
+        if not metrics['published']:
+            raise SystemExit(1)
+    elif args.search:
+        model, metrics, _ = search_hyperparameters(
+            model_type=args.model_type, save_path=args.save_path, filepath=args.data,
+            chunksize=args.chunksize, n_trials=args.trials, workers=args.workers, cache_dir=cache_dir
+        )
+    else:
+        model, metrics = train_model(
+            model_type=args.model_type, save_path=args.save_path, filepath=args.data,
+            chunksize=args.chunksize, cv_workers=args.workers, cache_dir=cache_dir
+        )
     
     print(f"\nModel ready for deployment!")
     print(f"Expected MAE on new data: ~{metrics['test_mae']:.2f} points")
\ No newline at end of file
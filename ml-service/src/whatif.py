@@ -0,0 +1,156 @@
+"""
+What-if analysis for CarbonScoreX
+Scores one company under changes to its metrics ("levers") and ranks the
+levers by how far they move its score
+
+Every variant, the unchanged company included, is one row of a single
+feature matrix scored in one vectorized model call, so hundreds of variants
+cost about as much as scoring the company alone.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from categories import CATEGORY_LABELS
+
+# Lever kinds: add each step to the value, or change the value by step percent
+ABSOLUTE = 'absolute'
+PERCENT = 'percent'
+
+# Variants scored per request: the lever steps plus any combinations
+MAX_VARIANTS = 10000
+
+# Best combinations listed when combinations are scored
+TOP_COMBINATIONS = 10
+
+
+class WhatIfError(ValueError):
+    """A what-if request that cannot be scored as asked (a client error)"""
+
+
+def lever_values(base: Optional[float], kind: str, steps: List[float],
+                 bounds: Tuple[Optional[float], Optional[float]] = (None, None)) -> np.ndarray:
+    """
+    Values of one metric after each step of a lever
+
+    Args:
+        base: Current value, or None if the company did not report it (an
+            absolute step then starts from 0, a percent step has nothing to change)
+        kind: ABSOLUTE or PERCENT
+        steps: Changes to try
+        bounds: (min, max) the values are clipped to, None for no limit
+
+    Returns:
+        float64 array, NaN where a value stays missing
+    """
+    steps = np.asarray(steps, dtype=np.float64)
+    if kind == PERCENT:
+        values = (np.nan if base is None else float(base)) * (1 + steps / 100)
+    else:
+        values = (0.0 if base is None else float(base)) + steps
+    low, high = bounds
+    return np.clip(values, -np.inf if low is None else low, np.inf if high is None else high)
+
+
+def _plain(value: float) -> Optional[float]:
+    return None if np.isnan(value) else value
+
+
+def what_if(predictor, company: Dict[str, Any], levers: List[Dict[str, Any]],
+            bounds: Optional[Dict[str, tuple]] = None, combine: bool = False) -> Dict[str, Any]:
+    """
+    Score a company under each lever step, and optionally every combination of steps
+
+    Args:
+        predictor: CarbonScorePredictor or FallbackScorer
+        company: Company metrics, as for predict()
+        levers: Dictionaries with 'feature', 'kind' (ABSOLUTE or PERCENT) and
+            'steps'; each step is scored with the other metrics unchanged
+        bounds: (min, max) per metric, applied to changed values
+        combine: Also score every combination of one step per lever and list
+            the TOP_COMBINATIONS best
+
+    Returns:
+        Dictionary with the baseline score and category, the levers ranked by
+        impact (largest absolute score change of any step), the best
+        combinations when combine is set, the variant count and model version
+
+    Raises:
+        WhatIfError: A metric has several levers, or there are more than
+            MAX_VARIANTS variants
+    """
+    bounds = bounds or {}
+    features = [lever['feature'] for lever in levers]
+    if len(set(features)) < len(features):
+        raise WhatIfError("Each metric can have only one lever")
+    values = [
+        lever_values(company.get(lever['feature']), lever['kind'], lever['steps'],
+                     bounds.get(lever['feature'], (None, None)))
+        for lever in levers
+    ]
+    n_steps = [len(v) for v in values]
+    n_single = sum(n_steps)
+    n_combined = int(np.prod(n_steps)) if combine and len(levers) > 1 else 0
+    n_variants = 1 + n_single + n_combined
+    if n_variants > MAX_VARIANTS:
+        raise WhatIfError(f"{n_variants} variants requested, at most {MAX_VARIANTS} are scored")
+
+    # Row 0 is the company as is, then one row per lever step, then the combinations
+    columns = {
+        name: np.full(n_variants, np.nan if value is None else float(value))
+        for name, value in company.items()
+    }
+    offsets = np.cumsum([1] + n_steps[:-1])
+    combination_steps = np.indices(n_steps).reshape(len(levers), -1) if n_combined else None
+    for i, (feature, lever_row) in enumerate(zip(features, values)):
+        column = columns.setdefault(feature, np.full(n_variants, np.nan))
+        column[offsets[i]:offsets[i] + n_steps[i]] = lever_row
+        if n_combined:
+            column[1 + n_single:] = lever_row[combination_steps[i]]
+
+    scores = predictor.predict_scores(predictor.extract_columns(columns, n_variants))
+    deltas = scores - scores[0]
+    categories = CATEGORY_LABELS[predictor.category_codes(scores)].tolist()
+    scores, deltas = scores.tolist(), deltas.tolist()
+
+    ranked = []
+    for i, lever in enumerate(levers):
+        rows = range(offsets[i], offsets[i] + n_steps[i])
+        ranked.append({
+            'feature': lever['feature'],
+            'kind': lever['kind'],
+            'impact': max(abs(deltas[row]) for row in rows),
+            'steps': [
+                {
+                    'step': step,
+                    'value': _plain(value),
+                    'score': scores[row],
+                    'delta': deltas[row],
+                    'category': categories[row]
+                }
+                for step, value, row in zip(lever['steps'], values[i].tolist(), rows)
+            ]
+        })
+    ranked.sort(key=lambda lever: lever['impact'], reverse=True)
+
+    result = {
+        'baseline': {'score': scores[0], 'category': categories[0]},
+        'levers': ranked
+    }
+    if n_combined:
+        best = np.argsort(-np.asarray(deltas[1 + n_single:]), kind='stable')[:TOP_COMBINATIONS]
+        result['combinations'] = [
+            {
+                'steps': {
+                    lever['feature']: lever['steps'][combination_steps[i][j]]
+                    for i, lever in enumerate(levers)
+                },
+                'score': scores[1 + n_single + j],
+                'delta': deltas[1 + n_single + j],
+                'category': categories[1 + n_single + j]
+            }
+            for j in best.tolist()
+        ]
+    result['variants'] = n_variants
+    result['model_version'] = predictor.model_version
+    return result